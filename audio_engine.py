@@ -0,0 +1,660 @@
+# audio_engine.py
+# Camino de reproducción independiente de Tk: lo usan la grilla, el teclado y los controles
+# externos (OSC). Todas las operaciones son thread-safe y no tocan widgets; los cambios de
+# estado se publican en `events` para que la UI los aplique en su propio hilo.
+#   play()          -> clip principal (mixer.music): cada disparo reemplaza al anterior
+#   play_voice()    -> capa polifónica (mixer.Sound): no corta nada, la usan las secuencias
+#   play_sequence() -> pasos programados en el Scheduler (reloj monotónico, hilo propio)
+#   play_macro()    -> capas pre-mezcladas en un único Sound (una sola voz, sin deriva entre capas)
+#   playlist        -> música de fondo en canales reservados (playlist.PlaylistPlayer)
+#   play_loop()     -> loop sin costura desde memoria, con puntos de loop opcionales (looper.Looper)
+# backend "pygame" mezcla SDL_mixer; "numpy" usa soft_mixer.SoftMixer (bus master propio) con la
+# misma interfaz, así que todo lo de arriba funciona igual con cualquiera de los dos.
+# Cada disparo lleva un rol ("effect" | "bed"); con el mezclador NumPy y ducking activo, los
+# fondos bajan solos mientras suena algún efecto (bus_fx.Ducker, por bloque de audio).
+# Con group=(id, modo) un disparo corta antes las voces de su grupo: "choke" en seco (10 ms),
+# "exclusive" con fundido. Cada grupo guarda sus voces en un dict, sin recorrer las demás.
+# Cada disparo va además a un bus (profile_io.BUSES): la ganancia de una voz es
+# ganancia propia × bus × volumen master, y set_buses() la recalcula para todas en una pasada.
+# mix={"gain_db", "pan", "attack_ms", "release_ms"} por botón: ganancia y paneo van al volumen
+# del canal (izq/der); el ataque es el fundido de entrada del canal y la liberación su fundido
+# al cortarlo. Nada de eso copia ni recorre muestras: el buffer compartido se usa tal cual.
+# play_pool() -> variaciones por botón: archivos × tonos (remuestreados una vez con NumPy en
+# prepare_pools) y una elección O(1) por disparo, en orden (round robin) o al azar sin repetir.
+from __future__ import annotations
+import math, time, queue, random, threading
+from collections import OrderedDict
+from typing import NamedTuple
+import pygame
+from scheduler import Scheduler, clock
+from playlist import PlaylistPlayer
+from looper import Looper
+from profile_io import BUSES, DEFAULT_BUS, MIX_DEFAULTS, POOL_DEFAULTS
+
+PLAY_FADE_MS = 60
+STOP_FADE_MS = 150
+PREVIEW_FADE_MS = 120
+MAX_VOICES = 32
+SOUND_CACHE_SIZE = 64     # Sounds decodificados en memoria (LRU)
+SEQUENCE_TAG = "seq"
+LOOP_STOP_FADE_MS = 250
+BACKENDS = ("pygame", "numpy")
+CHOKE_FADE_MS = 10
+GROUP_FADES = {"choke": CHOKE_FADE_MS, "exclusive": STOP_FADE_MS}
+
+
+class _Voice(NamedTuple):
+    channel: object
+    gain: float
+    bus: str
+    pan: float = 0.0
+    release_ms: int | None = None       # fundido al cortarla; None = el del comando
+
+
+def mix_params(mix: dict | None) -> tuple[float, float, int, int | None]:
+    """(ganancia lineal, paneo -1..1, ataque ms, liberación ms | None) del bloque "mix" de un botón."""
+    m = {**MIX_DEFAULTS, **(mix or {})}
+    release = m["release_ms"]
+    return (10 ** (min(0.0, float(m["gain_db"])) / 20.0), min(1.0, max(-1.0, float(m["pan"]))),
+            max(0, int(m["attack_ms"] or 0)), None if release is None else max(0, int(release)))
+
+
+def pool_key(pool: dict) -> tuple:
+    """(archivos, cents, variantes) de un bloque "pool": identifica sus variantes pre-renderizadas."""
+    p = {**POOL_DEFAULTS, **pool}
+    cents = max(0, int(p["pitch_cents"]))
+    return tuple(p["files"]), cents, max(1, int(p["variants"])) if cents else 1
+
+
+def pool_offsets(cents: int, variants: int) -> list[int]:
+    """Desvíos de tono repartidos parejo en ±cents (con un número impar de variantes, incluye 0)."""
+    if variants < 2 or not cents:
+        return [0]
+    return [round(-cents + 2 * cents * i / (variants - 1)) for i in range(variants)]
+
+
+def pan_levels(level: float, pan: float) -> tuple[float, float]:
+    """Ley de potencia constante con el centro en 0 dB: los extremos no suben, el otro lado baja."""
+    theta = (pan + 1.0) * math.pi / 4
+    return level * min(1.0, math.sqrt(2) * math.cos(theta)), level * min(1.0, math.sqrt(2) * math.sin(theta))
+
+
+class AudioEngine:
+    def __init__(self, volume: float = 0.8, backend: str = "pygame"):
+        self.volume = volume
+        self.backend = backend if backend in BACKENDS else "pygame"
+        self.mixer = pygame.mixer             # o un SoftMixer tras init() con backend "numpy"
+        self.events: queue.Queue = queue.Queue()   # ("play", path) | ("stop",) | ("volume", v) | ("playlist", path|None)
+        self._lock = threading.RLock()
+        self._current: str | None = None
+        self.scheduler = Scheduler()
+        self._sounds: OrderedDict[str, pygame.mixer.Sound] = OrderedDict()
+        self._voices: list[_Voice] = []
+        self._main: tuple | None = None          # (canal, Sound, liberación) del clip principal con mix
+        self._loop_release: dict = {}            # clave de loop -> liberación
+        self._music_gain = 1.0
+        self._music_gen = 0                      # sube con cada play/stop: descarta un play que esperaba el fundido
+        self._playlist_gain = 1.0
+        self._buses: dict[str, float] = {bus: 1.0 for bus in BUSES}   # ganancia por bus (0 = mute)
+        self._music_bus = DEFAULT_BUS            # bus del clip principal (mixer.music)
+        self._playlist_bus = "music"
+        self._macros: dict[tuple, pygame.mixer.Sound] = {}             # capas -> mezcla
+        self._loop_bufs: dict[tuple, tuple] = {}                        # (ruta, inicio, fin) -> Sounds
+        self._pools: dict[tuple, list[tuple]] = {}                       # pool_key -> [(ruta, cents, Sound)]
+        self._pool_pos: dict[tuple, int] = {}                            # pool_key -> última variante
+        self._pool_jobs: set[tuple] = set()                              # pools renderizándose aparte
+        self._macro_jobs: set[tuple] = set()                             # macros mezclándose aparte
+        self._refs: dict[str, object] = {}                              # ruta -> PcmRef de lo que está en _sounds
+        self.looper = Looper()
+        self._groups: dict[str, list[tuple]] = {}    # grupo -> [(canal, Sound) | (None, clave de loop)]
+        self._group_gen: dict[str, int] = {}         # sube en cada corte: invalida pasos pendientes
+        self._pcm = None
+        self.playlist = PlaylistPlayer(self._load_track, lambda path: self.events.put(("playlist", path)))
+        self.playlist.volume = volume
+
+    def init(self) -> None:
+        pygame.mixer.init()
+        try:
+            from pcm_store import PcmStore
+            self._pcm = PcmStore()
+        except ImportError:      # sin numpy: se decodifica con pygame en cada carga
+            self._pcm = None
+        if self.backend == "numpy" and self._pcm is not None:
+            from soft_mixer import SoftMixer
+            rate, _size, channels = pygame.mixer.get_init()
+            self.mixer = SoftMixer(rate, channels, loader=self._sound)
+            self.mixer.start()
+        else:
+            self.backend = "pygame"
+        self.mixer.set_num_channels(MAX_VOICES)
+        self.playlist.init(self.mixer)
+        self.scheduler.start()
+
+    def shutdown(self) -> None:
+        self.scheduler.stop()
+        if self.mixer is not pygame.mixer: self.mixer.close()
+        if self._pcm is not None: self._pcm.release_all()
+
+    # ----- Sonidos en memoria -----
+    def _sound(self, path: str) -> pygame.mixer.Sound:
+        with self._lock:
+            snd = self._sounds.get(path)
+            if snd is not None:
+                self._sounds.move_to_end(path)
+                return snd
+        ref = None
+        if self._pcm is not None:
+            # La referencia marca el clip como en uso para las otras instancias (pcm_store.trim)
+            ref = self._pcm.acquire(path)
+            snd = self._make_sound(ref.pcm)
+        else:
+            snd = pygame.mixer.Sound(path)
+        evicted = []
+        with self._lock:
+            self._sounds[path] = snd
+            if ref is not None:
+                old = self._refs.pop(path, None)
+                if old is not None: evicted.append(old)
+                self._refs[path] = ref
+            while len(self._sounds) > SOUND_CACHE_SIZE:
+                gone, _ = self._sounds.popitem(last=False)
+                if gone in self._refs: evicted.append(self._refs.pop(gone))
+        for old in evicted:
+            self._pcm.release(old)
+        return snd
+
+    def _make_sound(self, pcm):
+        # SoftMixer apunta al array (mmap compartido); pygame copia el PCM a su propio buffer
+        if self.mixer is pygame.mixer:
+            return pygame.sndarray.make_sound(pcm)
+        return self.mixer.Sound(pcm)
+
+    def _load_track(self, path: str) -> pygame.mixer.Sound:
+        """Pistas largas: sin pasar por la LRU de efectos (solo viven la actual y la siguiente)."""
+        if self._pcm is not None:
+            return self._make_sound(self._pcm.load(path))
+        return pygame.mixer.Sound(path)
+
+    def preload(self, paths) -> None:
+        """Decodifica de antemano (llamar fuera del hilo de Tk)."""
+        for path in paths:
+            try: self._sound(path)
+            except Exception: pass
+        if self._pcm is not None: self._pcm.save()
+
+    def analyze(self, paths) -> None:
+        """Deja PCM, análisis y envolvente de nivel en la caché sin retener Sounds (fuera del hilo de Tk)."""
+        if self._pcm is None:
+            return
+        for path in paths:
+            try: self._pcm.cache.warm(path)
+            except Exception: pass
+        self._pcm.save()
+
+    def forget(self, path: str) -> None:
+        """Invalida lo decodificado de `path` (y las macros que lo usan) tras un cambio en disco."""
+        with self._lock:
+            self._sounds.pop(path, None)
+            ref = self._refs.pop(path, None)
+            for key in [k for k in self._macros if any(layer[1] == path for layer in k)]:
+                del self._macros[key]
+            for key in [k for k in self._loop_bufs if k[0] == path]:
+                del self._loop_bufs[key]
+            for key in [k for k in self._pools if path in k[0]]:
+                del self._pools[key]
+        if ref is not None:
+            self._pcm.release(ref)
+
+    # ----- Macros -----
+    def build_macro(self, layers: list[tuple[float, str, float]]) -> pygame.mixer.Sound:
+        """Mezcla (offset_s, ruta, ganancia) con NumPy en un solo buffer; queda cacheado."""
+        key = tuple(layers)
+        with self._lock:
+            snd = self._macros.get(key)
+        if snd is not None:
+            return snd
+        if self._pcm is None:
+            raise RuntimeError("las macros necesitan numpy")
+        from mixdown import mix, voice, to_int16
+        rate, _size, channels = self.mixer.get_init()
+        voices = [voice(int(round(t * rate)), self._pcm.load(path), gain) for t, path, gain in layers]
+        snd = self._make_sound(to_int16(mix(voices, channels)))
+        with self._lock:
+            self._macros[key] = snd
+        return snd
+
+    def prepare_macros(self, macros) -> None:
+        """Pre-mezcla varias macros (llamar fuera del hilo de Tk) y descarta las que ya no se usan."""
+        keep = set()
+        for layers in macros:
+            try: self.build_macro(layers); keep.add(tuple(layers))
+            except Exception: pass
+        with self._lock:
+            for key in [k for k in self._macros if k not in keep]:
+                del self._macros[key]
+        if self._pcm is not None: self._pcm.save()
+
+    def _build_macro_async(self, layers: list[tuple[float, str, float]]) -> None:
+        key = tuple(layers)
+        with self._lock:
+            if key in self._macro_jobs:
+                return
+            self._macro_jobs.add(key)
+        def work():
+            try: self.build_macro(layers)
+            except Exception as e: self.events.put(("error", "play_macro", str(e)))
+            finally:
+                with self._lock: self._macro_jobs.discard(key)
+        threading.Thread(target=work, name="macro", daemon=True).start()
+
+    # ----- Variaciones -----
+    def build_pool(self, pool: dict) -> list[tuple]:
+        """Pre-renderiza las variantes de un bloque "pool" (archivo × tono); quedan cacheadas.
+
+        Van intercaladas por tono y luego por archivo, así el round robin alterna archivos. Sin
+        numpy no hay remuestreo: solo los archivos tal cual.
+        """
+        key = pool_key(pool)
+        with self._lock:
+            hit = self._pools.get(key)
+        if hit is not None:
+            return hit
+        files, cents, variants = key
+        variants_out = []
+        if self._pcm is None:
+            variants_out = [(path, 0, pygame.mixer.Sound(path)) for path in files]
+        else:
+            from mixdown import resample
+            pcms = [self._pcm.load(path) for path in files]
+            for offset in pool_offsets(cents, variants):
+                for path, pcm in zip(files, pcms):
+                    variants_out.append((path, offset, self._make_sound(
+                        resample(pcm, 2 ** (offset / 1200)) if offset else pcm)))
+        with self._lock:
+            self._pools[key] = variants_out
+        return variants_out
+
+    def prepare_pools(self, pools) -> None:
+        """Pre-renderiza las variaciones del perfil (fuera del hilo de Tk) y descarta las que ya no se usan."""
+        keep = set()
+        for pool in pools:
+            try: self.build_pool(pool); keep.add(pool_key(pool))
+            except Exception: pass
+        with self._lock:
+            for key in [k for k in self._pools if k not in keep]:
+                del self._pools[key]
+                self._pool_pos.pop(key, None)
+        if self._pcm is not None: self._pcm.save()
+
+    def _build_pool_async(self, pool: dict) -> None:
+        key = pool_key(pool)
+        with self._lock:
+            if key in self._pool_jobs:
+                return
+            self._pool_jobs.add(key)
+        def work():
+            try: self.build_pool(pool)
+            except Exception as e: self.events.put(("error", "play_pool", str(e)))
+            finally:
+                with self._lock: self._pool_jobs.discard(key)
+        threading.Thread(target=work, name="pool", daemon=True).start()
+
+    def play_pool(self, pool: dict, role: str = "effect", group: tuple | None = None,
+                  bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        """Una variante del pool como capa polifónica; la ganancia varía al azar hasta -gain_db."""
+        key = pool_key(pool)
+        variants = self._pools.get(key)
+        if variants is None:
+            # Sin preparar todavía (perfil recién cargado, archivo que apareció o cambió): se
+            # renderiza en otro hilo y mientras tanto se alternan los archivos tal cual
+            self._build_pool_async(pool)
+            variants = [(path, 0, None) for path in key[0]]
+        order = pool.get("order", POOL_DEFAULTS["order"])
+        with self._lock:
+            last, n = self._pool_pos.get(key, -1), len(variants)
+            if order == "random" and n > 1:
+                i = random.randrange(n - 1 if last >= 0 else n)
+                if 0 <= last <= i: i += 1         # nunca la misma dos veces seguidas
+            else:
+                i = (last + 1) % n
+            self._pool_pos[key] = i
+        path, offset, snd = variants[i]
+        if snd is None:
+            snd = self._sound(path)
+        spread = float(pool.get("gain_db", 0.0) or 0.0)
+        gain = 10 ** (random.uniform(-spread, 0.0) / 20.0) if spread else 1.0
+        self._choke(group)
+        self._play_sound(snd, gain, path, role, group, bus, mix)
+
+    # ----- Comandos -----
+    def _gain(self, gain: float, bus: str) -> float:
+        return min(1.0, gain * self._buses.get(bus, 1.0) * self.volume)
+
+    def _set_level(self, channel, gain: float, bus: str, pan: float = 0.0) -> None:
+        level = self._gain(gain, bus)
+        if pan: channel.set_volume(*pan_levels(level, pan))
+        else: channel.set_volume(level)
+
+    def _end_main(self) -> None:
+        """Suelta el clip principal anterior si sonaba por un canal (con _lock tomado)."""
+        if self._main is not None:
+            channel, snd, release = self._main
+            if channel.get_sound() is snd:
+                channel.fadeout(PLAY_FADE_MS if release is None else release)
+            self._main = None
+
+    def play(self, path: str, role: str = "effect", bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        """Reemplaza lo que esté sonando. Lanza la excepción de pygame si no se puede reproducir."""
+        gain, pan, attack, release = mix_params(mix)
+        if pan or attack or release is not None:
+            # mixer.music no tiene paneo ni buffer propio: el clip va por un canal y se reemplaza igual
+            snd = self._sound(path)
+            with self._lock:
+                self._music_gen += 1
+                if self.mixer.music.get_busy(): self.mixer.music.fadeout(PLAY_FADE_MS)
+                self._end_main()
+                channel = self._start_voice(snd, gain, role, bus, pan, release, attack)
+                if channel is not None:
+                    self._main, self._current = (channel, snd, release), path
+            self.events.put(("play", path))
+            return
+        with self._lock:
+            self._end_main()
+            self._music_gen += 1
+            gen, fading = self._music_gen, self.mixer.music.get_busy()
+            if fading: self.mixer.music.fadeout(PLAY_FADE_MS)
+        if fading:
+            time.sleep(PLAY_FADE_MS / 1000)      # fuera del lock: el resto del motor sigue respondiendo
+        with self._lock:
+            if gen != self._music_gen:
+                return                           # otro play o un stop llegó durante el fundido
+            self.mixer.music.load(path)
+            self._music_bus, self._music_gain = bus, gain
+            self.mixer.music.set_volume(self._gain(gain, bus))
+            self._set_role(getattr(self.mixer.music, "channel", None), role)
+            self.mixer.music.play()
+            self._current = path
+        self.events.put(("play", path))
+
+    def play_voice(self, path: str, gain: float = 1.0, role: str = "effect", group: tuple | None = None,
+                   bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        """Capa polifónica: suena encima de lo que ya esté sonando (salvo su propio grupo)."""
+        snd = self._sound(path)
+        self._choke(group)
+        self._play_sound(snd, gain, path, role, group, bus, mix)
+
+    def play_macro(self, layers: list[tuple[float, str, float]], role: str = "effect",
+                   group: tuple | None = None, bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        with self._lock:
+            snd = self._macros.get(tuple(layers))
+        gain = 1.0
+        if snd is None:
+            if self._pcm is None:
+                raise RuntimeError("las macros necesitan numpy")
+            # Sin mezclar todavía: se mezcla en otro hilo y mientras tanto suena la primera capa
+            self._build_macro_async(layers)
+            _t, path, gain = min(layers, key=lambda layer: layer[0])
+            snd = self._sound(path)
+        self._choke(group)
+        self._play_sound(snd, gain, layers[0][1], role, group, bus, mix)
+
+    @staticmethod
+    def _set_role(channel, role: str) -> None:
+        if hasattr(channel, "role"):     # solo los canales de soft_mixer
+            channel.role = role
+
+    def _start_voice(self, snd: pygame.mixer.Sound, gain: float, role: str, bus: str, pan: float = 0.0,
+                     release: int | None = None, attack: int = 0):
+        """Arranca `snd` en un canal libre y lo anota en _voices (con _lock tomado); None si no hay canal."""
+        channel = self.mixer.find_channel()
+        if channel is None:
+            return None
+        self._set_role(channel, role)
+        self._set_level(channel, gain, bus, pan)
+        channel.play(snd, fade_ms=attack)
+        self._voices = [v for v in self._voices if v.channel.get_busy() and v.channel is not channel]
+        self._voices.append(_Voice(channel, gain, bus, pan, release))
+        return channel
+
+    def _play_sound(self, snd: pygame.mixer.Sound, gain: float, path: str, role: str = "effect",
+                    group: tuple | None = None, bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        m_gain, pan, attack, release = mix_params(mix)
+        with self._lock:
+            channel = self._start_voice(snd, gain * m_gain, role, bus, pan, release, attack)
+            if channel is None:
+                return
+            if group:
+                self._join(group[0], channel, snd)
+        self.events.put(("play", path))
+
+    # ----- Grupos choke / exclusivos -----
+    def _join(self, gid: str, channel, what) -> None:
+        """Anota una voz en su grupo (con _lock tomado); de paso descarta las que ya terminaron."""
+        self._groups[gid] = [(ch, w) for ch, w in self._groups.get(gid, ())
+                             if (ch is None and self.looper.active(w)) or (ch is not None and ch.get_sound() is w)]
+        self._groups[gid].append((channel, what))
+
+    def _choke(self, group: tuple | None) -> None:
+        """Corta lo que esté sonando del grupo y los pasos de secuencia que aún no salieron."""
+        if not group:
+            return
+        gid, mode = group
+        fade = GROUP_FADES.get(mode, CHOKE_FADE_MS)
+        with self._lock:
+            voices = self._groups.pop(gid, ())
+            self._group_gen[gid] = self._group_gen.get(gid, 0) + 1
+            for channel, what in voices:
+                if channel is not None and channel.get_sound() is what:
+                    channel.fadeout(fade)
+        for channel, key in voices:
+            if channel is None and self.looper.stop(key, fade):
+                self.events.put(("loop", key, False))
+
+    def play_sequence(self, steps: list[tuple[float, str, float]], role: str = "effect",
+                      group: tuple | None = None, bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        """steps: (segundos, ruta, ganancia). Los archivos se cargan antes de fijar el t0; si alguno
+        no está en memoria (disparo antes de la precarga) eso pasa en un hilo aparte, no en el llamador."""
+        with self._lock:
+            ready = all(path in self._sounds for _t, path, _g in steps)
+        if ready:
+            self._start_sequence(steps, role, group, bus, mix)
+        else:
+            threading.Thread(target=self._start_sequence, args=(steps, role, group, bus, mix), daemon=True).start()
+
+    def _start_sequence(self, steps: list[tuple[float, str, float]], role: str, group: tuple | None,
+                        bus: str, mix: dict | None) -> None:
+        failed = set()
+        for path in dict.fromkeys(path for _t, path, _g in steps):
+            try: self._sound(path)
+            except Exception as e:
+                failed.add(path)
+                self.events.put(("error", "play_sequence", str(e)))
+        steps = [step for step in steps if step[1] not in failed]
+        self._choke(group)
+        gen = self._group_gen.get(group[0]) if group else None
+        t0 = clock()
+        for t, path, gain in steps:
+            self.scheduler.at(t0 + max(0.0, t), self._fire_step, path, gain, role, group, gen, bus, mix,
+                              tag=SEQUENCE_TAG)
+
+    def _fire_step(self, path: str, gain: float, role: str = "effect", group: tuple | None = None,
+                   gen: int | None = None, bus: str = DEFAULT_BUS, mix: dict | None = None):
+        if group and self._group_gen.get(group[0]) != gen:
+            return          # otro miembro del grupo la cortó
+        try:
+            snd = self._sound(path)
+            self._play_sound(snd, gain, path, role, group, bus, mix)
+        except pygame.error:
+            pass
+
+    # ----- Loops -----
+    def _loop_sounds(self, path: str, start: float, end: float | None) -> tuple:
+        key = (path, start, end)
+        with self._lock:
+            hit = self._loop_bufs.get(key)
+        if hit is not None:
+            return hit
+        if self._pcm is None or (start == 0 and end is None):
+            sounds = (None, self._sound(path))          # archivo completo: el buffer tal cual
+        else:
+            from looper import loop_buffers
+            intro, seg = loop_buffers(self._pcm.load(path), self.mixer.get_init()[0], start, end)
+            sounds = (self._make_sound(intro) if intro is not None else None, self._make_sound(seg))
+        with self._lock:
+            self._loop_bufs[key] = sounds
+        return sounds
+
+    def prepare_loops(self, loops) -> None:
+        """Corta de antemano (ruta, inicio, fin) de los loops (fuera del hilo de Tk) y descarta los que ya no se usan."""
+        keep = set()
+        for path, start, end in loops:
+            try: self._loop_sounds(path, start, end); keep.add((path, start, end))
+            except Exception: pass
+        with self._lock:
+            for key in [k for k in self._loop_bufs if k not in keep]:
+                del self._loop_bufs[key]
+        if self._pcm is not None: self._pcm.save()
+
+    def play_loop(self, key, path: str, start: float = 0.0, end: float | None = None,
+                  role: str = "effect", group: tuple | None = None, bus: str = DEFAULT_BUS,
+                  mix: dict | None = None) -> None:
+        gain, pan, attack, release = mix_params(mix)
+        intro, seg = self._loop_sounds(path, start, end)
+        self._choke(group)
+        with self._lock:
+            # Sin robar canales: un loop no corta un efecto que ya está sonando
+            channel = self.mixer.find_channel()
+            if channel is None:
+                self.events.put(("error", "play_loop", "sin canales libres"))
+                return
+            self._set_role(channel, role)
+            self._set_level(channel, gain, bus, pan)
+            self.looper.start(key, channel, intro, seg, fade_ms=attack)
+            self._voices = [v for v in self._voices if v.channel.get_busy() and v.channel is not channel]
+            self._voices.append(_Voice(channel, gain, bus, pan, release))
+            self._loop_release[key] = LOOP_STOP_FADE_MS if release is None else release
+            if group:
+                self._join(group[0], None, key)
+        self.events.put(("loop", key, True))
+
+    def stop_loop(self, key) -> None:
+        if self.looper.stop(key, self._loop_release.pop(key, LOOP_STOP_FADE_MS)):
+            self.events.put(("loop", key, False))
+
+    def loop_active(self, key) -> bool:
+        return self.looper.active(key)
+
+    def play_playlist(self, key, files: list[str], shuffle: bool = False, repeat: str = "all",
+                      crossfade_ms: int = 0, role: str = "bed", bus: str = "music", mix: dict | None = None) -> None:
+        for channel in self.playlist.channels:
+            self._set_role(channel, role)
+        self._playlist_bus, self._playlist_gain = bus, mix_params(mix)[0]
+        self.playlist.set_volume(self._gain(self._playlist_gain, bus))
+        self.playlist.start(key, files, shuffle, repeat, crossfade_ms)
+
+    def stop_playlist(self) -> None:
+        self.playlist.stop()
+        self.events.put(("playlist", None))
+
+    # ----- Ducking -----
+    def set_ducking(self, enabled: bool, depth_db: float = -12.0, attack_ms: float = 80.0,
+                    release_ms: float = 400.0) -> bool:
+        """Activa el ducking de fondos. Solo con el mezclador NumPy; devuelve si quedó activo."""
+        if self.backend != "numpy":
+            return False
+        if not enabled:
+            self.mixer.ducker = None
+            return False
+        if self.mixer.ducker is None:
+            from bus_fx import Ducker
+            self.mixer.ducker = Ducker(self.mixer.rate, depth_db, attack_ms, release_ms)
+        else:
+            self.mixer.ducker.configure(depth_db, attack_ms, release_ms)
+        return True
+
+    # ----- Limitador -----
+    def set_limiter(self, enabled: bool, ceiling_db: float = -1.0) -> bool:
+        """Limitador de picos del bus master (solo mezclador NumPy); devuelve si quedó activo."""
+        if self.backend != "numpy":
+            return False
+        if not enabled:
+            self.mixer.limiter = None
+        elif self.mixer.limiter is None:
+            from bus_fx import Limiter
+            self.mixer.limiter = Limiter(self.mixer.rate, self.mixer.channels, ceiling_db)
+        else:
+            self.mixer.limiter.set_ceiling(ceiling_db)
+        return enabled
+
+    def gain_reduction_db(self) -> float | None:
+        """Reducción del limitador en el último bloque; None si no hay limitador."""
+        limiter = getattr(self.mixer, "limiter", None)
+        return None if limiter is None else limiter.gr_db
+
+    def preview(self, path: str) -> None:
+        with self._lock:
+            if self.mixer.music.get_busy(): self.mixer.music.fadeout(PLAY_FADE_MS)
+            self.mixer.music.load(path)
+            self.mixer.music.set_volume(self.volume)
+            self.mixer.music.play()
+
+    def end_preview(self) -> None:
+        with self._lock:
+            try: self.mixer.music.fadeout(PREVIEW_FADE_MS)
+            except pygame.error: pass
+
+    def stop(self, fade_ms: int = STOP_FADE_MS) -> None:
+        self.scheduler.cancel(SEQUENCE_TAG)
+        self.playlist.stop(fade_ms)
+        if fade_ms:
+            for key, release in list(self._loop_release.items()):
+                self.looper.stop(key, release)
+        self._loop_release.clear()
+        self.looper.stop_all(fade_ms)
+        with self._lock:
+            self._music_gen += 1
+            try:
+                if self.mixer.music.get_busy(): self.mixer.music.fadeout(fade_ms)
+                if fade_ms:
+                    # Primero las liberaciones propias: un canal que ya se está apagando no cambia de fundido
+                    for v in self._voices:
+                        if v.release_ms is not None and v.channel.get_busy(): v.channel.fadeout(v.release_ms)
+                self.mixer.fadeout(fade_ms)
+            except pygame.error:
+                return
+            self._current = self._main = None
+            self._voices.clear()
+            self._groups.clear()
+        self.events.put(("stop",))
+
+    def now_playing(self) -> str | None:
+        with self._lock:
+            try:
+                if self.mixer.music.get_busy(): return self._current
+                if self._main is not None and self._main[0].get_sound() is self._main[1]: return self._current
+                return self.playlist.current
+            except pygame.error:
+                return None
+
+    def set_volume(self, volume: float, notify: bool = False) -> None:
+        """volume en 0..1. notify=True avisa a la UI (cuando el cambio no vino del slider)."""
+        self.volume = min(1.0, max(0.0, float(volume)))
+        self._apply_gains()
+        if notify:
+            self.events.put(("volume", self.volume))
+
+    def set_buses(self, gains: dict[str, float]) -> None:
+        """Ganancia de varios buses a la vez (0..1, 0 = mute): una sola pasada por las voces activas."""
+        with self._lock:
+            for bus, gain in gains.items():
+                if bus in self._buses:
+                    self._buses[bus] = min(1.0, max(0.0, float(gain)))
+        self._apply_gains()
+
+    def _apply_gains(self) -> None:
+        with self._lock:
+            try: self.mixer.music.set_volume(self._gain(self._music_gain, self._music_bus))
+            except pygame.error: pass
+            for v in self._voices:
+                if v.channel.get_busy(): self._set_level(v.channel, v.gain, v.bus, v.pan)
+        self.playlist.set_volume(self._gain(self._playlist_gain, self._playlist_bus))
@@ -0,0 +1,194 @@
+# audio_probe.py
+# Lectura rápida de metadatos de audio (WAV/MP3) sin decodificar: solo cabeceras.
+# Usa mmap + memoryview, así que el costo no depende del largo del clip.
+from __future__ import annotations
+import os, mmap, struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+
+class AudioInfo(NamedTuple):
+    format: str          # "wav" | "mp3"
+    duration_us: int     # duración en microsegundos
+    rate: int            # Hz
+    channels: int
+    bits: int            # profundidad en bits (0 en formatos comprimidos)
+    bitrate_kbps: int    # solo MP3 (promedio si es VBR); 0 en WAV
+
+
+class ProbeError(ValueError):
+    pass
+
+
+# ----- WAV (RIFF) -----
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def _probe_wav(mv: memoryview) -> AudioInfo:
+    size = len(mv)
+    pos = 12
+    fmt = None
+    data_len = None
+    while pos + 8 <= size:
+        cid = bytes(mv[pos:pos + 4])
+        clen = struct.unpack_from("<I", mv, pos + 4)[0]
+        body = pos + 8
+        if cid == b"fmt ":
+            if clen < 16:
+                raise ProbeError("fmt chunk demasiado corto")
+            tag, ch, rate, _byte_rate, align, bits = struct.unpack_from("<HHIIHH", mv, body)
+            if tag == _WAVE_FORMAT_EXTENSIBLE and clen >= 40:
+                tag = struct.unpack_from("<H", mv, body + 24)[0]
+            fmt = (tag, ch, rate, align, bits)
+        elif cid == b"data":
+            # Archivos escritos en streaming pueden traer un tamaño inválido
+            data_len = min(clen, size - body)
+            if fmt is not None:
+                break
+        pos = body + clen + (clen & 1)
+    if fmt is None or data_len is None:
+        raise ProbeError("WAV sin chunks fmt/data")
+    tag, ch, rate, align, bits = fmt
+    if tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_FLOAT) or not rate or not align:
+        raise ProbeError(f"WAV no soportado (formato 0x{tag:04x})")
+    frames = data_len // align
+    return AudioInfo("wav", frames * 1_000_000 // rate, rate, ch, bits, 0)
+
+
+# ----- MP3 (MPEG audio) -----
+# bitrates en kbps: [version_mpeg1][layer]
+_BITRATES = {
+    (True, 1):  (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2):  (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3):  (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_SYNC_SCAN = 256 * 1024
+
+def _parse_frame_header(mv: memoryview, pos: int):
+    """Devuelve (version, layer, bitrate_kbps, rate, channels, samples, frame_len) o None."""
+    if pos + 4 > len(mv):
+        return None
+    b0, b1, b2, b3 = mv[pos], mv[pos + 1], mv[pos + 2], mv[pos + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 3
+    layer = 4 - ((b1 >> 1) & 3)
+    br_idx = b2 >> 4
+    sr_idx = (b2 >> 2) & 3
+    if version == 1 or layer == 4 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][br_idx]
+    rate = _RATES[version][sr_idx]
+    pad = (b2 >> 1) & 1
+    channels = 1 if (b3 >> 6) == 3 else 2
+    if layer == 1:
+        samples = 384
+        frame_len = (12 * bitrate * 1000 // rate + pad) * 4
+    elif layer == 3 and not mpeg1:
+        samples = 576
+        frame_len = 72 * bitrate * 1000 // rate + pad
+    else:
+        samples = 1152
+        frame_len = 144 * bitrate * 1000 // rate + pad
+    return version, layer, bitrate, rate, channels, samples, frame_len
+
+def _skip_id3v2(mv: memoryview) -> int:
+    if len(mv) >= 10 and bytes(mv[0:3]) == b"ID3":
+        s = mv[6:10]
+        size = (s[0] << 21) | (s[1] << 14) | (s[2] << 7) | s[3]
+        footer = 10 if mv[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+def _find_first_frame(mm: mmap.mmap, mv: memoryview, start: int):
+    end = min(len(mv), start + _SYNC_SCAN)
+    pos = mm.find(b"\xff", start, end)
+    while pos != -1:
+        hdr = _parse_frame_header(mv, pos)
+        if hdr is not None:
+            nxt = pos + hdr[6]
+            # Confirmamos con el frame siguiente para no caer en falsos sync
+            if nxt + 4 > len(mv) or _parse_frame_header(mv, nxt) is not None:
+                return pos, hdr
+        pos = mm.find(b"\xff", pos + 1, end)
+    return None
+
+def _probe_mp3(mm: mmap.mmap, mv: memoryview) -> AudioInfo:
+    start = _skip_id3v2(mv)
+    found = _find_first_frame(mm, mv, start)
+    if found is None:
+        raise ProbeError("No se encontró un frame MPEG válido")
+    pos, (version, layer, bitrate, rate, channels, samples, _flen) = found
+
+    n_frames = None
+    # Xing/Info (LAME) justo después del side info
+    if version == 3:
+        side = 17 if channels == 1 else 32
+    else:
+        side = 9 if channels == 1 else 17
+    x = pos + 4 + side
+    if x + 12 <= len(mv) and bytes(mv[x:x + 4]) in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", mv, x + 4)[0]
+        if flags & 1:
+            n_frames = struct.unpack_from(">I", mv, x + 8)[0]
+    # VBRI (Fraunhofer) siempre 32 bytes después de la cabecera
+    v = pos + 4 + 32
+    if n_frames is None and v + 18 <= len(mv) and bytes(mv[v:v + 4]) == b"VBRI":
+        n_frames = struct.unpack_from(">I", mv, v + 14)[0]
+
+    end = len(mv)
+    if end >= 128 and bytes(mv[end - 128:end - 125]) == b"TAG":
+        end -= 128
+    audio_bytes = max(0, end - pos)
+
+    if n_frames:
+        duration_us = n_frames * samples * 1_000_000 // rate
+        avg = int(audio_bytes * 8 * 1_000_000 / duration_us / 1000) if duration_us else bitrate
+        return AudioInfo("mp3", duration_us, rate, channels, 0, avg)
+    # CBR: estimación por tamaño
+    duration_us = audio_bytes * 8 * 1000 // bitrate
+    return AudioInfo("mp3", duration_us, rate, channels, 0, bitrate)
+
+
+# ----- API -----
+def probe(path: str) -> AudioInfo:
+    """Lee solo cabeceras; lanza ProbeError si el archivo no es WAV/MP3 válido."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < 12:
+            raise ProbeError("Archivo vacío o demasiado corto")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(mm)
+        try:
+            if bytes(mv[0:4]) == b"RIFF" and bytes(mv[8:12]) == b"WAVE":
+                return _probe_wav(mv)
+            return _probe_mp3(mm, mv)
+        except (struct.error, IndexError) as e:
+            raise ProbeError(f"Cabecera corrupta: {e}") from e
+        finally:
+            mv.release()
+            mm.close()
+
+def try_probe(path: str) -> AudioInfo | None:
+    try:
+        return probe(path)
+    except (OSError, ProbeError):
+        return None
+
+def probe_many(paths, workers: int = 8) -> dict[str, AudioInfo | None]:
+    """Probe en paralelo (I/O de cabeceras: los hilos alcanzan, no hace falta procesos)."""
+    paths = list(paths)
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as pool:
+        return dict(zip(paths, pool.map(try_probe, paths)))
+
+def format_duration(duration_us: int) -> str:
+    secs = duration_us / 1_000_000
+    m, s = divmod(secs, 60)
+    return f"{int(m)}:{s:04.1f}"
@@ -0,0 +1,227 @@
+# board_cli.py
+# Herramientas de línea de comandos (sin pantalla) para preparar máquinas de show:
+#   python board_cli.py validate [perfiles…] [--migrate]   valida/migra en paralelo
+#   python board_cli.py warm PERFIL                         pre-calienta cachés PCM y análisis
+#   python board_cli.py stats PERFIL                        resumen del perfil
+#   python board_cli.py render PERFIL GUION -o salida.wav  mezcla offline un guion de disparos
+#   python board_cli.py trim --max-mb 500                   achica la caché PCM (respeta lo que está en uso)
+#   python board_cli.py bench                               voces del mezclador NumPy y costo del limitador
+# Sin perfiles, validate revisa button_config.json y todo configs/*.json.
+from __future__ import annotations
+import os, sys, glob, time, argparse
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from profile_io import read_profile, save_button_config, validate_profile, grid_shape, iter_buttons, profile_resolver
+from audio_probe import probe_many, format_duration
+
+DEFAULT_CONFIG_FILE = "button_config.json"
+CONFIGS_DIR = "configs"
+
+
+def _default_profiles() -> list[str]:
+    found = sorted(glob.glob(os.path.join(CONFIGS_DIR, "*.json")))
+    return ([DEFAULT_CONFIG_FILE] if os.path.exists(DEFAULT_CONFIG_FILE) else []) + found
+
+def _profile_files(cfg: dict, path: str) -> list[str]:
+    resolver = profile_resolver(cfg, path)
+    return sorted({resolver.resolve(item["file"]) for _, _, _, item in iter_buttons(cfg) if item.get("file")})
+
+
+# ----- validate -----
+def _check_one(path: str, migrate: bool, check_files: bool) -> tuple[str, list[str], bool]:
+    try:
+        cfg, changed = read_profile(path)
+    except (OSError, ValueError) as e:
+        return path, [f"no se puede leer: {e}"], False
+    problems = validate_profile(cfg, path, check_files)
+    if changed and migrate:
+        save_button_config(cfg, path)
+    return path, problems, changed
+
+def cmd_validate(args) -> int:
+    paths = args.profiles or _default_profiles()
+    if not paths:
+        print("No hay perfiles para validar"); return 0
+    bad = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(_check_one, p, args.migrate, not args.no_files) for p in paths]
+        for fut in as_completed(futures):
+            path, problems, changed = fut.result()
+            tag = "ERROR" if problems else "OK"
+            note = (" (migrado)" if args.migrate else " (requiere migración)") if changed else ""
+            print(f"[{tag}] {path}{note}")
+            for p in problems:
+                print(f"    - {p}")
+            bad += bool(problems)
+    print(f"{len(paths)} perfiles, {bad} con problemas")
+    return 1 if bad else 0
+
+
+# ----- warm -----
+def _warm_one(path: str, cache_dir: str):
+    from pcm_cache import PcmCache, init_decoder
+    init_decoder(headless=True)
+    cache = PcmCache(cache_dir)
+    decoded = cache.warm(path)
+    return path, decoded, cache.key(path), cache.analysis(path)
+
+def cmd_warm(args) -> int:
+    from pcm_cache import PcmCache
+    cfg, _ = read_profile(args.profile)
+    files = [f for f in _profile_files(cfg, args.profile) if os.path.isfile(f)]
+    cache = PcmCache(args.cache_dir)
+    decoded = failed = 0
+    # Un proceso por núcleo: decodificar es CPU puro y pygame no libera el GIL al hacerlo
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(_warm_one, f, args.cache_dir): f for f in files}
+        for fut in as_completed(futures):
+            try:
+                path, was_decoded, key, info = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] {futures[fut]}: {e}"); continue
+            cache.put_analysis(key, info)
+            decoded += was_decoded
+            if args.verbose:
+                print(f"[{'NEW' if was_decoded else 'OK '}] {os.path.basename(path)}")
+    cache.save()
+    print(f"{len(files)} archivos: {decoded} decodificados, {len(files) - decoded - failed} ya en caché, "
+          f"{failed} con error · caché {cache.size_bytes() / 2**20:.1f} MB")
+    return 1 if failed else 0
+
+
+# ----- stats -----
+def cmd_stats(args) -> int:
+    cfg, changed = read_profile(args.profile)
+    rows, cols, banks = grid_shape(cfg)
+    meta = cfg.get("__meta__", {})
+    buttons = list(iter_buttons(cfg))
+    files = _profile_files(cfg, args.profile)
+    present = [f for f in files if os.path.isfile(f)]
+    infos = [i for i in probe_many(present).values() if i]
+    per_bank = Counter(b for b, _, _, item in buttons if item.get("file"))
+    print(f"Perfil:     {args.profile}{' (requiere migración)' if changed else ''}")
+    print(f"Grilla:     {rows}x{cols} · {banks} banco(s) · idioma {meta.get('lang', 'es')} · volumen {meta.get('volume', 80)}")
+    print(f"Asignados:  {sum(per_bank.values())}/{rows * cols * banks} botones · "
+          + ", ".join(f"banco {b}: {n}" for b, n in sorted(per_bank.items())))
+    print(f"Archivos:   {len(files)} distintos · {len(files) - len(present)} faltantes")
+    if infos:
+        fmts = Counter(i.format for i in infos)
+        total = sum(i.duration_us for i in infos)
+        longest = max(i.duration_us for i in infos)
+        print(f"Audio:      {format_duration(total)} en total · el más largo {format_duration(longest)} · "
+              + ", ".join(f"{n} {f}" for f, n in fmts.most_common()))
+    hotkeys = sum(1 for _, _, _, item in buttons if item.get("hotkey"))
+    if hotkeys:
+        print(f"Atajos:     {hotkeys} personalizados")
+    if meta.get("sound_roots"):
+        print("Raíces:     " + ", ".join(f"@{k}={v}" for k, v in meta["sound_roots"].items()))
+    if os.path.isdir(args.cache_dir):
+        from pcm_cache import PcmCache
+        from pcm_store import PcmStore
+        cache = PcmCache(args.cache_dir)
+        store = PcmStore(cache)
+        cached = [f for f in present if cache.has(f)]
+        users = store.all_users()
+        in_use = sum(1 for f in cached if users.get(cache.key(f)))
+        print(f"Caché PCM:  {len(cached)}/{len(present)} archivos · {cache.size_bytes() / 2**20:.1f} MB"
+              + (f" · {in_use} abiertos por otras instancias" if in_use else ""))
+    return 0
+
+
+# ----- render -----
+def cmd_render(args) -> int:
+    from offline_render import load_script, render, write_wav
+    from pcm_cache import PcmCache, MIX_RATE, init_decoder
+    init_decoder(headless=True)
+    cfg, _ = read_profile(args.profile)
+    triggers = load_script(args.script)
+    t0 = time.perf_counter()
+    audio, warnings = render(cfg, args.profile, triggers, PcmCache(args.cache_dir), exclusive=not args.poly)
+    write_wav(args.output, audio, MIX_RATE)
+    elapsed = time.perf_counter() - t0
+    for w in warnings:
+        print(f"[AVISO] {w}")
+    length = len(audio) / MIX_RATE
+    print(f"{args.output}: {len(triggers)} disparos, {length:.2f} s de audio en {elapsed:.2f} s "
+          f"({length / elapsed if elapsed else float('inf'):.0f}x tiempo real)")
+    return 0
+
+
+# ----- trim -----
+def cmd_trim(args) -> int:
+    from pcm_cache import PcmCache
+    from pcm_store import PcmStore
+    cache = PcmCache(args.cache_dir)
+    before = cache.size_bytes()
+    removed = PcmStore(cache).trim(int(args.max_mb * 2**20))
+    print(f"Caché PCM: {len(removed)} clips borrados · {before / 2**20:.1f} MB -> {cache.size_bytes() / 2**20:.1f} MB")
+    return 0
+
+
+# ----- bench -----
+def cmd_bench(args) -> int:
+    from soft_mixer import benchmark
+    counts = [int(n) for n in args.voices.split(",")]
+    results = benchmark(counts, args.seconds, block=args.block)
+    print(f"Bloque de {args.block} frames = {results[0]['budget_ms']:.2f} ms de audio")
+    print(f"{'voces':>6} {'ms/bloque':>10} {'x tiempo real':>14}")
+    for r in results:
+        print(f"{r['voices']:>6} {r['ms_per_block']:>10.3f} {r['realtime_x']:>14.1f}")
+    best = max(r["voices"] * r["realtime_x"] for r in results)
+    print(f"≈ {int(best)} voces por núcleo en tiempo real (sin margen)")
+    from bus_fx import benchmark_limiter
+    lim = benchmark_limiter(args.block, args.seconds)
+    print(f"Limitador:  {lim['ms_per_block']:.3f} ms/bloque · {lim['cpu_pct']:.1f} % del presupuesto de un núcleo")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from pcm_cache import PCM_DIR
+    parser = argparse.ArgumentParser(prog="board_cli", description="Effects Board sin interfaz gráfica")
+    parser.add_argument("--cache-dir", default=PCM_DIR, help=f"carpeta de la caché PCM (por defecto {PCM_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", help="valida (y opcionalmente migra) perfiles")
+    p.add_argument("profiles", nargs="*")
+    p.add_argument("--migrate", action="store_true", help="guarda los perfiles migrados al formato actual")
+    p.add_argument("--no-files", action="store_true", help="no verifica que existan los audios")
+    p.add_argument("-j", "--jobs", type=int, default=8)
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("warm", help="decodifica y analiza los audios de un perfil")
+    p.add_argument("profile")
+    p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 2)
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_warm)
+
+    p = sub.add_parser("stats", help="resumen de un perfil")
+    p.add_argument("profile")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("render", help="mezcla un guion de disparos a un WAV sin dispositivo de audio")
+    p.add_argument("profile")
+    p.add_argument("script", help="JSON lines: {\"t\": s, \"row\": r, \"col\": c}")
+    p.add_argument("-o", "--output", default="render.wav")
+    p.add_argument("--poly", action="store_true", help="superpone los clips en vez de reemplazarlos")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("trim", help="borra los clips menos usados de la caché PCM (no toca los abiertos)")
+    p.add_argument("--max-mb", type=float, required=True)
+    p.set_defaults(func=cmd_trim)
+
+    p = sub.add_parser("bench", help="mide el mezclador NumPy (voces por núcleo en tiempo real)")
+    p.add_argument("--voices", default="8,16,32,64,128", help="cantidades de voces separadas por coma")
+    p.add_argument("--seconds", type=float, default=2.0)
+    p.add_argument("--block", type=int, default=512)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# bus_fx.py
+# Procesos de bus para soft_mixer, calculados por bloque con NumPy (nada de timers de la UI).
+#   Ducker  -> baja las voces de rol "bed" (música de fondo) mientras suena algún efecto
+#   Limiter -> limitador de picos con look-ahead en el bus master (nada pasa del techo)
+from __future__ import annotations
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from profile_io import DUCKING_DEFAULTS, LIMITER_DEFAULTS
+
+DUCK_DEPTH_DB = DUCKING_DEFAULTS["depth_db"]
+DUCK_ATTACK_MS = DUCKING_DEFAULTS["attack_ms"]
+DUCK_RELEASE_MS = DUCKING_DEFAULTS["release_ms"]
+LIMITER_CEILING_DB = LIMITER_DEFAULTS["ceiling_db"]
+LIMITER_LOOKAHEAD_MS = 5.0
+LIMITER_RELEASE_DB_S = 60.0   # recuperación lineal en dB
+
+
+def db_to_gain(db: float) -> float:
+    return float(10 ** (db / 20.0))
+
+
+class Ducker:
+    """Envolvente de ganancia de los fondos: un polo hacia 1.0 o hacia la profundidad.
+
+    attack es lo que tarda en bajar cuando entra un efecto y release lo que tarda en volver
+    cuando ya no queda ninguno (constantes de tiempo, ~63 % del recorrido).
+    """
+    def __init__(self, rate: int, depth_db: float = DUCK_DEPTH_DB, attack_ms: float = DUCK_ATTACK_MS,
+                 release_ms: float = DUCK_RELEASE_MS):
+        self.rate = rate
+        self.gain = 1.0
+        self.configure(depth_db, attack_ms, release_ms)
+
+    def configure(self, depth_db: float, attack_ms: float, release_ms: float) -> None:
+        self.depth_db, self.attack_ms, self.release_ms = float(depth_db), float(attack_ms), float(release_ms)
+        self._floor = db_to_gain(min(0.0, self.depth_db))
+        coef = lambda ms: float(np.exp(-1.0 / max(1.0, ms * self.rate / 1000.0)))
+        self._attack, self._release = coef(self.attack_ms), coef(self.release_ms)
+
+    def envelope(self, n: int, active: bool) -> np.ndarray:
+        """Ganancia (n,) para el bloque; avanza el estado aunque no haya fondos sonando."""
+        target = self._floor if active else 1.0
+        if abs(self.gain - target) < 1e-4:
+            self.gain = target
+            return np.full(n, target, dtype=np.float32)
+        coef = self._attack if target < self.gain else self._release
+        env = target + (self.gain - target) * coef ** np.arange(1, n + 1, dtype=np.float32)
+        self.gain = float(env[-1])
+        return env.astype(np.float32, copy=False)
+
+
+class Limiter:
+    """Limitador de picos con look-ahead, en el lugar sobre bloques (frames, canales) en ±1.
+
+    Por bloque y sin bucles por muestra: reducción necesaria en dB por frame -> máximo en una
+    ventana de look-ahead -> liberación lineal en dB (máximo acumulado) -> promedio móvil de la
+    misma longitud, que convierte el escalón en una rampa que llega completa justo en el pico.
+    El audio sale retrasado lookahead_ms; ningún frame supera el techo.
+    """
+    def __init__(self, rate: int, channels: int = 2, ceiling_db: float = LIMITER_CEILING_DB,
+                 lookahead_ms: float = LIMITER_LOOKAHEAD_MS, release_db_s: float = LIMITER_RELEASE_DB_S):
+        self.rate = rate
+        self.ceiling_db = min(0.0, float(ceiling_db))
+        self.lookahead = max(1, int(lookahead_ms * rate / 1000))
+        self.release = release_db_s / rate              # dB por frame
+        self.gr_db = 0.0                                 # reducción máxima del último bloque
+        self._delay = np.zeros((self.lookahead, channels), dtype=np.float32)
+        self._req = np.zeros(self.lookahead, dtype=np.float32)     # reducción pedida, frames previos
+        self._held = np.zeros(self.lookahead, dtype=np.float32)    # tras liberación, frames previos
+
+    def set_ceiling(self, ceiling_db: float) -> None:
+        self.ceiling_db = min(0.0, float(ceiling_db))
+
+    def __call__(self, block: np.ndarray) -> None:
+        n, L = len(block), self.lookahead
+        peak = np.abs(block).max(axis=1)
+        req = np.maximum(0.0, 20.0 * np.log10(np.maximum(peak, 1e-9)) - self.ceiling_db).astype(np.float32)
+        req = np.concatenate((self._req, req))
+        held = sliding_window_view(req, L + 1).max(axis=1)[-n:]       # n valores
+        self._req = req[-L:]
+        ramp = self.release * np.arange(n, dtype=np.float32)
+        rel = np.maximum.accumulate(held + ramp) - ramp
+        rel = np.maximum(rel, self._held[-1] - self.release - ramp)
+        rel = np.concatenate((self._held, rel))
+        csum = np.concatenate(([0.0], np.cumsum(rel, dtype=np.float64)))
+        smooth = (csum[L + 1:] - csum[:-L - 1]) / (L + 1)               # media de L+1 frames
+        self._held = rel[-L:]
+        gain = (10.0 ** (-smooth / 20.0)).astype(np.float32)
+        delayed = np.concatenate((self._delay, block))
+        self._delay = delayed[-L:].copy()
+        block[:] = delayed[:n] * gain[:, None]
+        self.gr_db = float(smooth.max()) if n else 0.0
+
+
+def benchmark_limiter(block: int = 512, seconds: float = 2.0, rate: int = 44100) -> dict:
+    """Costo por bloque del limitador con señal que lo hace trabajar (ruido a +6 dBFS)."""
+    lim = Limiter(rate)
+    rng = np.random.default_rng(0)
+    blocks = [(rng.standard_normal((block, 2)) * 2.0).astype(np.float32) for _ in range(16)]
+    n_blocks = max(1, int(seconds * rate / block))
+    t0 = time.perf_counter()
+    for i in range(n_blocks):
+        lim(blocks[i % len(blocks)])
+    elapsed = time.perf_counter() - t0
+    budget = block * 1000 / rate
+    return {"ms_per_block": elapsed * 1000 / n_blocks, "budget_ms": budget,
+            "cpu_pct": 100 * elapsed * 1000 / n_blocks / budget}
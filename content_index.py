@@ -0,0 +1,150 @@
+# content_index.py
+# Índice por contenido de la librería: detecta duplicados y reubica archivos movidos.
+# Estrategia clásica por etapas: tamaño (stat) -> hash parcial -> hash completo solo si colisiona.
+from __future__ import annotations
+import os, json, hashlib, threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+PARTIAL_BYTES = 64 * 1024
+_CHUNK = 1024 * 1024
+
+
+def fingerprint(path: str) -> str:
+    """'tamaño:hash' usando solo el primer y último bloque de 64 KB."""
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(PARTIAL_BYTES))
+        if size > 2 * PARTIAL_BYTES:
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            h.update(f.read(PARTIAL_BYTES))
+    return f"{size}:{h.hexdigest()}"
+
+def try_fingerprint(path: str) -> str | None:
+    try:
+        return fingerprint(path)
+    except OSError:
+        return None
+
+def full_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fingerprint_size(fp: str) -> int | None:
+    try:
+        return int(fp.split(":", 1)[0])
+    except (ValueError, AttributeError):
+        return None
+
+
+class ContentIndex:
+    """path -> (size, mtime); los hashes se calculan a demanda y se cachean en disco."""
+    def __init__(self, cache_path: str | None = None):
+        self.cache_path = cache_path
+        self._stat: dict[str, tuple[int, int]] = {}
+        self._by_size: dict[int, set[str]] = defaultdict(set)
+        self._by_name: dict[str, set[str]] = defaultdict(set)
+        self._partial: dict[str, tuple[int, int, str]] = {}   # path -> (size, mtime_ns, fp)
+        self._full: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+        if cache_path:
+            self._load_cache()
+
+    def __len__(self):
+        return len(self._stat)
+
+    # ----- Construcción -----
+    def add(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        with self._lock:
+            self._stat[path] = (st.st_size, st.st_mtime_ns)
+            self._by_size[st.st_size].add(path)
+            self._by_name[os.path.basename(path).casefold()].add(path)
+        return True
+
+    def add_many(self, paths) -> int:
+        return sum(1 for p in paths if self.add(p))
+
+    # ----- Hashes (con caché por tamaño+mtime) -----
+    def _cached(self, table, path, fn):
+        size, mtime = self._stat.get(path, (None, None))
+        hit = table.get(path)
+        if hit and hit[0] == size and hit[1] == mtime:
+            return hit[2]
+        try:
+            value = fn(path)
+        except OSError:
+            return None
+        with self._lock:
+            table[path] = (size, mtime, value)
+        return value
+
+    def partial(self, path: str) -> str | None:
+        return self._cached(self._partial, path, fingerprint)
+
+    def full(self, path: str) -> str | None:
+        return self._cached(self._full, path, full_hash)
+
+    # ----- Consultas -----
+    def duplicates(self, workers: int = 4) -> list[list[str]]:
+        """Grupos de archivos con contenido idéntico (confirmado con hash completo)."""
+        same_size = [sorted(ps) for ps in self._by_size.values() if len(ps) > 1]
+        groups = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for paths in same_size:
+                by_partial = defaultdict(list)
+                for p, fp in zip(paths, pool.map(self.partial, paths)):
+                    if fp: by_partial[fp].append(p)
+                for cands in by_partial.values():
+                    if len(cands) < 2: continue
+                    by_full = defaultdict(list)
+                    for p, fh in zip(cands, pool.map(self.full, cands)):
+                        if fh: by_full[fh].append(p)
+                    groups.extend(g for g in by_full.values() if len(g) > 1)
+        return groups
+
+    def relink(self, old_path: str, fp: str | None = None) -> str | None:
+        """Nueva ubicación de un archivo que ya no existe, o None si es ambiguo/no está."""
+        name = os.path.basename(old_path).casefold()
+        size = fingerprint_size(fp) if fp else None
+        if size is not None:
+            matches = [p for p in sorted(self._by_size.get(size, ())) if self.partial(p) == fp]
+            if matches:
+                # Si hay duplicados, preferimos el que conserva el nombre
+                same_name = [p for p in matches if os.path.basename(p).casefold() == name]
+                return (same_name or matches)[0]
+            return None
+        cands = [p for p in self._by_name.get(name, ()) if os.path.exists(p)]
+        return cands[0] if len(cands) == 1 else None
+
+    # ----- Persistencia -----
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._partial = {p: tuple(v) for p, v in raw.get("partial", {}).items()}
+            self._full = {p: tuple(v) for p, v in raw.get("full", {}).items()}
+        except (OSError, ValueError):
+            pass
+
+    def save_cache(self):
+        if not self.cache_path: return
+        with self._lock:
+            # Solo se guardan entradas de archivos todavía indexados
+            data = {
+                "partial": {p: list(v) for p, v in self._partial.items() if p in self._stat},
+                "full": {p: list(v) for p, v in self._full.items() if p in self._stat},
+            }
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,74 @@
+# cue_sequence.py
+# Secuencias de un botón: lista de pasos programados que disparan otras celdas o archivos.
+#   JSON:  "sequence": [{"t": 0.0, "row": 0, "col": 1}, {"t": 1.2, "file": "@SOUNDS/aplausos.wav", "gain": 0.8}]
+#   Texto (diálogo, filas/columnas desde 1):  "1.2  1,2  x0.8"  |  "2.5  @SOUNDS/aplausos.wav"
+# En memoria los archivos van absolutos; se convierten con el PathResolver al leer/guardar.
+from __future__ import annotations
+import re
+from typing import Callable
+
+_GAIN_RE = re.compile(r"\s+x(\d+(?:\.\d+)?)$")
+_CELL_RE = re.compile(r"^(\d+)\s*,\s*(\d+)$")
+
+
+def from_json(raw, resolve: Callable[[str], str]) -> list[dict] | None:
+    """Pasos válidos ordenados por tiempo; None si no hay secuencia."""
+    if not isinstance(raw, list):
+        return None
+    steps = []
+    for item in raw:
+        try:
+            step = {"t": max(0.0, float(item.get("t", 0)))}
+            if item.get("file"):
+                step["file"] = resolve(item["file"])
+            else:
+                step["row"], step["col"] = int(item["row"]), int(item["col"])
+                if "bank" in item: step["bank"] = int(item["bank"])
+                if min(step["row"], step["col"], step.get("bank", 0)) < 0:
+                    continue        # un índice negativo daría la vuelta y dispararía otra celda
+            if "gain" in item: step["gain"] = float(item["gain"])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        steps.append(step)
+    return sorted(steps, key=lambda s: s["t"]) or None
+
+def to_json(steps: list[dict], to_stored: Callable[[str], str]) -> list[dict]:
+    return [{**step, "file": to_stored(step["file"])} if "file" in step else dict(step) for step in steps]
+
+
+def format_lines(steps: list[dict] | None, to_stored: Callable[[str], str]) -> str:
+    lines = []
+    for step in steps or []:
+        target = to_stored(step["file"]) if "file" in step else f'{step["row"] + 1},{step["col"] + 1}'
+        gain = f'  x{step["gain"]:g}' if "gain" in step else ""
+        bank = f'  @{step["bank"] + 1}' if "bank" in step else ""
+        lines.append(f'{step["t"]:g}  {target}{bank}{gain}')
+    return "\n".join(lines)
+
+def parse_lines(text: str, resolve: Callable[[str], str]) -> list[dict] | None:
+    """Inversa de format_lines. Lanza ValueError con el número de línea si algo no se entiende."""
+    steps = []
+    for n, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            t_text, rest = line.split(None, 1)
+            step = {"t": max(0.0, float(t_text.replace(",", ".")))}
+        except ValueError:
+            raise ValueError(f"línea {n}: se espera «segundos destino»") from None
+        m = _GAIN_RE.search(rest)
+        if m:
+            step["gain"] = float(m.group(1)); rest = rest[:m.start()]
+        rest = rest.strip()
+        bank = re.search(r"\s+@(\d+)$", rest)
+        cell = _CELL_RE.match(rest[:bank.start()] if bank else rest)
+        if cell:
+            step["row"], step["col"] = int(cell.group(1)) - 1, int(cell.group(2)) - 1
+            if bank: step["bank"] = int(bank.group(1)) - 1
+            if min(step["row"], step["col"], step.get("bank", 0)) < 0:
+                raise ValueError(f"línea {n}: fila, columna y banco empiezan en 1")
+        else:
+            step["file"] = resolve(rest)
+        steps.append(step)
+    return sorted(steps, key=lambda s: s["t"]) or None
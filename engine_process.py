@@ -0,0 +1,399 @@
+# engine_process.py
+# Motor de audio en un proceso hijo: los redibujos de Tk, los diálogos y las pausas del GC de la
+# ventana ya no retrasan un disparo. La UI y el motor se hablan por dos anillos en memoria
+# compartida (multiprocessing.shared_memory), uno por sentido, sin sockets ni pipes:
+#   comandos  UI -> motor   (seq, método, args, kwargs)
+#   estado    UI <- motor   eventos del motor tal cual + una foto periódica ("state", seq, {...})
+# RemoteEngine expone la misma API que AudioEngine, así la app no distingue uno de otro.
+# Si el hijo muere o deja de responder, el supervisor lo relanza con el mismo volumen y
+# vuelve a precargar lo último que se le pidió.
+from __future__ import annotations
+import os, time, queue, pickle, struct, logging, threading
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory
+from profile_io import DEFAULT_BUS
+
+log = logging.getLogger("effects_board.engine_process")
+
+RING_BYTES = 1 << 20
+STATE_INTERVAL_S = 0.1
+HANG_TIMEOUT_S = 3.0      # sin noticias del hijo (ya inicializado) -> se considera colgado
+RESPAWN_DELAY_S = 0.5
+_HEADER = struct.Struct("<QQQ")   # capacidad, bytes escritos, bytes leídos (solo crecen)
+_LEN = struct.Struct("<I")
+_BACKGROUND = {"preload", "prepare_macros", "prepare_pools", "prepare_loops", "analyze"}   # lentos: en un hilo del hijo, no frenan los disparos
+
+
+class ShmRing:
+    """Anillo de bytes de un productor y un consumidor sobre un bloque compartido.
+
+    Cada registro es <longitud u32><pickle>. El productor copia el registro y recién después
+    publica el contador de escritos; el consumidor avanza el de leídos al terminar de copiar.
+    """
+    def __init__(self, name: str | None = None, size: int = RING_BYTES):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=_HEADER.size + size)
+            _HEADER.pack_into(self.shm.buf, 0, size, 0, 0)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = _HEADER.unpack_from(self.shm.buf, 0)[0]
+
+    def _copy_in(self, pos: int, data: bytes) -> None:
+        off = _HEADER.size + pos % self.capacity
+        first = min(len(data), _HEADER.size + self.capacity - off)
+        self.shm.buf[off:off + first] = data[:first]
+        if first < len(data):
+            self.shm.buf[_HEADER.size:_HEADER.size + len(data) - first] = data[first:]
+
+    def _copy_out(self, pos: int, n: int) -> bytes:
+        off = _HEADER.size + pos % self.capacity
+        first = min(n, _HEADER.size + self.capacity - off)
+        data = bytes(self.shm.buf[off:off + first])
+        if first < n:
+            data += bytes(self.shm.buf[_HEADER.size:_HEADER.size + n - first])
+        return data
+
+    def put(self, msg) -> bool:
+        """False si el anillo está lleno (el mensaje se descarta, el productor no se bloquea)."""
+        data = pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)
+        record = _LEN.pack(len(data)) + data
+        _cap, head, tail = _HEADER.unpack_from(self.shm.buf, 0)
+        if self.capacity - (head - tail) < len(record):
+            return False
+        self._copy_in(head, record)
+        struct.pack_into("<Q", self.shm.buf, 8, head + len(record))
+        return True
+
+    def get(self):
+        """Próximo mensaje o None si no hay nada."""
+        _cap, head, tail = _HEADER.unpack_from(self.shm.buf, 0)
+        if head == tail:
+            return None
+        n = _LEN.unpack(self._copy_out(tail, _LEN.size))[0]
+        data = self._copy_out(tail + _LEN.size, n)
+        struct.pack_into("<Q", self.shm.buf, 16, tail + _LEN.size + n)
+        return pickle.loads(data)
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # El bloque es del padre. El hijo comparte su resource_tracker (spawn lo hereda), así que
+    # registrarlo otra vez no hace daño, pero en 3.13+ ni siquiera hace falta.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# ----- Proceso hijo -----
+def _snapshot(engine) -> dict:
+    snap = {"now": engine.now_playing(), "loops": engine.looper.active_keys(),
+            "playlist": (engine.playlist.key, engine.playlist.playing, engine.playlist.current),
+            "volume": engine.volume}
+    if engine.backend == "numpy":
+        m = engine.mixer
+        snap["mixer"] = {"peak": m.peak, "rms": m.rms, "underruns": m.underruns, "render_ms": tuple(m.render_ms),
+                         "gr_db": engine.gain_reduction_db()}
+    return snap
+
+def _child_main(cmd_name: str, state_name: str, cmd_bell, state_bell, volume: float, backend: str) -> None:
+    from audio_engine import AudioEngine
+    cmds, state = ShmRing(cmd_name), ShmRing(state_name)
+    send_lock = threading.Lock()
+
+    def send(msg):
+        with send_lock:
+            ok = state.put(msg)
+        if ok: state_bell.release()
+
+    engine = AudioEngine(volume, backend)
+    try:
+        engine.init()
+    except Exception as e:
+        send(("error", "init", str(e)))
+
+    def forward_events():
+        while True:
+            send(engine.events.get())
+    threading.Thread(target=forward_events, name="engine-events", daemon=True).start()
+
+    def run(method, args, kwargs):
+        try:
+            getattr(engine, method)(*args, **kwargs)
+        except Exception as e:
+            send(("error", method, str(e)))
+
+    send(("ready", os.getpid()))
+    last_seq, jitter, next_state = 0, (), 0.0
+    while True:
+        cmd_bell.acquire(timeout=STATE_INTERVAL_S)
+        while (msg := cmds.get()) is not None:
+            last_seq, method, args, kwargs = msg
+            if method == "shutdown":
+                engine.stop(0); engine.shutdown()
+                return
+            if method in _BACKGROUND:
+                threading.Thread(target=run, args=(method, args, kwargs), daemon=True).start()
+            else:
+                run(method, args, kwargs)
+        now = time.monotonic()
+        if now >= next_state:
+            snap = _snapshot(engine)
+            new_jitter = tuple(engine.scheduler.jitter_ms)
+            if new_jitter != jitter:
+                snap["jitter"] = jitter = new_jitter
+            send(("state", last_seq, snap))
+            next_state = now + STATE_INTERVAL_S
+
+
+# ----- Lado de la UI -----
+class _PlaylistMirror:
+    def __init__(self):
+        self.key = None
+        self.playing = False
+        self.current: str | None = None
+
+
+class _SchedulerMirror:
+    def __init__(self):
+        self.jitter_ms: deque = deque(maxlen=512)
+
+
+class _MixerMirror:
+    def __init__(self):
+        self.peak = self.rms = 0.0
+        self.underruns = 0
+        self.gr_db: float | None = None
+        self.render_ms: deque = deque(maxlen=512)
+
+
+class RemoteEngine:
+    """Misma interfaz que AudioEngine; los comandos viajan al hijo y el estado vuelve en espejo.
+
+    Las consultas (loop_active, now_playing, playlist.key…) leen el espejo local: se actualiza en
+    el acto al mandar el comando y se reconcilia con la foto del hijo cuando ya procesó todo lo
+    enviado, así un doble clic rápido ve el estado que acaba de pedir.
+    """
+    def __init__(self, volume: float = 0.8, backend: str = "pygame"):
+        self.volume = volume
+        self.backend = backend
+        self.events: queue.Queue = queue.Queue()
+        self.playlist = _PlaylistMirror()
+        self.scheduler = _SchedulerMirror()
+        self.mixer = _MixerMirror()
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")     # nunca fork: el padre tiene Tk y SDL abiertos
+        self._lock = threading.Lock()           # varios productores (UI, OSC, web) -> un anillo
+        self._seq = 0
+        self._now: str | None = None
+        self._loops: set = set()
+        self._warm: dict[str, tuple] = {}       # ajustes y precargas a repetir tras un relanzamiento
+        self._proc = None
+        self._cmds = self._state = None
+        self._closing = False
+        self._ready = False
+        self._last_seen = 0.0
+
+    # ----- Ciclo de vida -----
+    def init(self) -> None:
+        self._spawn()
+        threading.Thread(target=self._supervise, name="engine-supervisor", daemon=True).start()
+
+    def _spawn(self) -> None:
+        cmds, state = ShmRing(), ShmRing()
+        cmd_bell, state_bell = self._ctx.Semaphore(0), self._ctx.Semaphore(0)
+        proc = self._ctx.Process(target=_child_main, name="audio-engine", daemon=True,
+                                 args=(cmds.name, state.name, cmd_bell, state_bell, self.volume, self.backend))
+        proc.start()
+        with self._lock:
+            old = (self._cmds, self._state)
+            self._cmds, self._state = cmds, state
+            self._cmd_bell, self._state_bell = cmd_bell, state_bell
+            self._proc, self._ready = proc, False
+            self._last_seen = time.monotonic()
+        for ring in old:
+            if ring is not None: ring.close()
+        for method, (args, kwargs) in list(self._warm.items()):
+            self._send(method, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        self._closing = True
+        self._send("shutdown")
+        if self._proc is not None:
+            self._proc.join(1.0)
+            if self._proc.is_alive(): self._proc.terminate()
+        for ring in (self._cmds, self._state):
+            if ring is not None: ring.close()
+
+    def _supervise(self) -> None:
+        while not self._closing:
+            self._state_bell.acquire(timeout=STATE_INTERVAL_S * 2)
+            while (msg := self._state.get()) is not None:
+                self._last_seen = time.monotonic()
+                self._receive(msg)
+            if self._closing:
+                return
+            dead = not self._proc.is_alive()
+            hung = self._ready and time.monotonic() - self._last_seen > HANG_TIMEOUT_S
+            if dead or hung:
+                log.warning("motor %s (código %s): se relanza", "colgado" if hung else "caído",
+                            self._proc.exitcode)
+                if hung: self._proc.kill()
+                self._proc.join(1.0)
+                self.restarts += 1
+                with self._lock:
+                    self._loops.clear(); self._now = None
+                    self.playlist.key, self.playlist.playing, self.playlist.current = None, False, None
+                self.events.put(("engine", "restart"))
+                time.sleep(RESPAWN_DELAY_S)
+                self._spawn()
+
+    def _receive(self, msg) -> None:
+        kind = msg[0]
+        if kind == "ready":
+            self._ready = True
+        elif kind == "state":
+            _, seq, snap = msg
+            if "jitter" in snap:
+                self.scheduler.jitter_ms.clear(); self.scheduler.jitter_ms.extend(snap["jitter"])
+            if "mixer" in snap:
+                m = snap["mixer"]
+                self.mixer.peak, self.mixer.rms, self.mixer.underruns = m["peak"], m["rms"], m["underruns"]
+                self.mixer.gr_db = m["gr_db"]
+                self.mixer.render_ms.clear(); self.mixer.render_ms.extend(m["render_ms"])
+            with self._lock:
+                if seq < self._seq:
+                    return          # la foto es de antes del último comando: manda el espejo
+                self._now, self._loops = snap["now"], set(snap["loops"])
+                self.playlist.key, self.playlist.playing, self.playlist.current = snap["playlist"]
+        else:
+            if kind == "loop" and not msg[2]:      # p. ej. cortado por su grupo: no esperar a la foto
+                with self._lock: self._loops.discard(msg[1])
+            self.events.put(msg)
+
+    def _send(self, method: str, *args, **kwargs) -> None:
+        with self._lock:
+            if self._cmds is None:
+                return
+            self._seq += 1
+            ok = self._cmds.put((self._seq, method, args, kwargs))
+            bell = self._cmd_bell
+        if ok: bell.release()
+        else: log.warning("anillo de comandos lleno: se descarta %s", method)
+
+    # ----- Comandos (misma firma que AudioEngine) -----
+    def play(self, path: str, role: str = "effect", bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        self._now = path
+        self._send("play", path, role, bus, mix)
+
+    def play_voice(self, path: str, gain: float = 1.0, role: str = "effect", group: tuple | None = None,
+                   bus: str = DEFAULT_BUS, mix: dict | None = None) -> None:
+        self._send("play_voice", path, gain, role, group, bus, mix)
+
+    def play_macro(self, layers, role: str = "effect", group: tuple | None = None, bus: str = DEFAULT_BUS,
+                   mix: dict | None = None) -> None:
+        self._send("play_macro", layers, role, group, bus, mix)
+
+    def play_pool(self, pool: dict, role: str = "effect", group: tuple | None = None, bus: str = DEFAULT_BUS,
+                  mix: dict | None = None) -> None:
+        self._send("play_pool", pool, role, group, bus, mix)
+
+    def play_sequence(self, steps, role: str = "effect", group: tuple | None = None, bus: str = DEFAULT_BUS,
+                      mix: dict | None = None) -> None:
+        self._send("play_sequence", steps, role, group, bus, mix)
+
+    def play_loop(self, key, path: str, start: float = 0.0, end: float | None = None,
+                  role: str = "effect", group: tuple | None = None, bus: str = DEFAULT_BUS,
+                  mix: dict | None = None) -> None:
+        with self._lock: self._loops.add(key)
+        self._send("play_loop", key, path, start, end, role, group, bus, mix)
+
+    def stop_loop(self, key) -> None:
+        with self._lock: self._loops.discard(key)
+        self._send("stop_loop", key)
+
+    def loop_active(self, key) -> bool:
+        return key in self._loops
+
+    def play_playlist(self, key, files, shuffle: bool = False, repeat: str = "all",
+                      crossfade_ms: int = 0, role: str = "bed", bus: str = "music", mix: dict | None = None) -> None:
+        self.playlist.key, self.playlist.playing = key, True
+        self._send("play_playlist", key, files, shuffle, repeat, crossfade_ms, role, bus, mix)
+
+    def stop_playlist(self) -> None:
+        self.playlist.key, self.playlist.playing, self.playlist.current = None, False, None
+        self._send("stop_playlist")
+
+    def set_ducking(self, enabled: bool, depth_db: float = -12.0, attack_ms: float = 80.0,
+                    release_ms: float = 400.0) -> bool:
+        self._warm["set_ducking"] = ((enabled, depth_db, attack_ms, release_ms), {})
+        self._send("set_ducking", enabled, depth_db, attack_ms, release_ms)
+        return enabled and self.backend == "numpy"
+
+    def set_limiter(self, enabled: bool, ceiling_db: float = -1.0) -> bool:
+        self._warm["set_limiter"] = ((enabled, ceiling_db), {})
+        self._send("set_limiter", enabled, ceiling_db)
+        return enabled and self.backend == "numpy"
+
+    def gain_reduction_db(self) -> float | None:
+        return self.mixer.gr_db
+
+    def preview(self, path: str) -> None:
+        self._send("preview", path)
+
+    def end_preview(self) -> None:
+        self._send("end_preview")
+
+    def stop(self, fade_ms: int | None = None) -> None:
+        with self._lock:
+            self._loops.clear(); self._now = None
+        self.playlist.key, self.playlist.playing, self.playlist.current = None, False, None
+        if fade_ms is None: self._send("stop")
+        else: self._send("stop", fade_ms)
+
+    def now_playing(self) -> str | None:
+        return self._now or self.playlist.current
+
+    def set_volume(self, volume: float, notify: bool = False) -> None:
+        self.volume = min(1.0, max(0.0, float(volume)))
+        self._send("set_volume", self.volume, notify)
+
+    def set_buses(self, gains: dict[str, float]) -> None:
+        merged = {**self._warm.get("set_buses", (({},), {}))[0][0], **gains}
+        self._warm["set_buses"] = ((merged,), {})
+        self._send("set_buses", dict(gains))
+
+    def preload(self, paths) -> None:
+        paths = list(paths)
+        self._warm["preload"] = ((paths,), {})
+        self._send("preload", paths)
+
+    def analyze(self, paths) -> None:
+        self._send("analyze", list(paths))
+
+    def prepare_macros(self, macros) -> None:
+        macros = list(macros)
+        self._warm["prepare_macros"] = ((macros,), {})
+        self._send("prepare_macros", macros)
+
+    def prepare_pools(self, pools) -> None:
+        pools = list(pools)
+        self._warm["prepare_pools"] = ((pools,), {})
+        self._send("prepare_pools", pools)
+
+    def prepare_loops(self, loops) -> None:
+        loops = [tuple(loop) for loop in loops]
+        self._warm["prepare_loops"] = ((loops,), {})
+        self._send("prepare_loops", loops)
+
+    def forget(self, path: str) -> None:
+        self._send("forget", path)
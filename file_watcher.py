@@ -0,0 +1,118 @@
+# file_watcher.py
+# Estado de disponibilidad de los archivos del perfil, mantenido por un hilo en segundo plano.
+# El disparo de un botón solo consulta un dict en memoria (sin syscalls).
+# Sondeo portable: se vigila el mtime de cada carpeta (cambia al crear/borrar/renombrar
+# entradas) y solo se re-verifican los archivos de las carpetas que cambiaron.
+# Para los pocos archivos cuyo contenido importa (capas de macros) se compara además
+# tamaño+mtime en cada vuelta, para detectar sobrescrituras con el mismo nombre.
+from __future__ import annotations
+import os, queue, threading
+
+POLL_INTERVAL_S = 1.0
+
+
+def _dir_mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _file_sig(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+class FileWatcher:
+    def __init__(self, interval: float = POLL_INTERVAL_S):
+        self.interval = interval
+        self.events: queue.Queue = queue.Queue()   # (path, available) para el hilo de UI
+        self._status: dict[str, bool] = {}
+        self._dirs: dict[str, set[str]] = {}        # carpeta -> archivos vigilados
+        self._dir_mtimes: dict[str, int | None] = {}
+        self._content: dict[str, tuple[int, int] | None] = {}   # archivo -> (tamaño, mtime)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ----- Consulta (camino caliente) -----
+    def is_available(self, path: str) -> bool:
+        # Rutas no vigiladas se consideran disponibles; el reproductor reportará el error
+        return self._status.get(path, True)
+
+    # ----- Conjunto vigilado -----
+    def set_paths(self, paths) -> None:
+        """Reemplaza los archivos vigilados; los nuevos se validan ya (una vez, al cargar)."""
+        paths = {p for p in paths if p}
+        dirs: dict[str, set[str]] = {}
+        for p in paths:
+            dirs.setdefault(os.path.dirname(p), set()).add(p)
+        with self._lock:
+            new = paths - self._status.keys()
+            self._status = {p: self._status[p] for p in paths if p in self._status}
+            for p in new:
+                self._status[p] = os.path.isfile(p)
+            self._dir_mtimes = {d: self._dir_mtimes.get(d) if d in self._dirs else _dir_mtime(d)
+                                for d in dirs}
+            self._dirs = dirs
+
+    def watch_content(self, paths) -> None:
+        """Además de su existencia, avisa cuando estos archivos se modifican en el lugar."""
+        paths = {p for p in paths if p}
+        with self._lock:
+            old = dict(self._content)
+        content = {p: old[p] if p in old else _file_sig(p) for p in paths}
+        with self._lock:
+            self._content = content
+
+    def add(self, path: str) -> bool:
+        with self._lock:
+            paths = set(self._status) | {path}
+        self.set_paths(paths)
+        return self._status.get(path, False)
+
+    # ----- Hilo de sondeo -----
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self) -> None:
+        with self._lock:
+            dirs = {d: set(ps) for d, ps in self._dirs.items()}
+            mtimes = dict(self._dir_mtimes)
+            content = dict(self._content)
+        changed = []
+        for p, sig in content.items():
+            new = _file_sig(p)
+            if new != sig:
+                with self._lock:
+                    if p in self._content: self._content[p] = new
+                if sig is not None and new is not None:
+                    self.events.put((p, True))
+        for d, files in dirs.items():
+            m = _dir_mtime(d)
+            if m == mtimes.get(d) and m is not None:
+                continue
+            mtimes[d] = m
+            for p in files:
+                ok = m is not None and os.path.isfile(p)
+                if self._status.get(p) != ok:
+                    changed.append((p, ok))
+        with self._lock:
+            for d, m in mtimes.items():
+                if d in self._dir_mtimes:
+                    self._dir_mtimes[d] = m
+            for p, ok in changed:
+                if p in self._status:
+                    self._status[p] = ok
+                    self.events.put((p, ok))
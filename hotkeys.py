@@ -0,0 +1,79 @@
+# hotkeys.py
+# Mapa de teclado: atajos por botón (con modificadores y por banco) resueltos en una tabla
+# precalculada (banco, modificadores, keysym) -> acción, consultada en O(1) por un único handler.
+from __future__ import annotations
+import sys
+
+# Distribución por defecto: fila 1 = dígitos, luego QWERTY (lo que promete el README)
+DEFAULT_LAYOUT = ("1234567890", "qwertyuiop", "asdfghjkl", "zxcvbnm")
+BANK_KEYS = tuple(f"F{i}" for i in range(1, 13))   # F1..F12 cambian de banco
+
+MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_CMD = 1, 2, 4, 8
+_MOD_NAMES = (("Ctrl", MOD_CTRL), ("Alt", MOD_ALT), ("Cmd", MOD_CMD), ("Shift", MOD_SHIFT))
+_MOD_ALIASES = {"ctrl": MOD_CTRL, "control": MOD_CTRL, "alt": MOD_ALT, "option": MOD_ALT,
+                "cmd": MOD_CMD, "command": MOD_CMD, "meta": MOD_CMD, "shift": MOD_SHIFT}
+_MODIFIER_KEYSYMS = {"Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R",
+                     "Meta_L", "Meta_R", "Super_L", "Super_R", "Caps_Lock", "Option_L", "Option_R"}
+_IS_MAC = sys.platform == "darwin"
+
+
+def normalize_keysym(keysym: str) -> str:
+    # Con Shift Tk entrega "Q": los atajos de letras no distinguen mayúsculas
+    return keysym.lower() if len(keysym) == 1 else keysym
+
+def is_modifier(keysym: str) -> bool:
+    return keysym in _MODIFIER_KEYSYMS
+
+def event_mods(state: int) -> int:
+    """Bits de event.state de Tk -> máscara MOD_* (Alt/Cmd varían según plataforma)."""
+    mods = 0
+    if state & 0x0001: mods |= MOD_SHIFT
+    if state & 0x0004: mods |= MOD_CTRL
+    if _IS_MAC:
+        if state & 0x0008: mods |= MOD_CMD
+        if state & 0x0010: mods |= MOD_ALT
+    elif state & (0x0008 | 0x20000):
+        mods |= MOD_ALT
+    return mods
+
+def parse_hotkey(text: str) -> tuple[int, str] | None:
+    """"Ctrl+Shift+q" -> (MOD_CTRL|MOD_SHIFT, "q"). None si está vacío o no es válido."""
+    if not text:
+        return None
+    *mod_parts, key = text.split("+") if text != "+" else ("+",)
+    mods = 0
+    for part in mod_parts:
+        bit = _MOD_ALIASES.get(part.strip().lower())
+        if bit is None:
+            return None
+        mods |= bit
+    key = key.strip()
+    return (mods, normalize_keysym(key)) if key else None
+
+def format_hotkey(mods: int, keysym: str) -> str:
+    parts = [name for name, bit in _MOD_NAMES if mods & bit]
+    parts.append(keysym.upper() if len(keysym) == 1 else keysym)
+    return "+".join(parts)
+
+
+def build_table(banks: list[list[list[dict]]]) -> dict[tuple[int, int, str], tuple]:
+    """Tabla de despacho: (banco, mods, keysym) -> ("cell", r, c) | ("bank", b).
+
+    Cada banco es una capa: los atajos explícitos ("hotkey" del botón) tienen prioridad y
+    los que queden libres se completan con DEFAULT_LAYOUT. hotkey "" desactiva el botón.
+    """
+    table: dict[tuple[int, int, str], tuple] = {}
+    for b, bank in enumerate(banks):
+        for r, row in enumerate(bank):
+            for c, cell in enumerate(row):
+                parsed = parse_hotkey(cell.get("hotkey") or "")
+                if parsed:
+                    table.setdefault((b, *parsed), ("cell", r, c))
+        for r, row in enumerate(bank):
+            keys = DEFAULT_LAYOUT[r] if r < len(DEFAULT_LAYOUT) else ""
+            for c, cell in enumerate(row[:len(keys)]):
+                if cell.get("hotkey") is None:
+                    table.setdefault((b, 0, keys[c]), ("cell", r, c))
+        for target, key in enumerate(BANK_KEYS[:len(banks)]):
+            table.setdefault((b, 0, key), ("bank", target))
+    return table
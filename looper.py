@@ -0,0 +1,101 @@
+# looper.py
+# Loops sin costura desde buffers en memoria (nada de re-seek ni decodificación en cada vuelta).
+#   Sin puntos de loop      -> Sound.play(loops=-1): SDL repite el buffer solo.
+#   Con inicio/fin de loop  -> pre-roll [0, inicio) y luego el segmento [inicio, fin) encolado en
+#                              el mismo canal; un hilo lo vuelve a encolar cada vez que arranca.
+# La costura se suaviza con un fundido corto del final del segmento hacia el audio que precede
+# al inicio, así el salto fin -> inicio queda continuo aunque los puntos no caigan en un cruce por cero.
+from __future__ import annotations
+import time, threading
+import numpy as np
+import pygame
+from playlist import cancel_queue
+
+LOOP_XFADE_MS = 10
+MIN_LOOP_S = 0.05       # más corto que esto no da tiempo a re-encolar
+_POLL_S = 0.02
+
+
+def loop_buffers(pcm: np.ndarray, rate: int, start_s: float = 0.0, end_s: float | None = None,
+                 xfade_ms: int = LOOP_XFADE_MS) -> tuple[np.ndarray | None, np.ndarray]:
+    """(pre-roll o None, segmento de loop) en int16 a partir del PCM completo."""
+    n = len(pcm)
+    start = min(max(0, int(round(start_s * rate))), n)
+    end = n if end_s is None else min(max(start, int(round(end_s * rate))), n)
+    if end - start < int(MIN_LOOP_S * rate):
+        start, end = 0, n
+    seg = np.array(pcm[start:end], dtype=np.int16)
+    x = min(int(xfade_ms * rate / 1000), start, len(seg) // 2)
+    if x > 0:
+        fade = np.linspace(0.0, 1.0, x, endpoint=False, dtype=np.float32)[:, None]
+        tail = seg[-x:].astype(np.float32) * (1.0 - fade) + pcm[start - x:start].astype(np.float32) * fade
+        seg[-x:] = np.clip(tail, -32768, 32767).astype(np.int16)
+    intro = np.ascontiguousarray(pcm[:start], dtype=np.int16) if start else None
+    return intro, seg
+
+
+class Looper:
+    def __init__(self):
+        self._loops: dict = {}     # key -> (canal, Sound del pre-roll o None, Sound del segmento)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, key, channel: pygame.mixer.Channel, intro: pygame.mixer.Sound | None,
+              loop: pygame.mixer.Sound, fade_ms: int = 0) -> None:
+        self.stop(key)
+        with self._lock:
+            if intro is None:
+                channel.play(loop, loops=-1, fade_ms=fade_ms)
+            else:
+                channel.play(intro, fade_ms=fade_ms)
+                channel.queue(loop)
+            self._loops[key] = (channel, intro, loop)
+            if intro is not None and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="looper", daemon=True)
+                self._thread.start()
+
+    def active(self, key) -> bool:
+        with self._lock:
+            entry = self._loops.get(key)
+        if entry is None:
+            return False
+        channel, intro, loop = entry
+        return channel.get_busy() and channel.get_sound() in (intro, loop)
+
+    def active_keys(self) -> list:
+        with self._lock:
+            keys = list(self._loops)
+        return [k for k in keys if self.active(k)]
+
+    def stop(self, key, fade_ms: int = 0) -> bool:
+        with self._lock:
+            entry = self._loops.pop(key, None)
+        if entry is None:
+            return False
+        channel, intro, loop = entry
+        if channel.get_sound() in (intro, loop):
+            cancel_queue(channel)
+            if fade_ms: channel.fadeout(fade_ms)
+            else: channel.stop()
+        return True
+
+    def stop_all(self, fade_ms: int = 0) -> None:
+        with self._lock:
+            keys = list(self._loops)
+        for key in keys:
+            self.stop(key, fade_ms)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                pending = {k: v for k, v in self._loops.items() if v[1] is not None}
+                if not pending:
+                    self._thread = None
+                    return
+                for key, (channel, intro, loop) in pending.items():
+                    current = channel.get_sound()
+                    if not channel.get_busy() or current not in (intro, loop):
+                        del self._loops[key]          # lo cortó otra voz o terminó
+                    elif current is loop and channel.get_queue() is None:
+                        channel.queue(loop)           # arrancó la vuelta: encolar la siguiente
+            time.sleep(_POLL_S)
@@ -0,0 +1,169 @@
+# meters.py
+# Medidores de nivel por botón y master sin analizar audio en vivo: cada clip trae su envolvente
+# de RMS/pico precalculada (pcm_cache.envelope, un punto cada ENVELOPE_HOP frames) y aquí solo se
+# lee el punto que corresponde al tiempo transcurrido desde el disparo. Cada consulta cuesta una
+# lectura de array por voz; la UI la hace desde un único root.after a tasa fija.
+from __future__ import annotations
+import time, threading
+import numpy as np
+from pcm_cache import PcmCache, ENVELOPE_HOP, MIX_RATE
+from profile_io import DEFAULT_BUS
+
+METER_FLOOR_DB = -48.0
+RETRY_S = 0.25           # cada cuánto se vuelve a mirar si el motor ya decodificó un clip
+RETRY_WINDOW_S = 15.0    # y durante cuánto (el primer disparo de un clip largo decodifica lento)
+
+
+def to_fraction(level: float) -> float:
+    """Nivel lineal (±1) -> 0..1 en escala de dB, con piso en METER_FLOOR_DB."""
+    if level <= 0:
+        return 0.0
+    return min(1.0, max(0.0, 1.0 - 20.0 * np.log10(level) / METER_FLOOR_DB))
+
+
+class MeterModel:
+    """Qué suena en cada botón y desde cuándo; levels() da (rms, pico) por botón y master.
+
+    Con varias voces el RMS se suma en potencia (señales no correlacionadas) y el pico es el
+    mayor de todos: es una estimación, no una medición del bus. Cada voz se escala por la
+    ganancia actual de su bus (set_buses), así un fader o un mute se ven al instante.
+    """
+    def __init__(self, cache: PcmCache | None = None, rate: int = MIX_RATE):
+        self.cache = cache or PcmCache()
+        self.hop_s = ENVELOPE_HOP / rate
+        self._env: dict[str, np.ndarray] = {}
+        self._pending: set[str] = set()
+        self._waiting: dict[str, float] = {}           # ruta aún sin PCM en caché -> hasta cuándo reintentar
+        self._voices: dict[object, list[tuple]] = {}    # key -> [(t0, ruta, ganancia, loop, bus)]
+        self._buses: dict[str, float] = {}               # bus -> ganancia (0 = mute); falta = 1.0
+        self._main = None                               # key del clip principal (se reemplaza)
+        self._groups: dict[object, str] = {}            # key -> grupo de corte
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    # ----- Envolventes -----
+    def load(self, paths) -> None:
+        """Lee (o calcula desde la caché de PCM) las envolventes en segundo plano."""
+        with self._lock:
+            self._pending.update(p for p in paths if p and p not in self._env)
+            if not self._pending or self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                path = self._pending.pop() if self._pending else None
+                if path is None:
+                    now = time.monotonic()
+                    self._waiting = {p: t for p, t in self._waiting.items() if t > now}
+                    if not self._waiting:
+                        # Bajo el lock: un load() que llegue ahora ve None y arranca otro trabajador
+                        self._worker = None
+                        return
+            if path is None:
+                # Lo que el motor todavía está decodificando se vuelve a mirar en un rato
+                time.sleep(RETRY_S)
+                with self._lock:
+                    self._pending.update(self._waiting)
+                continue
+            # Solo clips que el motor ya decodificó: la UI no decodifica (puede no tener mixer propio)
+            try:
+                if not self.cache.has(path):
+                    with self._lock:
+                        self._waiting.setdefault(path, time.monotonic() + RETRY_WINDOW_S)
+                    continue
+                env = self.cache.envelope(path)
+            except (OSError, ValueError):
+                continue
+            with self._lock:
+                self._env[path] = env
+                self._waiting.pop(path, None)
+
+    def forget(self, path: str) -> None:
+        """El archivo cambió en disco: la envolvente se vuelve a leer con la nueva clave."""
+        with self._lock:
+            self._env.pop(path, None)
+            self._waiting.pop(path, None)
+
+    # ----- Disparos -----
+    def start(self, key, layers: list[tuple[float, str, float]], loop: tuple | None = None,
+              main: bool = False, group: str | None = None, bus: str = DEFAULT_BUS) -> None:
+        """layers: (segundos, ruta, ganancia). loop: (inicio, fin|None) para celdas en modo loop.
+        main=True reemplaza al clip principal anterior, como hace AudioEngine.play(); group corta
+        los medidores de su grupo (incluido el mismo botón), como hace el motor con sus voces."""
+        now = time.monotonic()
+        voices = [(now + t, path, gain, loop, bus) for t, path, gain in layers]
+        with self._lock:
+            if group is not None:
+                for k in [k for k, g in self._groups.items() if g == group]:
+                    self._voices.pop(k, None)
+                    del self._groups[k]
+                self._groups[key] = group
+            if main:
+                if self._main is not None:
+                    self._voices.pop(self._main, None)
+                self._main = key
+            self._voices.setdefault(key, []).extend(voices)
+        self.load([path for _t, path, _g in layers])
+
+    def set_buses(self, gains: dict[str, float]) -> None:
+        """Mismas ganancias por bus que AudioEngine.set_buses (0 = mute)."""
+        with self._lock:
+            self._buses.update(gains)
+
+    def stop(self, key=None) -> None:
+        with self._lock:
+            if key is None:
+                self._voices.clear()
+                self._groups.clear()
+            else:
+                self._voices.pop(key, None)
+                self._groups.pop(key, None)
+
+    # ----- Lectura -----
+    def _level(self, env: np.ndarray, elapsed: float, loop: tuple | None) -> tuple[float, float] | None:
+        if loop is not None:
+            start, end = loop
+            end = len(env) * self.hop_s if end is None else end
+            if elapsed >= start and end - start > self.hop_s:
+                elapsed = start + (elapsed - start) % (end - start)
+        i = int(elapsed / self.hop_s)
+        if i >= len(env):
+            return None
+        return float(env[i, 0]), float(env[i, 1])
+
+    def levels(self, now: float | None = None) -> tuple[dict, tuple[float, float]]:
+        """({key: (rms, pico)}, (rms, pico) master) en escala ±1; olvida las voces terminadas."""
+        now = time.monotonic() if now is None else now
+        out, power, peak = {}, 0.0, 0.0
+        with self._lock:
+            for key in list(self._voices):
+                alive, k_power, k_peak = [], 0.0, 0.0
+                for voice in self._voices[key]:
+                    t0, path, gain, loop, bus = voice
+                    env = self._env.get(path)
+                    if now < t0 or env is None:
+                        if env is not None or path in self._pending or path in self._waiting or self._worker_busy():
+                            alive.append(voice)          # aún no empieza o su envolvente está en camino
+                        continue
+                    level = self._level(env, now - t0, loop)
+                    if level is None:
+                        continue
+                    alive.append(voice)
+                    gain *= self._buses.get(bus, 1.0)
+                    k_power += (level[0] * gain) ** 2
+                    k_peak = max(k_peak, level[1] * gain)
+                if alive:
+                    self._voices[key] = alive
+                    out[key] = (float(np.sqrt(k_power)), k_peak)
+                    power += k_power
+                    peak = max(peak, k_peak)
+                else:
+                    del self._voices[key]
+                    self._groups.pop(key, None)
+        return out, (float(np.sqrt(power)), peak)
+
+    def _worker_busy(self) -> bool:
+        return self._worker is not None
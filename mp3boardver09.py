@@ -1,12 +1,35 @@
 # mp3boardver09.py
 # Effects Board: EN/ES dinámico para botones de acción + "Guardar como…"
 from __future__ import annotations
-import os, json, time
-import pygame
+import os, time, queue, logging, threading
+from collections import deque
 import customtkinter as ctk
-from tkinter import filedialog, messagebox, simpledialog, Menu
+from tkinter import filedialog, messagebox, simpledialog, Menu, Listbox
+from audio_probe import try_probe, probe_many, format_duration
+from sound_library import SoundLibrary, AUDIO_EXTS
+from content_index import ContentIndex, try_fingerprint
+from file_watcher import FileWatcher
+from path_resolver import PathResolver
+from profile_io import load_button_config, save_button_config, ROLES, GROUP_MODES, BUSES, DEFAULT_BUS, \
+    BUS_DEFAULTS, MIX_DEFAULTS, MIX_GAIN_RANGE, DUCKING_DEFAULTS, LIMITER_DEFAULTS, POOL_DEFAULTS, POOL_ORDERS, \
+    POOL_MAX_CENTS, POOL_MAX_VARIANTS, mix_problems, pool_problems
+from hotkeys import build_table, event_mods, normalize_keysym, is_modifier, format_hotkey
+from audio_engine import AudioEngine, mix_params
+from engine_process import RemoteEngine
+from playlist import REPEAT_MODES
+from scheduler import percentile
+import cue_sequence
+from osc_server import OscServer, DEFAULT_HOST as OSC_HOST, DEFAULT_PORT as OSC_PORT
+from web_control import WebControlServer, DEFAULT_HOST as WEB_HOST, DEFAULT_PORT as WEB_PORT
+try:
+    from meters import MeterModel, to_fraction
+except ImportError:      # sin numpy: no hay envolventes ni medidores
+    MeterModel = None
+
+log = logging.getLogger("effects_board")
 
 DEFAULT_CONFIG_FILE = "button_config.json"
+CACHE_DIR = ".cache"
 
 # ----- Textos UI (i18n) -----
 TEXTS = {
@@ -23,6 +46,117 @@ TEXTS = {
         "no_file": "Sin archivo asignado",
         "not_found": "Archivo no encontrado",
         "select_audio": "Seleccionar audio",
+        "search_title": "Buscar sonido",
+        "search_hint": "Escribe para buscar… (Enter asigna)",
+        "browse": "Explorar…",
+        "indexing": "Indexando librería…",
+        "results": "resultados",
+        "bank": "Banco",
+        "import_folder": "Importar carpeta de sonidos",
+        "import_files": "Importar archivos de audio",
+        "import_title": "Importar",
+        "import_order": "Orden",
+        "order_name": "Nombre",
+        "order_duration": "Duración",
+        "import_target": "Destino",
+        "target_empty": "Celdas vacías",
+        "target_bank": "Banco nuevo",
+        "import_run": "Importar",
+        "importing": "⏳ Analizando {n} archivos…",
+        "imported": "📥 Importados {n} sonidos",
+        "skipped": "{n} omitidos",
+        "no_audio": "No se encontraron .wav/.mp3",
+        "relinked": "🔗 Reubicados {n} archivos movidos",
+        "dupes_title": "Duplicados",
+        "dupes_none": "No hay sonidos duplicados",
+        "dupes_found": "{n} grupos de sonidos idénticos:",
+        "dupes_searching": "🔎 Buscando duplicados…",
+        "add_root": "Agregar carpeta de sonidos",
+        "root_added": "📁 Carpeta agregada como @{name}",
+        "hotkey_title": "Asignar tecla",
+        "hotkey_prompt": "Presiona la combinación para este botón…\nEsc cancela · Supr quita el atajo",
+        "hotkey_default": "Usar predeterminada",
+        "hotkey_set": "⌨ Tecla asignada: ",
+        "hotkey_cleared": "⌨ Atajo quitado",
+        "osc_on": "📡 OSC escuchando en UDP {host}:{port}",
+        "osc_off": "📡 OSC desactivado",
+        "osc_error": "No se pudo abrir el puerto OSC:",
+        "web_on": "🌐 Panel web en {url}",
+        "web_off": "🌐 Panel web desactivado",
+        "engine_process": "Motor de audio en proceso aparte",
+        "mixer_menu": "Mezclador",
+        "mixer_pygame": "pygame (SDL_mixer)",
+        "mixer_numpy": "NumPy (bus master por software)",
+        "engine_restart_needed": "⚙️ El cambio de motor se aplica al reiniciar la app",
+        "engine_restarted": "⚠️ El motor de audio se cayó y se relanzó",
+        "engine_error": "⚠️ Error de audio: ",
+        "web_error": "No se pudo iniciar el panel web:",
+        "sequence_title": "Secuencia",
+        "sequence_help": "Un paso por línea: segundos y celda (fila,col) o archivo.\nEj.: 0  1,2   ·   1.2  3,1  x0.8   ·   2  @SOUNDS/aplausos.wav\n@N = otro banco, xG = ganancia. Vacío = sin secuencia.",
+        "sequence_set": "⏱ Secuencia de {n} pasos",
+        "sequence_cleared": "⏱ Secuencia quitada",
+        "macro_title": "Macro",
+        "macro_help": "Capas que se mezclan en un solo sonido: desfase en segundos y celda (fila,col) o archivo.\nEj.: 0  1,2   ·   0.25  3,1  x0.8   ·   0.5  @SOUNDS/platillo.wav\n@N = otro banco, xG = ganancia. Vacío = sin macro.",
+        "macro_set": "🧩 Macro de {n} capas",
+        "macro_cleared": "🧩 Macro quitada",
+        "playlist_title": "Lista de reproducción",
+        "playlist_add": "Agregar…",
+        "playlist_remove": "Quitar",
+        "playlist_shuffle": "Aleatorio",
+        "playlist_repeat": "Repetir",
+        "repeat_off": "No",
+        "repeat_all": "Todo",
+        "repeat_one": "Una",
+        "playlist_crossfade": "Fundido (ms)",
+        "playlist_set": "🎵 Lista de {n} pistas",
+        "playlist_cleared": "🎵 Lista quitada",
+        "playlist_track": "🎵 ",
+        "playlist_stopped": "🎵 Lista detenida",
+        "pool_title": "Variaciones",
+        "pool_round_robin": "En orden",
+        "pool_random": "Al azar",
+        "pool_pitch_cents": "Tono ± cents",
+        "pool_variants": "Variantes",
+        "pool_gain_db": "Ganancia − dB",
+        "pool_set": "🎲 {n} variaciones",
+        "pool_cleared": "🎲 Variaciones quitadas",
+        "loop_points_title": "Puntos de loop",
+        "loop_points_prompt": "Inicio y fin del loop en segundos (p.ej. «1.5 8.2»).\nVacío = archivo completo.",
+        "loop_points_invalid": "El fin del loop tiene que ser mayor que el inicio.",
+        "loop_on": "🔁 Loop: ",
+        "loop_off": "🔁 Loop detenido",
+        "loop_mode_on": "🔁 Modo loop activado",
+        "loop_mode_off": "🔁 Modo loop desactivado",
+        "role_bed": "Fondo (se atenúa con los efectos)",
+        "group": "Grupo de corte",
+        "group_none": "Ninguno",
+        "group_new": "Nuevo grupo…",
+        "group_new_prompt": "Nombre del grupo (los botones del mismo grupo se cortan entre sí):",
+        "group_choke": "Choke (corte seco)",
+        "group_exclusive": "Exclusivo (con fundido)",
+        "group_set": "✂️ Grupo: ",
+        "group_cleared": "✂️ Sin grupo",
+        "bus": "Bus",
+        "bus_sfx": "Efectos",
+        "bus_music": "Música",
+        "bus_voice": "Voz",
+        "bus_set": "🎛️ Bus: ",
+        "mix": "Ganancia, paneo y envolvente…",
+        "mix_prompt": "Ganancia (dB, hasta 0), paneo (-1 izq … 1 der), ataque y liberación (ms),\n"
+                      "p.ej. «-6 -0.3 20 400». Sin liberación = fundido normal. Vacío = valores por defecto.",
+        "mix_set": "🎚️ Mezcla del botón: ",
+        "mix_cleared": "🎚️ Mezcla del botón por defecto",
+        "ducking": "Ducking de fondos",
+        "ducking_settings": "Ajustes de ducking…",
+        "ducking_prompt": "Profundidad (dB), ataque (ms) y liberación (ms), p.ej. «-12 80 400»",
+        "ducking_on": "🦆 Ducking activado",
+        "limiter": "Limitador de picos",
+        "limiter_ceiling": "Techo del limitador…",
+        "limiter_prompt": "Techo en dBFS (p.ej. -1)",
+        "limiter_needs_numpy": "🧱 El limitador necesita el mezclador NumPy (Archivo → Mezclador)",
+        "ducking_off": "🦆 Ducking desactivado",
+        "ducking_needs_numpy": "🦆 El ducking necesita el mezclador NumPy (Archivo → Mezclador)",
+        "diagnostics": "Diagnóstico",
     },
     "en": {
         "save": "Save config Buttons",
@@ -37,6 +171,117 @@ TEXTS = {
         "no_file": "No file assigned",
         "not_found": "File not found",
         "select_audio": "Select audio",
+        "search_title": "Find sound",
+        "search_hint": "Type to search… (Enter assigns)",
+        "browse": "Browse…",
+        "indexing": "Indexing library…",
+        "results": "results",
+        "bank": "Bank",
+        "import_folder": "Import sounds folder",
+        "import_files": "Import audio files",
+        "import_title": "Import",
+        "import_order": "Order",
+        "order_name": "Name",
+        "order_duration": "Duration",
+        "import_target": "Target",
+        "target_empty": "Empty cells",
+        "target_bank": "New bank",
+        "import_run": "Import",
+        "importing": "⏳ Probing {n} files…",
+        "imported": "📥 Imported {n} sounds",
+        "skipped": "{n} skipped",
+        "no_audio": "No .wav/.mp3 files found",
+        "relinked": "🔗 Relinked {n} moved files",
+        "dupes_title": "Duplicates",
+        "dupes_none": "No duplicate sounds",
+        "dupes_found": "{n} groups of identical sounds:",
+        "dupes_searching": "🔎 Looking for duplicates…",
+        "add_root": "Add sounds folder",
+        "root_added": "📁 Folder added as @{name}",
+        "hotkey_title": "Assign key",
+        "hotkey_prompt": "Press the key combination for this button…\nEsc cancels · Delete removes the hotkey",
+        "hotkey_default": "Use default",
+        "hotkey_set": "⌨ Key assigned: ",
+        "hotkey_cleared": "⌨ Hotkey removed",
+        "osc_on": "📡 OSC listening on UDP {host}:{port}",
+        "osc_off": "📡 OSC disabled",
+        "osc_error": "Could not open the OSC port:",
+        "web_on": "🌐 Web panel at {url}",
+        "web_off": "🌐 Web panel disabled",
+        "engine_process": "Audio engine in a separate process",
+        "mixer_menu": "Mixer",
+        "mixer_pygame": "pygame (SDL_mixer)",
+        "mixer_numpy": "NumPy (software master bus)",
+        "engine_restart_needed": "⚙️ The engine change applies after restarting the app",
+        "engine_restarted": "⚠️ The audio engine crashed and was restarted",
+        "engine_error": "⚠️ Audio error: ",
+        "web_error": "Could not start the web panel:",
+        "sequence_title": "Sequence",
+        "sequence_help": "One step per line: seconds and cell (row,col) or file.\nE.g.: 0  1,2   ·   1.2  3,1  x0.8   ·   2  @SOUNDS/applause.wav\n@N = other bank, xG = gain. Empty = no sequence.",
+        "sequence_set": "⏱ Sequence with {n} steps",
+        "sequence_cleared": "⏱ Sequence removed",
+        "macro_title": "Macro",
+        "macro_help": "Layers mixed into a single sound: offset in seconds and cell (row,col) or file.\nE.g.: 0  1,2   ·   0.25  3,1  x0.8   ·   0.5  @SOUNDS/cymbal.wav\n@N = other bank, xG = gain. Empty = no macro.",
+        "macro_set": "🧩 Macro with {n} layers",
+        "macro_cleared": "🧩 Macro removed",
+        "playlist_title": "Playlist",
+        "playlist_add": "Add…",
+        "playlist_remove": "Remove",
+        "playlist_shuffle": "Shuffle",
+        "playlist_repeat": "Repeat",
+        "repeat_off": "Off",
+        "repeat_all": "All",
+        "repeat_one": "One",
+        "playlist_crossfade": "Crossfade (ms)",
+        "playlist_set": "🎵 Playlist with {n} tracks",
+        "playlist_cleared": "🎵 Playlist removed",
+        "playlist_track": "🎵 ",
+        "playlist_stopped": "🎵 Playlist stopped",
+        "pool_title": "Variations",
+        "pool_round_robin": "Round robin",
+        "pool_random": "Random",
+        "pool_pitch_cents": "Pitch ± cents",
+        "pool_variants": "Variants",
+        "pool_gain_db": "Gain − dB",
+        "pool_set": "🎲 {n} variations",
+        "pool_cleared": "🎲 Variations removed",
+        "loop_points_title": "Loop points",
+        "loop_points_prompt": "Loop start and end in seconds (e.g. \"1.5 8.2\").\nEmpty = whole file.",
+        "loop_points_invalid": "The loop end must be after its start.",
+        "loop_on": "🔁 Looping: ",
+        "loop_off": "🔁 Loop stopped",
+        "loop_mode_on": "🔁 Loop mode on",
+        "loop_mode_off": "🔁 Loop mode off",
+        "role_bed": "Bed (ducked under effects)",
+        "group": "Choke group",
+        "group_none": "None",
+        "group_new": "New group…",
+        "group_new_prompt": "Group name (buttons in the same group cut each other):",
+        "group_choke": "Choke (hard cut)",
+        "group_exclusive": "Exclusive (fade out)",
+        "group_set": "✂️ Group: ",
+        "group_cleared": "✂️ No group",
+        "bus": "Bus",
+        "bus_sfx": "SFX",
+        "bus_music": "Music",
+        "bus_voice": "Voice",
+        "bus_set": "🎛️ Bus: ",
+        "mix": "Gain, pan and envelope…",
+        "mix_prompt": "Gain (dB, up to 0), pan (-1 left … 1 right), attack and release (ms),\n"
+                      "e.g. \"-6 -0.3 20 400\". No release = normal fade. Empty = defaults.",
+        "mix_set": "🎚️ Button mix: ",
+        "mix_cleared": "🎚️ Button mix reset",
+        "ducking": "Duck beds under effects",
+        "ducking_settings": "Ducking settings…",
+        "ducking_prompt": "Depth (dB), attack (ms) and release (ms), e.g. \"-12 80 400\"",
+        "ducking_on": "🦆 Ducking on",
+        "limiter": "Peak limiter",
+        "limiter_ceiling": "Limiter ceiling…",
+        "limiter_prompt": "Ceiling in dBFS (e.g. -1)",
+        "limiter_needs_numpy": "🧱 The limiter needs the NumPy mixer (File → Mixer)",
+        "ducking_off": "🦆 Ducking off",
+        "ducking_needs_numpy": "🦆 Ducking needs the NumPy mixer (File → Mixer)",
+        "diagnostics": "Diagnostics",
     },
 }
 
@@ -52,11 +297,32 @@ BTN_RADIUS = 12
 BTN_FONT = ("Arial", 14, "bold")
 BTN_FG_ASSIGNED = "#0EA5E9"
 BTN_FG_EMPTY = "#334155"
+BTN_FG_MISSING = "#7F1D1D"
 BTN_HOVER = "#1F2937"
+BTN_LOOP_BORDER = "#FACC15"
+BTN_LOOP_BORDER_WIDTH = 3
+GR_IDLE_COLOR = "#64748B"
+GR_ACTIVE_COLOR = "#F59E0B"
+METER_COLOR = "#22C55E"
+METER_HOT_COLOR = "#EF4444"     # el pico del master toca el techo
+METER_HOT_LEVEL = 0.89          # ~ -1 dBFS
+METER_BG = "#1E293B"
+BUS_SLIDER_WIDTH = 110
+MUTE_ON_COLOR = "#B91C1C"
+MUTE_OFF_COLOR = "#334155"
 
 PANEL_PADX = 10
 PANEL_PADY = 10
 GRID_SPACING = 8
+FILE_EVENTS_MS = 250
+KEY_RELEASE_GRACE_MS = 30   # X11 manda Release+Press por auto-repeat; esperamos antes de soltar
+ENGINE_EVENTS_MS = 50
+METER_MS = 50               # 20 cuadros/s para todos los medidores, con cualquier cantidad de voces
+METER_STEPS = 40            # los valores se cuantizan: solo se redibuja si cambia el escalón
+
+PICKER_MAX_RESULTS = 200
+PICKER_BG = "#1E293B"
+PICKER_FG = "#E2E8F0"
 
 
 # --------- Utilidades de archivo/config ---------
@@ -74,44 +340,6 @@ def ensure_configs_folder():
     os.makedirs(base, exist_ok=True)
     return os.path.abspath(base)
 
-def load_button_config(path: str) -> dict:
-    if not os.path.exists(path):
-        data = {
-            "grid": {"rows": 3, "cols": 4},
-            "buttons": [],
-            "__meta__": {"volume": 80, "lang": "es"},
-        }
-        save_button_config(data, path)
-        return data
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-    # Migración: label -> labels{en,es}
-    changed = False
-    for b in raw.get("buttons", []):
-        if "labels" not in b:
-            label_val = b.get("label")
-            if isinstance(label_val, str) and label_val.strip():
-                b["labels"] = {"en": label_val, "es": label_val}
-            else:
-                b["labels"] = {
-                    "en": f'{b.get("row",0)+1},{b.get("col",0)+1}',
-                    "es": f'{b.get("row",0)+1},{b.get("col",0)+1}'
-                }
-            changed = True
-        if "label" in b:
-            del b["label"]; changed = True
-    if "__meta__" not in raw:
-        raw["__meta__"] = {"volume": 80, "lang": "es"}; changed = True
-    elif "lang" not in raw["__meta__"]:
-        raw["__meta__"]["lang"] = "es"; changed = True
-    if changed:
-        save_button_config(raw, path)
-    return raw
-
-def save_button_config(cfg: dict, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
-
 
 # -------------------- App --------------------
 class AudioButtonApp:
@@ -128,8 +356,43 @@ class AudioButtonApp:
         self.rows = int(self.cfg.get("grid", {}).get("rows", 3))
         self.cols = int(self.cfg.get("grid", {}).get("cols", 4))
         self.lang = (self.cfg.get("__meta__", {}).get("lang", "es") or "es").lower()
+        self._clip_info: dict = {}   # path -> AudioInfo|None (solo cabeceras)
+        self.file_watcher = FileWatcher()
+        self.paths = PathResolver(self.cfg_path, self.cfg.get("__meta__", {}).get("sound_roots"))
+
+        # Librería de sonidos: se indexa en segundo plano
+        self.library = SoundLibrary()
+        self.content_index = ContentIndex()
+        self.library_ready = False
+        self._on_library_ready: list = []   # callbacks pendientes hasta terminar el escaneo
+        self._scan_gen = 0
+        ensure_sounds_folder()
+        self._start_library_scan()
 
+        # Con "engine_process" el audio corre en un proceso hijo (engine_process.RemoteEngine);
+        # "engine" elige el mezclador: "pygame" (SDL_mixer) o "numpy" (soft_mixer)
+        self.engine_process = bool(self.cfg.get("__meta__", {}).get("engine_process"))
+        self.engine_backend = self.cfg.get("__meta__", {}).get("engine", "pygame")
+        engine_cls = RemoteEngine if self.engine_process else AudioEngine
+        self.engine = engine_cls(min(100, max(0, int(self.cfg.get("__meta__", {}).get("volume", 80)))) / 100.0,
+                                 self.engine_backend)
         self._init_mixer()
+        self.meters = MeterModel() if MeterModel is not None else None
+        self._meter_vals: dict = {}              # barra -> último escalón dibujado
+        self._meter_lit: set = set()             # celdas del banco con el medidor encendido
+        self._playlist_meter_key = None
+        self.duck_cfg = {**DUCKING_DEFAULTS, **(self.cfg.get("__meta__", {}).get("ducking") or {})}
+        self._apply_ducking()
+        self.limiter_cfg = {**LIMITER_DEFAULTS, **(self.cfg.get("__meta__", {}).get("limiter") or {})}
+        buses_meta = self.cfg.get("__meta__", {}).get("buses") or {}
+        self.bus_cfg = {bus: {**BUS_DEFAULTS[bus], **(buses_meta.get(bus) or {})} for bus in BUSES}
+        self._bus_flush_pending = False
+        self._flush_buses()
+        self._apply_limiter()
+        self.osc_server: OscServer | None = None
+        self.osc_cfg = dict(self.cfg.get("__meta__", {}).get("osc") or {})
+        self.web_server: WebControlServer | None = None
+        self.web_cfg = dict(self.cfg.get("__meta__", {}).get("web") or {})
 
         # ---------- Topbar ----------
         self.topbar = ctk.CTkFrame(self.root, corner_radius=0)
@@ -148,21 +411,37 @@ class AudioButtonApp:
                 vol = float(v) / 100.0
             except Exception:
                 vol = self.vol_var.get() / 100.0
-            try:
-                pygame.mixer.music.set_volume(vol)
-            except Exception:
-                pass
+            self.engine.set_volume(vol)
             self.vol_value_lbl.configure(text=f"{int(vol*100)}%")
 
-        ctk.CTkLabel(self.topbar, text="Vol").grid(row=0, column=1, padx=6, pady=8, sticky="e")
+        # Selector de banco (se rellena en _refresh_bank_selector)
+        self.bank_lbl = ctk.CTkLabel(self.topbar, text=self.t("bank"))
+        self.bank_lbl.grid(row=0, column=1, padx=6, pady=8, sticky="e")
+        self.bank_var = ctk.StringVar(value="1")
+        self.bank_toggle = ctk.CTkSegmentedButton(
+            self.topbar, values=["1"], variable=self.bank_var,
+            command=lambda v: self._select_bank(int(v) - 1)
+        )
+        self.bank_toggle.grid(row=0, column=2, padx=(0, 12), pady=8, sticky="e")
+
+        ctk.CTkLabel(self.topbar, text="Vol").grid(row=0, column=3, padx=6, pady=8, sticky="e")
         self.vol_value_lbl = ctk.CTkLabel(self.topbar, text=f"{self.vol_var.get()}%")
-        self.vol_value_lbl.grid(row=0, column=2, padx=(0, 6), pady=8, sticky="e")
+        self.vol_value_lbl.grid(row=0, column=4, padx=(0, 6), pady=8, sticky="e")
         self.vol_slider = ctk.CTkSlider(
             self.topbar, from_=0, to=100, number_of_steps=100,
             command=_on_volume_change, width=200
         )
         self.vol_slider.set(self.vol_var.get())
-        self.vol_slider.grid(row=0, column=3, padx=(0, 12), pady=8, sticky="e")
+        self.vol_slider.grid(row=0, column=5, padx=(0, 6), pady=8, sticky="e")
+        # Medidor master (RMS; se pone rojo si el pico llega al techo)
+        self.master_meter = ctk.CTkProgressBar(self.topbar, width=90, height=8, progress_color=METER_COLOR,
+                                               fg_color=METER_BG)
+        self.master_meter.set(0)
+        if self.meters is not None:
+            self.master_meter.grid(row=0, column=6, padx=(0, 6), pady=8, sticky="e")
+        # Reducción de ganancia del limitador (se actualiza con los eventos del motor)
+        self.gr_lbl = ctk.CTkLabel(self.topbar, text="", width=72, text_color=GR_IDLE_COLOR)
+        self.gr_lbl.grid(row=0, column=7, padx=(0, 12), pady=8, sticky="e")
 
         # Selector EN/ES
         self.lang_var = ctk.StringVar(value=self.lang.upper())
@@ -170,7 +449,24 @@ class AudioButtonApp:
             self.topbar, values=["EN", "ES"], variable=self.lang_var,
             command=self._on_lang_change, width=120
         )
-        self.lang_toggle.grid(row=0, column=4, padx=(0, PANEL_PADX), pady=8, sticky="e")
+        self.lang_toggle.grid(row=0, column=8, padx=(0, PANEL_PADX), pady=8, sticky="e")
+
+        # Buses: fader + mute por submezcla (segunda fila de la barra superior)
+        self.busbar = ctk.CTkFrame(self.topbar, fg_color="transparent")
+        self.busbar.grid(row=1, column=0, columnspan=9, padx=PANEL_PADX, pady=(0, 6), sticky="e")
+        self.bus_labels, self.bus_sliders, self.bus_mutes = {}, {}, {}
+        for i, bus in enumerate(BUSES):
+            self.bus_labels[bus] = ctk.CTkLabel(self.busbar, text=self.t(f"bus_{bus}"))
+            self.bus_labels[bus].grid(row=0, column=3 * i, padx=(12, 4), sticky="e")
+            slider = ctk.CTkSlider(self.busbar, from_=0, to=100, number_of_steps=100, width=BUS_SLIDER_WIDTH,
+                                   command=lambda v, b=bus: self._on_bus_volume(b, v))
+            slider.set(self.bus_cfg[bus]["volume"])
+            slider.bind("<ButtonRelease-1>", lambda e: save_button_config(self._collect_config(), self.cfg_path))
+            slider.grid(row=0, column=3 * i + 1, sticky="e")
+            self.bus_sliders[bus] = slider
+            self.bus_mutes[bus] = ctk.CTkButton(self.busbar, text="M", width=28, command=lambda b=bus: self._toggle_bus_mute(b))
+            self.bus_mutes[bus].grid(row=0, column=3 * i + 2, padx=(4, 0), sticky="e")
+        self._refresh_bus_mutes()
 
         # ---------- Centro (grilla) ----------
         self.center = ctk.CTkFrame(self.root)
@@ -179,8 +475,12 @@ class AudioButtonApp:
         for r in range(self.rows): self.center.grid_rowconfigure(r, weight=1)
 
         self.buttons_widgets: list[list[ctk.CTkButton]] = []
-        self.buttons_data: list[list[dict]] = []
+        self.meter_bars: list[list[ctk.CTkProgressBar]] = []
+        self.buttons_data: list[list[dict]] = []   # alias de self.banks[self.bank]
+        self.banks: list[list[list[dict]]] = []
+        self.bank = 0
         self._build_grid_from_config()
+        self._refresh_bank_selector()
 
         # ---------- Action bar ----------
         self.actionbar = ctk.CTkFrame(self.root, corner_radius=0)
@@ -201,8 +501,18 @@ class AudioButtonApp:
         self._apply_ui_texts()
 
 
-        self._bind_simple_hotkeys()
+        self._bind_hotkeys()
         self._build_menubar()  # opcional
+        self._when_library_ready(self._relink_missing)
+        self.file_watcher.start()
+        self.root.after(FILE_EVENTS_MS, self._drain_file_events)
+        self.root.after(ENGINE_EVENTS_MS, self._drain_engine_events)
+        if self.meters is not None:
+            self.root.after(METER_MS, self._update_meters)
+        if self.osc_cfg.get("enabled"):
+            self._start_osc()
+        if self.web_cfg.get("enabled"):
+            self._start_web()
 
     # ---------- Helpers ----------
     def t(self, key: str) -> str:
@@ -210,10 +520,136 @@ class AudioButtonApp:
 
     def set_status(self, msg: str): self.status.configure(text=msg)
 
+    def _describe_clip(self, path: str) -> str:
+        if path not in self._clip_info:
+            self._clip_info[path] = try_probe(path)
+        info = self._clip_info[path]
+        name = os.path.basename(path)
+        return f"{name} ({format_duration(info.duration_us)})" if info else name
+
+    def _start_library_scan(self):
+        self._scan_gen += 1
+        self.library_ready = False
+        roots = list(dict.fromkeys(self.paths.roots.values()))
+        threading.Thread(target=self._scan_library, args=(roots, self._scan_gen), daemon=True).start()
+
+    def _scan_library(self, roots: list[str], gen: int):
+        lib = SoundLibrary()
+        for root_dir in roots:
+            lib.scan(root_dir)
+        index = ContentIndex(os.path.join(CACHE_DIR, "content_index.json"))
+        index.add_many(e.path for e in lib.entries)
+        if gen != self._scan_gen:   # hubo un re-escaneo posterior (cambio de raíces)
+            return
+        self.library = lib           # reemplazo atómico: el picker usa la anterior mientras tanto
+        self.content_index = index
+        self.library_ready = True
+
+    def _when_library_ready(self, callback):
+        """Ejecuta callback en el hilo de Tk cuando el escaneo en segundo plano haya terminado."""
+        if self.library_ready:
+            callback(); return
+        self._on_library_ready.append(callback)
+        if len(self._on_library_ready) == 1:
+            self.root.after(200, self._poll_library_ready)
+
+    def _poll_library_ready(self):
+        if not self.library_ready:
+            self.root.after(200, self._poll_library_ready); return
+        pending, self._on_library_ready = self._on_library_ready, []
+        for cb in pending: cb()
+
+    def _refresh_library_labels(self):
+        labels_by_path = {}
+        for bank in self.banks:
+            for info in (cell for row in bank for cell in row):
+                if info.get("file"):
+                    labels_by_path.setdefault(info["file"], []).extend(info["labels"].values())
+        self.library.set_labels(labels_by_path)
+
     def _init_mixer(self):
-        try: pygame.mixer.init()
+        try: self.engine.init()
         except Exception as e: messagebox.showwarning("Audio", f"No se pudo inicializar audio:\n{e}")
 
+    def _drain_engine_events(self):
+        """Refleja en la UI lo que hizo el motor, venga de la grilla, el teclado u OSC."""
+        while True:
+            try: ev = self.engine.events.get_nowait()
+            except queue.Empty: break
+            kind = ev[0]
+            if kind == "play":
+                self.set_status(f"▶ Reproduciendo: {self._describe_clip(ev[1])}")
+            elif kind == "stop":
+                self.set_status("⏹ Detenido")
+                if self.meters: self.meters.stop()
+                self._refresh_cells()
+            elif kind == "loop":
+                b, r, c = ev[1]
+                if self.meters and not ev[2]: self.meters.stop(ev[1])
+                self.set_status(self.t("loop_on") + self._describe_clip(self.banks[b][r][c]["file"]) if ev[2]
+                                else self.t("loop_off"))
+                self._refresh_cells()
+            elif kind == "volume":
+                vol_int = int(round(ev[1] * 100))
+                self.vol_var.set(vol_int); self.vol_slider.set(vol_int)
+                self.vol_value_lbl.configure(text=f"{vol_int}%")
+            elif kind == "error":
+                self.set_status(self.t("engine_error") + ev[2])
+            elif kind == "engine":
+                self.set_status(self.t("engine_restarted"))
+                if self.meters: self.meters.stop()
+                self._refresh_cells()
+            elif kind == "playlist":
+                self.set_status(self.t("playlist_track") + self._describe_clip(ev[1]) if ev[1]
+                                else self.t("playlist_stopped"))
+                self._meter_playlist(ev[1])
+            if self.web_server: self.web_server.notify()
+        self._update_gain_reduction()
+        self.root.after(ENGINE_EVENTS_MS, self._drain_engine_events)
+
+    # ---------- Medidores ----------
+    def _meter_playlist(self, path: str | None):
+        if self.meters is None:
+            return
+        if self._playlist_meter_key is not None:
+            self.meters.stop(self._playlist_meter_key)
+        self._playlist_meter_key = self.engine.playlist.key if path else None
+        if path and self._playlist_meter_key is not None:
+            b, r, c = self._playlist_meter_key
+            try: cell = self.banks[b][r][c]
+            except IndexError: cell = {}
+            self.meters.start(self._playlist_meter_key, [(0.0, path, mix_params(cell.get("mix"))[0])],
+                              bus=self._cell_bus(cell))
+
+    def _set_meter(self, bar, fraction: float, color: str | None = None):
+        step = round(fraction * METER_STEPS)
+        if self._meter_vals.get(bar) != (step, color):
+            self._meter_vals[bar] = (step, color)
+            bar.set(step / METER_STEPS)
+            if color: bar.configure(progress_color=color)
+
+    def _update_meters(self):
+        """Un cuadro de todos los medidores: lee las envolventes precalculadas, nunca el audio."""
+        levels, (rms, peak) = self.meters.levels()
+        vol = self.engine.volume
+        lit = {key[1:] for key in levels if isinstance(key, tuple) and len(key) == 3 and key[0] == self.bank}
+        for r, c in lit | self._meter_lit:
+            if r < len(self.meter_bars) and c < len(self.meter_bars[r]):
+                self._set_meter(self.meter_bars[r][c], to_fraction(levels.get((self.bank, r, c), (0.0,))[0] * vol))
+        self._meter_lit = lit
+        if self.engine_backend == "numpy" and hasattr(self.engine.mixer, "rms"):
+            rms, peak = self.engine.mixer.rms, self.engine.mixer.peak   # el bus NumPy mide la salida real
+        else:
+            rms, peak = rms * vol, peak * vol
+        self._set_meter(self.master_meter, to_fraction(rms), METER_HOT_COLOR if peak >= METER_HOT_LEVEL else METER_COLOR)
+        self.root.after(METER_MS, self._update_meters)
+
+    def _update_gain_reduction(self):
+        gr = self.engine.gain_reduction_db()
+        text = "" if gr is None else f"GR {gr:.1f} dB"
+        if text != self.gr_lbl.cget("text"):
+            self.gr_lbl.configure(text=text, text_color=GR_ACTIVE_COLOR if gr and gr >= 0.1 else GR_IDLE_COLOR)
+
     def _on_lang_change(self, _val: str):
         self.lang = self.lang_var.get().lower()
         # refrescar textos UI + botones
@@ -222,11 +658,75 @@ class AudioButtonApp:
         self.cfg["__meta__"]["lang"] = self.lang
         save_button_config(self._collect_config(), self.cfg_path)
 
-    def _bind_simple_hotkeys(self):
-        digits = "1234567890"
-        usable = min(self.cols, len(digits))
-        for i in range(usable):
-            self.root.bind(digits[i], lambda e, r=0, c=i: self._press_cell(r, c))
+    # ---------- Teclado ----------
+    def _bind_hotkeys(self):
+        """Un solo handler de <KeyPress> para toda la ventana; la tabla se arma en _rebuild_hotkeys."""
+        self._held_keys: set[str] = set()
+        self._pending_release: dict[str, str] = {}
+        self._key_clock_offset = None
+        self.key_latency_ms = deque(maxlen=256)
+        self.root.bind("<KeyPress>", self._on_key_press)
+        self.root.bind("<KeyRelease>", self._on_key_release)
+
+    def _rebuild_hotkeys(self):
+        self._hotkey_table = build_table(self.banks)
+
+    def _on_key_press(self, event):
+        t0 = time.perf_counter()
+        key = normalize_keysym(event.keysym)
+        after_id = self._pending_release.pop(key, None)
+        if after_id is not None:          # Release+Press inmediato = auto-repeat (X11)
+            self.root.after_cancel(after_id); return "break"
+        if key in self._held_keys:        # auto-repeat (macOS/Windows)
+            return "break"
+        if is_modifier(event.keysym): return
+        action = self._hotkey_table.get((self.bank, event_mods(event.state), key))
+        if action is None: return
+        self._held_keys.add(key)
+        if action[0] == "cell":
+            self._press_cell(action[1], action[2])
+        else:
+            self._select_bank(action[1])
+        self._log_key_latency(event, t0, key)
+        return "break"
+
+    def _on_key_release(self, event):
+        key = normalize_keysym(event.keysym)
+        if key in self._held_keys and key not in self._pending_release:
+            self._pending_release[key] = self.root.after(KEY_RELEASE_GRACE_MS, self._release_key, key)
+
+    def _release_key(self, key: str):
+        self._pending_release.pop(key, None)
+        self._held_keys.discard(key)
+
+    def _log_key_latency(self, event, t0: float, key: str):
+        # event.time viene del reloj del sistema de ventanas: tomamos la menor diferencia
+        # observada como base y el excedente es el tiempo que el evento esperó en la cola de Tk.
+        handler_ms = (time.perf_counter() - t0) * 1000.0
+        skew = t0 * 1000.0 - int(event.time)
+        if self._key_clock_offset is None or skew < self._key_clock_offset:
+            self._key_clock_offset = skew
+        queue_ms = skew - self._key_clock_offset
+        self.key_latency_ms.append(queue_ms + handler_ms)
+        log.debug("tecla %s -> disparo: cola %.1f ms + handler %.1f ms", key, queue_ms, handler_ms)
+
+    def _edit_hotkey(self, r: int, c: int):
+        HotkeyCapture(self, r, c)
+
+    def _set_hotkey(self, r: int, c: int, hotkey: str | None):
+        """hotkey: texto tipo "Ctrl+Q", "" = sin atajo, None = distribución por defecto."""
+        if hotkey:
+            # Una combinación pertenece a un solo botón por banco
+            for row in self.buttons_data:
+                for cell in row:
+                    if cell.get("hotkey") == hotkey: cell["hotkey"] = None
+        self.buttons_data[r][c]["hotkey"] = hotkey
+        self._rebuild_hotkeys()
+        save_button_config(self._collect_config(), self.cfg_path)
+        if hotkey:
+            self.set_status(self.t("hotkey_set") + hotkey)
+        else:
+            self.set_status(self.t("hotkey_cleared") if hotkey == "" else self.t("hotkey_default"))
 
     def _build_menubar(self):
         menubar = Menu(self.root)
@@ -234,35 +734,92 @@ class AudioButtonApp:
         file_menu.add_command(label="Guardar configuración", command=self._save_config)
         file_menu.add_command(label="Cargar configuración", command=self._load_config_from_disk)
         file_menu.add_separator()
+        file_menu.add_command(label="Importar carpeta…", command=self._import_folder)
+        file_menu.add_command(label="Importar archivos…", command=self._import_files)
+        file_menu.add_command(label="Banco nuevo", command=self._add_bank)
+        file_menu.add_command(label="Buscar duplicados", command=self._find_duplicates)
+        file_menu.add_separator()
+        self.osc_var = ctk.BooleanVar(value=bool(self.osc_cfg.get("enabled")))
+        file_menu.add_checkbutton(label=f"Control OSC (UDP {self.osc_cfg.get('port', OSC_PORT)})",
+                                  variable=self.osc_var, command=self._toggle_osc)
+        self.web_var = ctk.BooleanVar(value=bool(self.web_cfg.get("enabled")))
+        file_menu.add_checkbutton(label=f"Panel web (HTTP {self.web_cfg.get('port', WEB_PORT)})",
+                                  variable=self.web_var, command=self._toggle_web)
+        self.engine_process_var = ctk.BooleanVar(value=self.engine_process)
+        file_menu.add_checkbutton(label=self.t("engine_process"), variable=self.engine_process_var,
+                                  command=self._toggle_engine_process)
+        mixer_menu = Menu(file_menu, tearoff=0)
+        self.engine_backend_var = ctk.StringVar(value=self.engine_backend)
+        for backend in ("pygame", "numpy"):
+            mixer_menu.add_radiobutton(label=self.t(f"mixer_{backend}"), value=backend,
+                                       variable=self.engine_backend_var, command=self._set_engine_backend)
+        file_menu.add_cascade(label=self.t("mixer_menu"), menu=mixer_menu)
+        self.ducking_var = ctk.BooleanVar(value=bool(self.duck_cfg.get("enabled")))
+        file_menu.add_checkbutton(label=self.t("ducking"), variable=self.ducking_var, command=self._toggle_ducking)
+        file_menu.add_command(label=self.t("ducking_settings"), command=self._edit_ducking)
+        self.limiter_var = ctk.BooleanVar(value=bool(self.limiter_cfg.get("enabled")))
+        file_menu.add_checkbutton(label=self.t("limiter"), variable=self.limiter_var, command=self._toggle_limiter)
+        file_menu.add_command(label=self.t("limiter_ceiling"), command=self._edit_limiter)
+        file_menu.add_separator()
         file_menu.add_command(label="Abrir carpeta de sonidos", command=self._open_sounds_folder)
+        file_menu.add_command(label="Agregar carpeta de sonidos…", command=self._add_sound_root)
+        file_menu.add_separator()
+        file_menu.add_command(label="Diagnóstico", command=self._show_diagnostics)
         file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.root.destroy)
         menubar.add_cascade(label="Archivo", menu=file_menu)
         self.root.config(menu=menubar)
 
     # ---------- Grid / Config ----------
+    def _empty_bank(self) -> list[list[dict]]:
+        return [[{"labels": {"en": f"{r+1},{c+1}", "es": f"{r+1},{c+1}"},
+                  "file": None, "hash": None, "hotkey": None, "sequence": None, "macro": None, "playlist": None, "loop": None, "role": None,
+                  "group": None, "bus": None, "mix": None, "pool": None}
+                 for c in range(self.cols)] for r in range(self.rows)]
+
     def _build_grid_from_config(self):
         self.buttons_widgets.clear()
-        base = [[{"labels": {"en": f"{r+1},{c+1}", "es": f"{r+1},{c+1}"}, "file": None}
-                 for c in range(self.cols)] for r in range(self.rows)]
+        n_banks = max(1, int(self.cfg.get("grid", {}).get("banks", 1)))
+        for item in self.cfg.get("buttons", []):
+            try: n_banks = max(n_banks, int(item.get("bank", 0)) + 1)
+            except Exception: continue
+        self.banks = [self._empty_bank() for _ in range(n_banks)]
         for item in self.cfg.get("buttons", []):
             try:
+                b = int(item.get("bank", 0))
                 r = int(item.get("row")); c = int(item.get("col"))
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    base[r][c]["file"] = item.get("file")
+                if 0 <= b and 0 <= r < self.rows and 0 <= c < self.cols:
+                    cell = self.banks[b][r][c]
+                    cell["file"] = self.paths.resolve(item.get("file"))
+                    cell["hash"] = item.get("hash")
+                    cell["hotkey"] = item.get("hotkey")
+                    cell["sequence"] = cue_sequence.from_json(item.get("sequence"), self.paths.resolve)
+                    cell["macro"] = cue_sequence.from_json(item.get("macro"), self.paths.resolve)
+                    cell["playlist"] = self._playlist_from_json(item.get("playlist"))
+                    cell["pool"] = self._pool_from_json(item.get("pool"))
+                    cell["loop"] = self._loop_from_json(item.get("loop"))
+                    cell["group"] = None if cell["playlist"] else self._group_from_json(item.get("group"))
+                    cell["bus"] = item.get("bus") if item.get("bus") in BUSES else None
+                    cell["mix"] = self._mix_from_json(item.get("mix"))
+                    cell["role"] = item.get("role") if item.get("role") in ROLES else None
                     labels = item.get("labels", {})
-                    if "en" in labels: base[r][c]["labels"]["en"] = labels["en"]
-                    if "es" in labels: base[r][c]["labels"]["es"] = labels["es"]
+                    if "en" in labels: cell["labels"]["en"] = labels["en"]
+                    if "es" in labels: cell["labels"]["es"] = labels["es"]
             except Exception:
                 continue
-        self.buttons_data = base
+        self.bank = min(n_banks - 1, max(0, int(self.cfg.get("__meta__", {}).get("bank", 0))))
+        self.buttons_data = self.banks[self.bank]
+        self._watch_profile_files()
+        self._rebuild_hotkeys()
+        self._preload_sequences()
 
+        self.meter_bars.clear()
+        self._meter_vals.clear(); self._meter_lit.clear()
         for r in range(self.rows):
             row_widgets = []
             for c in range(self.cols):
                 lbl = self.buttons_data[r][c]["labels"].get(self.lang, f"{r+1},{c+1}")
-                has_file = bool(self.buttons_data[r][c]["file"])
-                fg = BTN_FG_ASSIGNED if has_file else BTN_FG_EMPTY
+                fg = self._cell_color(self.buttons_data[r][c])
                 btn = ctk.CTkButton(
                     self.center, text=lbl, width=BTN_WIDTH, height=BTN_HEIGHT,
                     corner_radius=BTN_RADIUS, font=BTN_FONT,
@@ -274,21 +831,206 @@ class AudioButtonApp:
                 btn.bind("<Button-2>", lambda e, rr=r, cc=c: self.show_context_menu(e, rr, cc))
                 row_widgets.append(btn)
             self.buttons_widgets.append(row_widgets)
+            if self.meters is not None:
+                # Barra fina dentro del botón (hija de la grilla para poder ubicarla sobre él)
+                bars = []
+                for c, btn in enumerate(row_widgets):
+                    bar = ctk.CTkProgressBar(self.center, height=4, corner_radius=2, progress_color=METER_COLOR,
+                                             fg_color=METER_BG)
+                    bar.set(0)
+                    bar.place(in_=btn, relx=0.08, rely=0.86, relwidth=0.84)
+                    bars.append(bar)
+                self.meter_bars.append(bars)
 
-        try: pygame.mixer.music.set_volume(self.vol_var.get()/100.0)
-        except Exception: pass
+        self.engine.set_volume(self.vol_var.get()/100.0)
 
         # Aplica textos de botones de acción al idioma actual
         # self._apply_ui_texts()
 
+    def _cell_color(self, info: dict) -> str:
+        if not info["file"]:
+            return BTN_FG_ASSIGNED if info.get("sequence") or info.get("macro") or info.get("playlist") \
+                or info.get("pool") else BTN_FG_EMPTY
+        return BTN_FG_ASSIGNED if self.file_watcher.is_available(info["file"]) else BTN_FG_MISSING
+
+    def _watch_profile_files(self):
+        cells = [cell for bank in self.banks for row in bank for cell in row]
+        self.file_watcher.set_paths([cell["file"] for cell in cells if cell["file"]]
+                                    + [step["file"] for cell in cells for kind in ("sequence", "macro")
+                                       for step in cell.get(kind) or () if "file" in step]
+                                    + [f for cell in cells for kind in ("playlist", "pool") if cell.get(kind)
+                                       for f in cell[kind]["files"]])
+        # Las macros se re-mezclan y las variaciones se re-renderizan si un archivo se sobrescribe en disco
+        self.file_watcher.watch_content([path for b, bank in enumerate(self.banks) for row in bank
+                                         for cell in row if cell.get("macro")
+                                         for _t, path, _g in self._sequence_steps(b, cell, "macro")]
+                                        + [f for cell in cells if cell.get("pool") for f in cell["pool"]["files"]])
+
+    def _sequence_steps(self, bank: int, cell: dict, kind: str = "sequence") -> list[tuple[float, str, float]]:
+        """(t, ruta, ganancia) de la secuencia/macro de una celda, sin los pasos vacíos o faltantes."""
+        steps = [(0.0, cell["file"], 1.0)] if cell["file"] and self.file_watcher.is_available(cell["file"]) else []
+        for step in cell[kind]:
+            if "file" in step:
+                path = step["file"]
+            else:
+                b, r, c = step.get("bank", bank), step["row"], step["col"]
+                # Sin índices negativos: darían la vuelta en las listas y tomarían otra celda
+                in_grid = 0 <= b < len(self.banks) and 0 <= r < self.rows and 0 <= c < self.cols
+                path = self.banks[b][r][c]["file"] if in_grid else None
+            if path and self.file_watcher.is_available(path):
+                steps.append((step["t"], path, step.get("gain", 1.0)))
+        return steps
+
+    def _playlist_from_json(self, raw) -> dict | None:
+        if not isinstance(raw, dict) or not raw.get("files"):
+            return None
+        return {"files": [self.paths.resolve(f) for f in raw["files"] if f],
+                "shuffle": bool(raw.get("shuffle", False)),
+                "repeat": raw.get("repeat", "all") if raw.get("repeat") in REPEAT_MODES else "all",
+                "crossfade": max(0, int(raw.get("crossfade", 0) or 0))}
+
+    def _pool_from_json(self, raw) -> dict | None:
+        if pool_problems(raw) or raw is None:
+            return None
+        return {**POOL_DEFAULTS, **{k: raw[k] for k in POOL_DEFAULTS if k in raw},
+                "files": [self.paths.resolve(f) for f in raw["files"] if f]}
+
+    def _missing_files(self, bank: int, cell: dict) -> list[str]:
+        """Archivos que la celda necesita y no están disponibles (para avisar cuál falta)."""
+        if cell.get("playlist"): paths = cell["playlist"]["files"]
+        elif cell.get("pool"): paths = cell["pool"]["files"]
+        elif cell.get("macro") or cell.get("sequence"):
+            paths = [cell.get("file")]        # el archivo propio suena como primera capa
+            for step in cell.get("macro") or cell["sequence"]:
+                if "file" in step: paths.append(step["file"])
+                else:
+                    b, r, c = step.get("bank", bank), step["row"], step["col"]
+                    if 0 <= b < len(self.banks) and 0 <= r < self.rows and 0 <= c < self.cols:
+                        paths.append(self.banks[b][r][c]["file"])
+        else: paths = [cell.get("file")]
+        return list(dict.fromkeys(p for p in paths if p and not self.file_watcher.is_available(p)))
+
+    def _pool_spec(self, cell: dict) -> dict | None:
+        """El pool de la celda con solo los archivos disponibles (lo que recibe el motor)."""
+        files = [f for f in cell["pool"]["files"] if self.file_watcher.is_available(f)]
+        return {**cell["pool"], "files": files} if files else None
+
+    @staticmethod
+    def _mix_from_json(raw) -> dict | None:
+        if not isinstance(raw, dict) or mix_problems(raw):
+            return None
+        mix = {k: raw[k] for k in MIX_DEFAULTS if k in raw}
+        return mix if any(mix.get(k, v) != v for k, v in MIX_DEFAULTS.items()) else None
+
+    @staticmethod
+    def _group_from_json(raw) -> dict | None:
+        if not isinstance(raw, dict) or not str(raw.get("id") or "").strip():
+            return None
+        return {"id": str(raw["id"]).strip(), "mode": raw.get("mode") if raw.get("mode") in GROUP_MODES else "choke"}
+
+    @staticmethod
+    def _loop_from_json(raw) -> dict | None:
+        if raw is True:
+            return {"start": 0.0, "end": None}
+        if not isinstance(raw, dict):
+            return None
+        try:
+            end = raw.get("end")
+            return {"start": max(0.0, float(raw.get("start", 0) or 0)),
+                    "end": None if end is None else float(end)}
+        except (TypeError, ValueError):
+            return {"start": 0.0, "end": None}
+
+    def _preload_sequences(self):
+        """Secuencias, macros, pools y loops se preparan en segundo plano para que el disparo no decodifique."""
+        paths = {path for b, bank in enumerate(self.banks) for row in bank for cell in row
+                 if cell.get("sequence") for _t, path, _g in self._sequence_steps(b, cell)}
+        # Con grupo o con mezcla propia el clip va por un canal (no por mixer.music): necesita su Sound
+        paths |= {cell["file"] for bank in self.banks for row in bank for cell in row
+                  if (cell.get("group") or cell.get("mix")) and cell.get("file")
+                  and self.file_watcher.is_available(cell["file"])}
+        macros = [layers for layers in (self._sequence_steps(b, cell, "macro") for b, bank in enumerate(self.banks)
+                                        for row in bank for cell in row if cell.get("macro")) if layers]
+        pools = [spec for spec in (self._pool_spec(cell) for bank in self.banks for row in bank for cell in row
+                                   if cell.get("pool")) if spec]
+        loops = list({(cell["file"], cell["loop"]["start"], cell["loop"]["end"]) for bank in self.banks
+                      for row in bank for cell in row if cell.get("loop") and cell.get("file")
+                      and self.file_watcher.is_available(cell["file"])})
+        files = sorted({cell["file"] for bank in self.banks for row in bank for cell in row
+                        if cell.get("file") and self.file_watcher.is_available(cell["file"])}
+                       | {f for pool in pools for f in pool["files"]})
+        def work():
+            # Primero las variaciones: si un archivo del pool apareció, desapareció o cambió, su
+            # clave cambia y hasta re-renderizarlo el botón suena sin variación de tono
+            self.engine.prepare_pools(pools)      # variantes de tono remuestreadas una sola vez
+            self.engine.preload(sorted(paths))
+            self.engine.prepare_macros(macros)
+            self.engine.prepare_loops(loops)      # intro + segmento cortados antes del primer disparo
+            if self.meters is not None:
+                self.engine.analyze(files)      # envolventes de nivel para los medidores
+                self.meters.load(files)
+        threading.Thread(target=work, daemon=True).start()
+
+    def _drain_file_events(self):
+        """Aplica en la UI los cambios detectados por el watcher (archivos que aparecen/desaparecen)."""
+        changed = set()
+        while True:
+            try: changed.add(self.file_watcher.events.get_nowait()[0])
+            except queue.Empty: break
+        if changed:
+            for path in changed:
+                self.engine.forget(path)
+                if self.meters: self.meters.forget(path)
+            self._preload_sequences()
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    info = self.buttons_data[r][c]
+                    if info["file"] in changed:
+                        self.buttons_widgets[r][c].configure(fg_color=self._cell_color(info))
+            if self.web_server: self.web_server.notify()
+        self.root.after(FILE_EVENTS_MS, self._drain_file_events)
+
+    def _refresh_cells(self):
+        for r in range(self.rows):
+            for c in range(self.cols):
+                info = self.buttons_data[r][c]
+                self.buttons_widgets[r][c].configure(
+                    text=info["labels"].get(self.lang, f"{r+1},{c+1}"),
+                    fg_color=self._cell_color(info),
+                    border_width=BTN_LOOP_BORDER_WIDTH if info.get("loop") and self.engine.loop_active((self.bank, r, c)) else 0,
+                    border_color=BTN_LOOP_BORDER,
+                )
+
+    def _refresh_bank_selector(self):
+        self.bank_toggle.configure(values=[str(i + 1) for i in range(len(self.banks))])
+        self.bank_var.set(str(self.bank + 1))
+
+    def _select_bank(self, b: int):
+        if not 0 <= b < len(self.banks): return
+        self.bank = b
+        self.buttons_data = self.banks[b]
+        self.bank_var.set(str(b + 1))
+        self._refresh_cells()
+
+    def _add_bank(self):
+        self.banks.append(self._empty_bank())
+        self._rebuild_hotkeys()
+        self._refresh_bank_selector()
+        self._select_bank(len(self.banks) - 1)
+        save_button_config(self._collect_config(), self.cfg_path)
+
     def _apply_ui_texts(self):
         ui = TEXTS.get(self.lang, TEXTS["es"])
+        if hasattr(self, "bank_lbl"):
+            self.bank_lbl.configure(text=ui["bank"])
         if hasattr(self, "btn_save"):
             self.btn_save.configure(text=ui["save"])
         if hasattr(self, "btn_load"):
             self.btn_load.configure(text=ui["load"])
         if hasattr(self, "btn_reset"):
             self.btn_reset.configure(text=ui["reset"])
+        for bus, lbl in getattr(self, "bus_labels", {}).items():
+            lbl.configure(text=ui[f"bus_{bus}"])
 
 
     def _apply_language(self):
@@ -302,23 +1044,110 @@ class AudioButtonApp:
 
     def _collect_config(self) -> dict:
         buttons_list = []
-        for r in range(self.rows):
-            for c in range(self.cols):
-                buttons_list.append({
-                    "row": r, "col": c,
-                    "labels": self.buttons_data[r][c]["labels"],
-                    "file": self.buttons_data[r][c]["file"],
-                })
-        return {
-            "grid": {"rows": self.rows, "cols": self.cols},
-            "buttons": buttons_list,
-            "__meta__": {"volume": int(self.vol_var.get()), "lang": self.lang},
-        }
+        for b, bank in enumerate(self.banks):
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    entry = {"bank": b} if b else {}
+                    entry.update({
+                        "row": r, "col": c,
+                        "labels": bank[r][c]["labels"],
+                        "file": self.paths.to_stored(bank[r][c]["file"]),
+                    })
+                    if bank[r][c].get("hash"):
+                        entry["hash"] = bank[r][c]["hash"]
+                    if bank[r][c].get("hotkey") is not None:
+                        entry["hotkey"] = bank[r][c]["hotkey"]
+                    for kind in ("sequence", "macro"):
+                        if bank[r][c].get(kind):
+                            entry[kind] = cue_sequence.to_json(bank[r][c][kind], self.paths.to_stored)
+                    if bank[r][c].get("loop"):
+                        entry["loop"] = bank[r][c]["loop"]
+                    if bank[r][c].get("role"):
+                        entry["role"] = bank[r][c]["role"]
+                    if bank[r][c].get("group"):
+                        entry["group"] = bank[r][c]["group"]
+                    if bank[r][c].get("bus"):
+                        entry["bus"] = bank[r][c]["bus"]
+                    if bank[r][c].get("mix"):
+                        entry["mix"] = bank[r][c]["mix"]
+                    for kind in ("playlist", "pool"):
+                        if bank[r][c].get(kind):
+                            spec = bank[r][c][kind]
+                            entry[kind] = {**spec, "files": [self.paths.to_stored(f) for f in spec["files"]]}
+                    buttons_list.append(entry)
+        grid = {"rows": self.rows, "cols": self.cols}
+        meta = {"volume": int(self.vol_var.get()), "lang": self.lang}
+        if len(self.banks) > 1:
+            grid["banks"] = len(self.banks)
+            meta["bank"] = self.bank
+        if self.paths.declared_roots():
+            meta["sound_roots"] = self.paths.declared_roots()
+        if self.osc_cfg:
+            meta["osc"] = self.osc_cfg
+        if self.web_cfg:
+            meta["web"] = self.web_cfg
+        if self.engine_process:
+            meta["engine_process"] = True
+        if self.engine_backend != "pygame":
+            meta["engine"] = self.engine_backend
+        if self.duck_cfg != DUCKING_DEFAULTS:
+            meta["ducking"] = self.duck_cfg
+        if self.limiter_cfg != LIMITER_DEFAULTS:
+            meta["limiter"] = self.limiter_cfg
+        if self.bus_cfg != BUS_DEFAULTS:
+            meta["buses"] = self.bus_cfg
+        return {"grid": grid, "buttons": buttons_list, "__meta__": meta}
+
+    # ----- Archivos movidos / duplicados -----
+    def _relink_missing(self):
+        """Reubica archivos que ya no están donde dice el perfil (por hash o, si falta, por nombre)."""
+        relinked = 0
+        for bank in self.banks:
+            for cell in (cell for row in bank for cell in row):
+                path = cell.get("file")
+                if not path or self.file_watcher.is_available(path):
+                    continue
+                new = self.content_index.relink(path, cell.get("hash"))
+                if new:
+                    cell["file"] = new
+                    cell["hash"] = cell.get("hash") or self.content_index.partial(new)
+                    relinked += 1
+        self.content_index.save_cache()
+        if relinked:
+            self._watch_profile_files()
+            self._refresh_cells()
+            self._refresh_library_labels()
+            save_button_config(self._collect_config(), self.cfg_path)
+            self.set_status(self.t("relinked").format(n=relinked))
+
+    def _find_duplicates(self):
+        self.set_status(self.t("dupes_searching"))
+        def work():
+            groups = self.content_index.duplicates()
+            self.content_index.save_cache()
+            return groups
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(groups=work()), daemon=True)
+        def start():
+            worker.start()
+            self._poll_duplicates(worker, result)
+        self._when_library_ready(start)
+
+    def _poll_duplicates(self, worker, result):
+        if worker.is_alive():
+            self.root.after(100, self._poll_duplicates, worker, result); return
+        groups = result.get("groups", [])
+        self.set_status(self.t("dupes_found").format(n=len(groups)) if groups else self.t("dupes_none"))
+        if groups:
+            lines = [self.t("dupes_found").format(n=len(groups)), ""]
+            for g in groups[:15]:
+                lines.append(" = ".join(os.path.basename(p) for p in g))
+            if len(groups) > 15: lines.append("…")
+            messagebox.showinfo(self.t("dupes_title"), "\n".join(lines))
 
     # ----- GUARDAR COMO… -----
     def _save_config(self):
         """Siempre 'Guardar como…': pregunta nombre/ruta y guarda."""
-        cfg = self._collect_config()
         ensure_configs_folder()
         default_name = f"buttons_{self.lang}.json"
         path = filedialog.asksaveasfilename(
@@ -332,7 +1161,9 @@ class AudioButtonApp:
         if not path:
             return
         self.cfg_path = path
-        save_button_config(cfg, path)
+        # Las rutas relativas se calculan contra la ubicación nueva del perfil
+        self.paths.set_profile(path)
+        save_button_config(self._collect_config(), path)
         self.set_status(self.t("saved_as") + os.path.basename(path))
 
     def _load_config_from_disk(self):
@@ -345,6 +1176,12 @@ class AudioButtonApp:
         try:
             self.cfg_path = path
             self.cfg = load_button_config(self.cfg_path)
+            self._clip_info.clear()
+            old_roots = self.paths.roots
+            self.paths.set_profile(self.cfg_path)
+            self.paths.set_roots(self.cfg.get("__meta__", {}).get("sound_roots"))
+            if self.paths.roots != old_roots:
+                self._start_library_scan()
             self.rows = int(self.cfg.get("grid", {}).get("rows", 3))
             self.cols = int(self.cfg.get("grid", {}).get("cols", 4))
             self.lang = (self.cfg.get("__meta__", {}).get("lang", self.lang) or self.lang).lower()
@@ -353,11 +1190,25 @@ class AudioButtonApp:
             for c in range(max(1, self.cols)): self.center.grid_columnconfigure(c, weight=1)
             for r in range(max(1, self.rows)): self.center.grid_rowconfigure(r, weight=1)
             self._build_grid_from_config()
+            self._refresh_bank_selector()
+            self._when_library_ready(self._relink_missing)
 
             vol_int = int(self.cfg.get("__meta__", {}).get("volume", 80))
             self.vol_var.set(vol_int); self.vol_slider.set(vol_int)
             self.vol_value_lbl.configure(text=f"{vol_int}%")
-            pygame.mixer.music.set_volume(vol_int / 100.0)
+            self.engine.set_volume(vol_int / 100.0)
+            osc_cfg = dict(self.cfg.get("__meta__", {}).get("osc") or {})
+            if osc_cfg != self.osc_cfg:
+                self.osc_cfg = osc_cfg
+                self.osc_var.set(bool(osc_cfg.get("enabled")))
+                self._stop_osc()
+                if osc_cfg.get("enabled"): self._start_osc()
+            web_cfg = dict(self.cfg.get("__meta__", {}).get("web") or {})
+            if web_cfg != self.web_cfg:
+                self.web_cfg = web_cfg
+                self.web_var.set(bool(web_cfg.get("enabled")))
+                self._stop_web()
+                if web_cfg.get("enabled"): self._start_web()
 
             self.lang_var.set(self.lang.upper())
             self._apply_language()
@@ -376,22 +1227,277 @@ class AudioButtonApp:
         save_button_config(self.cfg, self.cfg_path)
         for w in self.center.winfo_children(): w.destroy()
         self._build_grid_from_config()
+        self._refresh_bank_selector()
         self.vol_var.set(80); self.vol_slider.set(80); self.vol_value_lbl.configure(text="80%")
-        pygame.mixer.music.set_volume(0.8)
+        self.engine.set_volume(0.8)
         self.set_status(self.t("reset_ok"))
 
     # ---------- Interacción botones ----------
-    def _on_button_click(self, r: int, c: int):
-        info = self.buttons_data[r][c]
-        path = info.get("file")
+    def trigger_cell(self, r: int, c: int, bank: int | None = None) -> str:
+        """Dispara una celda sin tocar widgets (seguro desde otros hilos).
+
+        Devuelve "ok", "empty" o "missing"; los errores del motor se propagan.
+        """
+        bank = self.bank if bank is None else bank
+        cell = self.banks[bank][r][c]
+        role = self._cell_role(cell)
+        group = (cell["group"]["id"], cell["group"]["mode"]) if cell.get("group") else None
+        gid = group[0] if group else None     # los medidores cortan su grupo a la par del motor
+        bus = self._cell_bus(cell)
+        mix = cell.get("mix")
+        level = mix_params(mix)[0]
+        if cell.get("playlist"):
+            # El mismo botón la arranca y la detiene
+            if self.engine.playlist.key == (bank, r, c) and self.engine.playlist.playing:
+                self.engine.stop_playlist()
+                return "ok"
+            pl = cell["playlist"]
+            files = [f for f in pl["files"] if self.file_watcher.is_available(f)]
+            if not files:
+                return "missing"
+            self.engine.play_playlist((bank, r, c), files, pl["shuffle"], pl["repeat"], pl["crossfade"], role,
+                                     bus=bus, mix=mix)
+            return "ok"
+        if cell.get("loop") and cell.get("file"):
+            # Modo loop: el mismo botón (o su tecla) lo arranca y lo detiene
+            key = (bank, r, c)
+            if self.engine.loop_active(key):
+                self.engine.stop_loop(key)
+                return "ok"
+            if not self.file_watcher.is_available(cell["file"]):
+                return "missing"
+            self.engine.play_loop(key, cell["file"], cell["loop"]["start"], cell["loop"]["end"], role, group,
+                                 bus=bus, mix=mix)
+            if self.meters: self.meters.start(key, [(0.0, cell["file"], level)], (cell["loop"]["start"], cell["loop"]["end"]),
+                                              group=gid, bus=bus)
+            return "ok"
+        if cell.get("pool"):
+            pool = self._pool_spec(cell)
+            if not pool:
+                return "missing"
+            self.engine.play_pool(pool, role, group, bus=bus, mix=mix)
+            # El medidor no sabe qué variante salió: usa la envolvente del primer archivo
+            if self.meters: self.meters.start((bank, r, c), [(0.0, pool["files"][0], level)], group=gid, bus=bus)
+            return "ok"
+        if cell.get("macro"):
+            layers = self._sequence_steps(bank, cell, "macro")
+            if not layers:
+                return "missing"
+            self.engine.play_macro(layers, role, group, bus=bus, mix=mix)
+            if self.meters: self.meters.start((bank, r, c), [(t, p, g * level) for t, p, g in layers], group=gid, bus=bus)
+            return "ok"
+        if cell.get("sequence"):
+            steps = self._sequence_steps(bank, cell)
+            if not steps:
+                return "missing"
+            self.engine.play_sequence(steps, role, group, bus=bus, mix=mix)
+            if self.meters: self.meters.start((bank, r, c), [(t, p, g * level) for t, p, g in steps], group=gid, bus=bus)
+            return "ok"
+        path = cell.get("file")
         if not path:
-            self.set_status(self.t("no_file")); return
-        if not os.path.exists(path):
+            return "empty"
+        if not self.file_watcher.is_available(path):   # sin syscall: estado en memoria
+            return "missing"
+        if group:
+            # En un grupo el clip es una voz más: solo lo cortan los de su grupo, no el próximo disparo
+            self.engine.play_voice(path, 1.0, role, group, bus=bus, mix=mix)
+        else:
+            self.engine.play(path, role, bus=bus, mix=mix)
+        if self.meters: self.meters.start((bank, r, c), [(0.0, path, level)], main=not group, group=gid, bus=bus)
+        return "ok"
+
+    def request_bank(self, b: int):
+        """Cambio de banco desde fuera de Tk: se valida acá y se aplica en el hilo de Tk."""
+        if not 0 <= b < len(self.banks):
+            raise ValueError(f"banco {b} fuera de rango (0–{len(self.banks) - 1})")
+        self.root.after(0, self._select_bank, b)
+
+    def _on_button_click(self, r: int, c: int):
+        try:
+            result = self.trigger_cell(r, c)
+        except Exception as e:
+            messagebox.showerror("Audio", f"No se pudo reproducir:\n{e}")
+            self.set_status("⚠️ Error de reproducción")
+            return
+        if result == "empty":
+            self.set_status(self.t("no_file"))
+        elif result == "missing":
             self.set_status(self.t("not_found"))
-            messagebox.showwarning("Audio", f"No existe:\n{path}")
-            self.buttons_widgets[r][c].configure(fg_color=BTN_FG_EMPTY)
+            missing = self._missing_files(self.bank, self.buttons_data[r][c])
+            messagebox.showwarning("Audio", "No existe:\n" + "\n".join(missing) if missing else self.t("not_found"))
+            self.buttons_widgets[r][c].configure(fg_color=BTN_FG_MISSING)
+
+    # ---------- Control externo (OSC/UDP, panel web) ----------
+    def remote_trigger(self, r: int, c: int, bank: int | None = None):
+        # Los índices negativos darían la vuelta en las listas y dispararían otra celda
+        if bank is not None and not 0 <= bank < len(self.banks):
+            raise ValueError(f"banco {bank} fuera de rango (0–{len(self.banks) - 1})")
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f"celda {r},{c} fuera de la grilla {self.rows}x{self.cols}")
+        result = self.trigger_cell(r, c, bank)
+        if result != "ok":
+            raise ValueError(f"celda {r},{c}: {result}")
+
+    def remote_volume(self, v: float):
+        """Volumen remoto en escala 0.0–1.0 (lo de afuera se recorta)."""
+        self.engine.set_volume(min(1.0, max(0.0, v)), notify=True)
+
+    def remote_state(self) -> dict:
+        """Foto del banco activo para clientes remotos (solo lectura de datos, sin widgets)."""
+        playing = self.engine.now_playing()
+        cells = [[{
+            "label": cell["labels"].get(self.lang, f"{r+1},{c+1}"),
+            "file": bool(cell["file"]),
+            "missing": bool(cell["file"]) and not self.file_watcher.is_available(cell["file"]),
+            "playing": bool(playing) and cell["file"] == playing,
+        } for c, cell in enumerate(row)] for r, row in enumerate(self.buttons_data)]
+        return {
+            "rows": self.rows, "cols": self.cols, "bank": self.bank, "banks": len(self.banks),
+            "cells": cells, "volume": round(self.engine.volume * 100),
+            "playing": os.path.basename(playing) if playing else None,
+        }
+
+    def _osc_handlers(self) -> dict:
+        def trigger(args):
+            self.remote_trigger(int(args[0]), int(args[1]), int(args[2]) if len(args) > 2 else None)
+        return {
+            "/board/trigger": trigger,
+            "/board/stop": lambda args: self.engine.stop(),
+            "/board/volume": lambda args: self.remote_volume(float(args[0])),
+            "/board/bank": lambda args: self.request_bank(int(args[0])),
+        }
+
+    def _web_handlers(self) -> dict:
+        def trigger(msg):
+            bank = msg.get("bank")
+            self.remote_trigger(int(msg["row"]), int(msg["col"]), None if bank is None else int(bank))
+        return {
+            "trigger": trigger,
+            "stop": lambda msg: self.engine.stop(),
+            "volume": lambda msg: self.remote_volume(float(msg["value"])),
+            "bank": lambda msg: self.request_bank(int(msg["bank"])),
+        }
+
+    def _start_web(self):
+        host = self.web_cfg.get("host", WEB_HOST)
+        port = int(self.web_cfg.get("port", WEB_PORT))
+        server = WebControlServer(self._web_handlers(), self.remote_state,
+                                  host=host, port=port, token=self.web_cfg.get("token"))
+        try:
+            server.start()
+        except OSError as e:
+            messagebox.showwarning("Web", f"{self.t('web_error')}\n{e}")
+            self.web_var.set(False)
+            return
+        self.web_server = server
+        if server.token != self.web_cfg.get("token"):
+            # Token generado para escuchar fuera de loopback: se guarda para que la URL no cambie
+            self.web_cfg["token"] = server.token
+            save_button_config(self._collect_config(), self.cfg_path)
+        url = f"http://{host}:{server.address[1]}/" + (f"?token={server.token}" if server.token else "")
+        self.set_status(self.t("web_on").format(url=url))
+
+    def _stop_web(self):
+        if self.web_server:
+            self.web_server.stop()
+            self.web_server = None
+
+    def _toggle_web(self):
+        enabled = bool(self.web_var.get())
+        self.web_cfg["enabled"] = enabled
+        self._stop_web()
+        if enabled:
+            self._start_web()
+        else:
+            self.set_status(self.t("web_off"))
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _toggle_engine_process(self):
+        self.engine_process = bool(self.engine_process_var.get())
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("engine_restart_needed"))
+
+    def _apply_ducking(self) -> bool:
+        d = self.duck_cfg
+        return self.engine.set_ducking(bool(d["enabled"]), float(d["depth_db"]), float(d["attack_ms"]),
+                                       float(d["release_ms"]))
+
+    def _toggle_ducking(self):
+        self.duck_cfg["enabled"] = bool(self.ducking_var.get())
+        active = self._apply_ducking()
+        save_button_config(self._collect_config(), self.cfg_path)
+        if self.duck_cfg["enabled"] and not active:
+            self.set_status(self.t("ducking_needs_numpy"))
+        else:
+            self.set_status(self.t("ducking_on") if active else self.t("ducking_off"))
+
+    def _edit_ducking(self):
+        d = self.duck_cfg
+        text = simpledialog.askstring(self.t("ducking"), self.t("ducking_prompt"), parent=self.root,
+                                      initialvalue=f'{d["depth_db"]:g} {d["attack_ms"]:g} {d["release_ms"]:g}')
+        if text is None: return
+        try:
+            depth, attack, release = (float(p.replace(",", ".")) for p in text.split())
+        except ValueError:
+            messagebox.showwarning(self.t("ducking"), self.t("ducking_prompt")); return
+        d.update(depth_db=min(0.0, depth), attack_ms=max(1.0, attack), release_ms=max(1.0, release))
+        self._apply_ducking()
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _apply_limiter(self) -> bool:
+        return self.engine.set_limiter(bool(self.limiter_cfg["enabled"]), float(self.limiter_cfg["ceiling_db"]))
+
+    def _toggle_limiter(self):
+        self.limiter_cfg["enabled"] = bool(self.limiter_var.get())
+        active = self._apply_limiter()
+        save_button_config(self._collect_config(), self.cfg_path)
+        if self.limiter_cfg["enabled"] and not active:
+            self.set_status(self.t("limiter_needs_numpy"))
+
+    def _edit_limiter(self):
+        text = simpledialog.askstring(self.t("limiter"), self.t("limiter_prompt"), parent=self.root,
+                                      initialvalue=f'{self.limiter_cfg["ceiling_db"]:g}')
+        if text is None: return
+        try:
+            ceiling = float(text.replace(",", "."))
+        except ValueError:
+            messagebox.showwarning(self.t("limiter"), self.t("limiter_prompt")); return
+        self.limiter_cfg["ceiling_db"] = min(0.0, ceiling)
+        self._apply_limiter()
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _set_engine_backend(self):
+        self.engine_backend = self.engine_backend_var.get()
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("engine_restart_needed"))
+
+    def _start_osc(self):
+        host = self.osc_cfg.get("host", OSC_HOST)
+        port = int(self.osc_cfg.get("port", OSC_PORT))
+        server = OscServer(self._osc_handlers(), host=host, port=port)
+        try:
+            server.start()
+        except OSError as e:
+            messagebox.showwarning("OSC", f"{self.t('osc_error')}\n{e}")
+            self.osc_var.set(False)
             return
-        self._play_file(path)
+        self.osc_server = server
+        self.set_status(self.t("osc_on").format(host=host, port=server.address[1]))
+
+    def _stop_osc(self):
+        if self.osc_server:
+            self.osc_server.stop()
+            self.osc_server = None
+
+    def _toggle_osc(self):
+        enabled = bool(self.osc_var.get())
+        self.osc_cfg["enabled"] = enabled
+        self._stop_osc()
+        if enabled:
+            self._start_osc()
+        else:
+            self.set_status(self.t("osc_off"))
+        save_button_config(self._collect_config(), self.cfg_path)
 
     def show_context_menu(self, event, r: int, c: int):
         menu = Menu(self.root, tearoff=0)
@@ -399,6 +1505,48 @@ class AudioButtonApp:
                          command=lambda: self.root.after(10, self.show_assign_dialog, r, c))
         menu.add_command(label="Renombrar…" if self.lang=="es" else "Rename…",
                          command=lambda: self._rename_button(r, c))
+        menu.add_command(label="Asignar tecla…" if self.lang=="es" else "Assign key…",
+                         command=lambda: self.root.after(10, self._edit_hotkey, r, c))
+        menu.add_command(label="Secuencia…" if self.lang=="es" else "Sequence…",
+                         command=lambda: self.root.after(10, SequenceDialog, self, r, c))
+        menu.add_command(label="Macro…",
+                         command=lambda: self.root.after(10, SequenceDialog, self, r, c, "macro"))
+        menu.add_command(label="Lista de reproducción…" if self.lang=="es" else "Playlist…",
+                         command=lambda: self.root.after(10, PlaylistDialog, self, r, c))
+        menu.add_command(label=self.t("pool_title") + "…",
+                         command=lambda: self.root.after(10, PoolDialog, self, r, c))
+        bed_var = ctk.BooleanVar(value=self._cell_role(self.buttons_data[r][c]) == "bed")
+        menu.add_checkbutton(label=self.t("role_bed"), variable=bed_var,
+                             command=lambda: self._set_role(r, c, "bed" if bed_var.get() else "effect"))
+        group = self.buttons_data[r][c].get("group")
+        group_menu = Menu(menu, tearoff=0)
+        grouped = not self.buttons_data[r][c].get("playlist")    # las listas no se cortan por grupo
+        group_var = ctk.StringVar(value=group["id"] if group else "")
+        group_menu.add_radiobutton(label=self.t("group_none"), value="", variable=group_var,
+                                   command=lambda: self._set_group(r, c, None))
+        for gid in self._group_ids():
+            group_menu.add_radiobutton(label=gid, value=gid, variable=group_var,
+                                       command=lambda g=gid: self._set_group(r, c, g))
+        group_menu.add_command(label=self.t("group_new"), command=lambda: self.root.after(10, self._new_group, r, c))
+        group_menu.add_separator()
+        mode_var = ctk.StringVar(value=group["mode"] if group else "choke")
+        for mode in GROUP_MODES:
+            group_menu.add_radiobutton(label=self.t(f"group_{mode}"), value=mode, variable=mode_var,
+                                       state="normal" if group else "disabled",
+                                       command=lambda m=mode: self._set_group_mode(r, c, m))
+        menu.add_cascade(label=self.t("group"), menu=group_menu, state="normal" if grouped else "disabled")
+        bus_menu = Menu(menu, tearoff=0)
+        bus_var = ctk.StringVar(value=self._cell_bus(self.buttons_data[r][c]))
+        for bus in BUSES:
+            bus_menu.add_radiobutton(label=self.t(f"bus_{bus}"), value=bus, variable=bus_var,
+                                     command=lambda b=bus: self._set_bus(r, c, b))
+        menu.add_cascade(label=self.t("bus"), menu=bus_menu)
+        menu.add_command(label=self.t("mix"), command=lambda: self.root.after(10, self._edit_mix, r, c))
+        loop_var = ctk.BooleanVar(value=bool(self.buttons_data[r][c].get("loop")))
+        menu.add_checkbutton(label="Modo loop" if self.lang=="es" else "Loop mode", variable=loop_var,
+                             command=lambda: self._toggle_loop_mode(r, c, loop_var.get()))
+        menu.add_command(label="Puntos de loop…" if self.lang=="es" else "Loop points…",
+                         command=lambda: self.root.after(10, self._edit_loop_points, r, c))
         menu.add_command(label="Vaciar botón" if self.lang=="es" else "Clear button",
                          command=lambda: self._clear_button(r, c))
         menu.add_separator()
@@ -411,6 +1559,10 @@ class AudioButtonApp:
 
     def show_assign_dialog(self, r: int, c: int):
         ensure_sounds_folder()
+        self._refresh_library_labels()
+        SoundPicker(self, r, c)
+
+    def _browse_audio(self, r: int, c: int):
         try:
             path = filedialog.askopenfilename(
                 parent=self.root, title=self.t("select_audio"),
@@ -421,15 +1573,100 @@ class AudioButtonApp:
             messagebox.showerror("Archivo", f"No se pudo abrir el selector:\n{e}")
             return
         if not path: return
+        self._assign_file(r, c, path)
 
+    def _assign_file(self, r: int, c: int, path: str):
         base = os.path.splitext(os.path.basename(path))[0]
+        self._clip_info.pop(path, None)
         self.buttons_data[r][c]["file"] = path
+        self.buttons_data[r][c]["hash"] = try_fingerprint(path)
+        self.file_watcher.add(path)
         labels = self.buttons_data[r][c].setdefault("labels", {"en": base, "es": base})
         labels[self.lang] = base
         self.buttons_widgets[r][c].configure(text=labels[self.lang], fg_color=BTN_FG_ASSIGNED)
         self._preview(path)
+        self.set_status(self._describe_clip(path))
         save_button_config(self._collect_config(), self.cfg_path)
 
+    # ---------- Importación masiva ----------
+    def _import_folder(self):
+        folder = filedialog.askdirectory(parent=self.root, title=self.t("import_folder"),
+                                         initialdir=ensure_sounds_folder())
+        if not folder: return
+        paths = [os.path.join(d, f) for d, _dirs, files in os.walk(folder)
+                 for f in files if f.lower().endswith(AUDIO_EXTS)]
+        self._ask_import_options(paths)
+
+    def _import_files(self):
+        paths = filedialog.askopenfilenames(
+            parent=self.root, title=self.t("import_files"),
+            filetypes=[("Audio", ("*.wav", "*.mp3")), ("WAV", "*.wav"), ("MP3", "*.mp3")],
+            initialdir=ensure_sounds_folder(),
+        )
+        self._ask_import_options(list(paths or []))
+
+    def _ask_import_options(self, paths: list[str]):
+        if not paths:
+            self.set_status(self.t("no_audio")); return
+        ImportDialog(self, paths)
+
+    def _bulk_import(self, paths: list[str], order: str, target: str):
+        """Probe en paralelo fuera del hilo de Tk; la grilla se arma al terminar."""
+        self.set_status(self.t("importing").format(n=len(paths)))
+        result, hashes = {}, {}
+        def work():
+            result.update(probe_many(paths))
+            hashes.update(zip(paths, map(try_fingerprint, paths)))
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        self._poll_import(worker, result, hashes, paths, order, target)
+
+    def _poll_import(self, worker, result, hashes, paths, order, target):
+        if worker.is_alive():
+            self.root.after(50, self._poll_import, worker, result, hashes, paths, order, target)
+            return
+        valid = [p for p in paths if result.get(p) is not None]
+        if order == "duration":
+            valid.sort(key=lambda p: (result[p].duration_us, os.path.basename(p).casefold()))
+        else:
+            valid.sort(key=lambda p: os.path.basename(p).casefold())
+
+        first_new = len(self.banks)
+        def free_slots():
+            if target == "empty":
+                for r in range(self.rows):
+                    for c in range(self.cols):
+                        cell = self.banks[self.bank][r][c]
+                        # Libre de verdad: sin archivo ni playlist, pool, macro o secuencia que pisar
+                        if not any(cell.get(k) for k in ("file", "playlist", "pool", "macro", "sequence")):
+                            yield cell
+            # Lo que no cabe va a bancos nuevos (se crean a demanda)
+            while True:
+                self.banks.append(self._empty_bank())
+                for row in self.banks[-1]:
+                    yield from row
+
+        for path, cell in zip(valid, free_slots()):
+            base = os.path.splitext(os.path.basename(path))[0]
+            cell["file"] = path
+            cell["hash"] = hashes.get(path)
+            cell["labels"] = {"en": base, "es": base}
+            self._clip_info[path] = result[path]
+
+        self._watch_profile_files()
+        self._rebuild_hotkeys()
+        self._refresh_bank_selector()
+        if target == "bank" and len(self.banks) > first_new:
+            self._select_bank(first_new)
+        else:
+            self._refresh_cells()
+        self._refresh_library_labels()
+        save_button_config(self._collect_config(), self.cfg_path)   # una sola escritura
+        msg = self.t("imported").format(n=len(valid))
+        if len(valid) < len(paths):
+            msg += " · " + self.t("skipped").format(n=len(paths) - len(valid))
+        self.set_status(msg)
+
     def _rename_button(self, r: int, c: int):
         current = self.buttons_data[r][c]["labels"].get(self.lang, f"{r+1},{c+1}")
         new = simpledialog.askstring(self.t("rename_title"), self.t("rename_prompt"),
@@ -439,12 +1676,199 @@ class AudioButtonApp:
         self.buttons_widgets[r][c].configure(text=new)
         save_button_config(self._collect_config(), self.cfg_path)
 
+    def _set_sequence(self, r: int, c: int, steps: list[dict] | None, kind: str = "sequence"):
+        self.buttons_data[r][c][kind] = steps
+        self.buttons_widgets[r][c].configure(fg_color=self._cell_color(self.buttons_data[r][c]))
+        self._watch_profile_files()
+        self._preload_sequences()
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t(f"{kind}_set").format(n=len(steps)) if steps else self.t(f"{kind}_cleared"))
+
+    def _set_playlist(self, r: int, c: int, playlist: dict | None):
+        self.buttons_data[r][c]["playlist"] = playlist
+        if playlist:
+            self.buttons_data[r][c]["group"] = None     # una lista no admite grupo de corte
+        self.buttons_widgets[r][c].configure(fg_color=self._cell_color(self.buttons_data[r][c]))
+        self._watch_profile_files()
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("playlist_set").format(n=len(playlist["files"])) if playlist
+                        else self.t("playlist_cleared"))
+
+    def _set_pool(self, r: int, c: int, pool: dict | None):
+        self.buttons_data[r][c]["pool"] = pool
+        self.buttons_widgets[r][c].configure(fg_color=self._cell_color(self.buttons_data[r][c]))
+        self._watch_profile_files()
+        self._preload_sequences()
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("pool_set").format(n=len(pool["files"]) * (pool["variants"] if pool["pitch_cents"] else 1)) if pool
+                        else self.t("pool_cleared"))
+
+    @staticmethod
+    def _cell_role(cell: dict) -> str:
+        # Las listas de reproducción son fondos salvo que se diga lo contrario
+        return cell.get("role") or ("bed" if cell.get("playlist") else "effect")
+
+    @staticmethod
+    def _cell_bus(cell: dict) -> str:
+        return cell.get("bus") or ("music" if cell.get("playlist") else DEFAULT_BUS)
+
+    def _set_bus(self, r: int, c: int, bus: str):
+        """Vale para el próximo disparo; lo que ya suena sigue en su bus."""
+        self.buttons_data[r][c]["bus"] = bus
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("bus_set") + self.t(f"bus_{bus}"))
+
+    def _edit_mix(self, r: int, c: int):
+        mix = {**MIX_DEFAULTS, **(self.buttons_data[r][c].get("mix") or {})}
+        current = "" if not self.buttons_data[r][c].get("mix") else \
+            f'{mix["gain_db"]:g} {mix["pan"]:g} {mix["attack_ms"]:g}' + \
+            ("" if mix["release_ms"] is None else f' {mix["release_ms"]:g}')
+        text = simpledialog.askstring(self.t("mix"), self.t("mix_prompt"), initialvalue=current, parent=self.root)
+        if text is None: return
+        try:
+            parts = [float(p.replace(",", ".")) for p in text.split()]
+        except ValueError:
+            messagebox.showwarning(self.t("mix"), self.t("mix_prompt")); return
+        if len(parts) > 4:
+            messagebox.showwarning(self.t("mix"), self.t("mix_prompt")); return
+        parts += [MIX_DEFAULTS[k] for k in ("gain_db", "pan", "attack_ms", "release_ms")][len(parts):]
+        gain, pan, attack, release = parts
+        mix = {"gain_db": min(MIX_GAIN_RANGE[1], max(MIX_GAIN_RANGE[0], gain)), "pan": min(1.0, max(-1.0, pan)),
+               "attack_ms": max(0, int(attack)), "release_ms": None if release is None else max(0, int(release))}
+        mix = self._mix_from_json(mix)
+        self.buttons_data[r][c]["mix"] = mix
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("mix_set") + text.strip() if mix else self.t("mix_cleared"))
+
+    # ----- Buses -----
+    def _on_bus_volume(self, bus: str, value: float):
+        self.bus_cfg[bus]["volume"] = int(round(float(value)))
+        self._schedule_bus_flush()
+
+    def _toggle_bus_mute(self, bus: str):
+        self.bus_cfg[bus]["mute"] = not self.bus_cfg[bus]["mute"]
+        self._refresh_bus_mutes()
+        self._schedule_bus_flush()
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _refresh_bus_mutes(self):
+        for bus, btn in self.bus_mutes.items():
+            btn.configure(fg_color=MUTE_ON_COLOR if self.bus_cfg[bus]["mute"] else MUTE_OFF_COLOR)
+
+    def _schedule_bus_flush(self):
+        # Los widgets solo anotan; un único envío por ciclo de Tk lleva todos los buses al motor
+        if not self._bus_flush_pending:
+            self._bus_flush_pending = True
+            self.root.after_idle(self._flush_buses)
+
+    def _flush_buses(self):
+        self._bus_flush_pending = False
+        gains = {bus: 0.0 if cfg["mute"] else cfg["volume"] / 100.0 for bus, cfg in self.bus_cfg.items()}
+        self.engine.set_buses(gains)
+        if self.meters: self.meters.set_buses(gains)
+
+    def _set_role(self, r: int, c: int, role: str):
+        self.buttons_data[r][c]["role"] = role
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _group_ids(self) -> list[str]:
+        return sorted({cell["group"]["id"] for bank in self.banks for row in bank for cell in row if cell.get("group")})
+
+    def _set_group(self, r: int, c: int, gid: str | None):
+        """Mete el botón en un grupo; hereda el modo de los otros miembros si ya existe."""
+        if gid:
+            mode = next((cell["group"]["mode"] for bank in self.banks for row in bank for cell in row
+                         if cell.get("group") and cell["group"]["id"] == gid), "choke")
+            self.buttons_data[r][c]["group"] = {"id": gid, "mode": mode}
+        else:
+            self.buttons_data[r][c]["group"] = None
+        self._preload_sequences()
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("group_set") + gid if gid else self.t("group_cleared"))
+
+    def _set_group_mode(self, r: int, c: int, mode: str):
+        """El modo es del grupo: se aplica a todos sus miembros."""
+        gid = self.buttons_data[r][c]["group"]["id"]
+        for bank in self.banks:
+            for row in bank:
+                for cell in row:
+                    if cell.get("group") and cell["group"]["id"] == gid:
+                        cell["group"]["mode"] = mode
+        save_button_config(self._collect_config(), self.cfg_path)
+
+    def _new_group(self, r: int, c: int):
+        name = simpledialog.askstring(self.t("group"), self.t("group_new_prompt"), parent=self.root)
+        if name and name.strip():
+            self._set_group(r, c, name.strip())
+
+    def _toggle_loop_mode(self, r: int, c: int, enabled: bool):
+        cell = self.buttons_data[r][c]
+        if not enabled:
+            self.engine.stop_loop((self.bank, r, c))
+        cell["loop"] = (cell.get("loop") or {"start": 0.0, "end": None}) if enabled else None
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("loop_mode_on") if enabled else self.t("loop_mode_off"))
+
+    def _edit_loop_points(self, r: int, c: int):
+        loop = self.buttons_data[r][c].get("loop") or {"start": 0.0, "end": None}
+        current = "" if not loop["start"] and loop["end"] is None else \
+            f'{loop["start"]:g} {"" if loop["end"] is None else format(loop["end"], "g")}'.strip()
+        text = simpledialog.askstring(self.t("loop_points_title"), self.t("loop_points_prompt"),
+                                      initialvalue=current, parent=self.root)
+        if text is None: return
+        try:
+            parts = [float(p.replace(",", ".")) for p in text.split()]
+        except ValueError:
+            messagebox.showwarning(self.t("loop_points_title"), self.t("loop_points_prompt")); return
+        start = max(0.0, parts[0]) if parts else 0.0
+        end = parts[1] if len(parts) > 1 else None
+        if end is not None and end <= start:
+            messagebox.showwarning(self.t("loop_points_title"), self.t("loop_points_invalid")); return
+        self.engine.stop_loop((self.bank, r, c))
+        self.buttons_data[r][c]["loop"] = {"start": start, "end": end}
+        save_button_config(self._collect_config(), self.cfg_path)
+        self.set_status(self.t("loop_mode_on"))
+
+    def _show_diagnostics(self):
+        def line(name, values):
+            values = list(values)
+            if not values:
+                return f"{name}: —"
+            return (f"{name}: p50 {percentile(values, 0.5):.2f} ms · p95 {percentile(values, 0.95):.2f} ms"
+                    f" · máx {max(values):.2f} ms ({len(values)})")
+        lines = [line("Teclado → disparo", self.key_latency_ms),
+                 line("Secuencias (jitter)", self.engine.scheduler.jitter_ms)]
+        if self.osc_server:
+            lines.append(line("OSC → disparo", self.osc_server.latency_ms))
+        if self.engine.backend == "numpy":
+            lines.append(line("Mezcla por bloque", self.engine.mixer.render_ms)
+                         + f" · cortes {self.engine.mixer.underruns}")
+        messagebox.showinfo(self.t("diagnostics"), "\n".join(lines))
+
     def _clear_button(self, r: int, c: int):
         self.buttons_data[r][c]["file"] = None
+        self.buttons_data[r][c]["hash"] = None
+        self.buttons_data[r][c]["sequence"] = None
+        self.buttons_data[r][c]["macro"] = None
+        self.buttons_data[r][c]["playlist"] = None
+        self.buttons_data[r][c]["pool"] = None
+        self.buttons_data[r][c]["loop"] = None
+        self.buttons_data[r][c]["role"] = None
+        self.buttons_data[r][c]["group"] = None
+        self.buttons_data[r][c]["bus"] = None
+        self.buttons_data[r][c]["mix"] = None
         self.buttons_data[r][c]["labels"][self.lang] = f"{r+1},{c+1}"
         self.buttons_widgets[r][c].configure(text=f"{r+1},{c+1}", fg_color=BTN_FG_EMPTY)
         save_button_config(self._collect_config(), self.cfg_path)
 
+    def _add_sound_root(self):
+        folder = filedialog.askdirectory(parent=self.root, title=self.t("add_root"))
+        if not folder: return
+        name = self.paths.add_root(os.path.basename(folder.rstrip("/\\")), folder)
+        save_button_config(self._collect_config(), self.cfg_path)
+        self._start_library_scan()
+        self.set_status(self.t("root_added").format(name=name))
+
     def _open_sounds_folder(self):
         folder = ensure_sounds_folder()
         if os.name == "posix":
@@ -455,40 +1879,328 @@ class AudioButtonApp:
             messagebox.showinfo("Carpeta", folder)
 
     # ---------- Audio ----------
-    def _play_file(self, path: str):
-        try:
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.fadeout(60); time.sleep(0.06)
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.set_volume(self.vol_var.get() / 100.0)
-            pygame.mixer.music.play()
-            self.set_status(f"▶ Reproduciendo: {os.path.basename(path)}")
-        except Exception as e:
-            messagebox.showerror("Audio", f"No se pudo reproducir:\n{e}")
-            self.set_status("⚠️ Error de reproducción")
-
     def stop(self):
-        try:
-            if pygame.mixer.music.get_busy(): pygame.mixer.music.fadeout(150)
-            self.set_status("⏹ Detenido")
+        try: self.engine.stop()
         except Exception: pass
 
     def _preview(self, path: str, ms: int = 450):
         try:
-            if pygame.mixer.music.get_busy(): pygame.mixer.music.fadeout(60)
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.set_volume(self.vol_var.get() / 100.0)
-            pygame.mixer.music.play()
-            self.root.after(ms, lambda: pygame.mixer.music.fadeout(120))
+            self.engine.preview(path)
+            self.root.after(ms, self.engine.end_preview)
         except Exception as e:
             messagebox.showerror("Preview", f"No se pudo previsualizar:\n{e}")
 
     def _press_cell(self, r: int, c: int):
-        try: self.buttons_widgets[r][c].invoke()
+        # Directo al disparo: sin pasar por el widget
+        try: self._on_button_click(r, c)
         except Exception: pass
 
 
+# -------------------- Selector con búsqueda --------------------
+class SoundPicker(ctk.CTkToplevel):
+    """Busca en la librería mientras se escribe; Enter asigna el resultado seleccionado."""
+    def __init__(self, app: AudioButtonApp, r: int, c: int):
+        super().__init__(app.root)
+        self.app, self.r, self.c = app, r, c
+        self.title(app.t("search_title"))
+        self.geometry("600x440")
+        self.transient(app.root)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.entry = ctk.CTkEntry(self, placeholder_text=app.t("search_hint"))
+        self.entry.grid(row=0, column=0, columnspan=2, padx=PANEL_PADX, pady=(PANEL_PADY, 4), sticky="ew")
+        self.listbox = Listbox(
+            self, activestyle="none", bg=PICKER_BG, fg=PICKER_FG,
+            selectbackground=BTN_FG_ASSIGNED, highlightthickness=0, borderwidth=0,
+            font=("Arial", 13)
+        )
+        self.listbox.grid(row=1, column=0, columnspan=2, padx=PANEL_PADX, pady=4, sticky="nsew")
+        self.info_lbl = ctk.CTkLabel(self, text="", anchor="w")
+        self.info_lbl.grid(row=2, column=0, padx=PANEL_PADX, pady=(4, PANEL_PADY), sticky="w")
+        ctk.CTkButton(self, text=app.t("browse"), width=110, command=self._browse).grid(
+            row=2, column=1, padx=PANEL_PADX, pady=(4, PANEL_PADY), sticky="e")
+
+        self._results = []
+        self._pending = None
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Return>", lambda e: self._accept())
+        self.entry.bind("<Up>", lambda e: self._move(-1))
+        self.entry.bind("<Down>", lambda e: self._move(1))
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.listbox.bind("<Double-Button-1>", lambda e: self._accept())
+        self.listbox.bind("<Return>", lambda e: self._accept())
+        self.after(50, self.entry.focus_set)   # CTkToplevel toma el foco tarde en macOS/Windows
+        self._refresh()
+
+    def _on_key(self, event):
+        if event.keysym in ("Return", "Up", "Down", "Escape"):
+            return
+        # Un solo refresh por ráfaga de teclas: cancela el pendiente
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after_idle(self._refresh)
+
+    def _refresh(self):
+        self._pending = None
+        lib = self.app.library
+        if not self.app.library_ready and not len(lib):
+            self.info_lbl.configure(text=self.app.t("indexing"))
+            self._pending = self.after(200, self._refresh)
+            return
+        self._results = lib.search(self.entry.get(), limit=PICKER_MAX_RESULTS)
+        self.listbox.delete(0, "end")
+        for e in self._results:
+            self.listbox.insert("end", f"{e.name}   ·   {e.folder}" if e.folder else e.name)
+        if self._results:
+            self.listbox.selection_set(0); self.listbox.activate(0)
+        self.info_lbl.configure(text=f"{len(self._results)} {self.app.t('results')}")
+
+    def _move(self, delta: int):
+        if not self._results: return "break"
+        sel = self.listbox.curselection()
+        i = min(len(self._results) - 1, max(0, (sel[0] if sel else 0) + delta))
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(i); self.listbox.activate(i); self.listbox.see(i)
+        return "break"
+
+    def _accept(self):
+        sel = self.listbox.curselection()
+        if not self._results: return
+        entry = self._results[sel[0] if sel else 0]
+        self.destroy()
+        self.app._assign_file(self.r, self.c, entry.path)
+
+    def _browse(self):
+        self.destroy()
+        self.app._browse_audio(self.r, self.c)
+
+
+# -------------------- Captura de atajo --------------------
+class HotkeyCapture(ctk.CTkToplevel):
+    def __init__(self, app: AudioButtonApp, r: int, c: int):
+        super().__init__(app.root)
+        self.app, self.r, self.c = app, r, c
+        self.title(app.t("hotkey_title"))
+        self.transient(app.root)
+        self.resizable(False, False)
+        current = app.buttons_data[r][c].get("hotkey")
+        ctk.CTkLabel(self, text=app.t("hotkey_prompt"), justify="center").grid(
+            row=0, column=0, padx=PANEL_PADX * 2, pady=(PANEL_PADY * 2, 6))
+        ctk.CTkLabel(self, text=current or "—", font=("Arial", 22, "bold")).grid(
+            row=1, column=0, padx=PANEL_PADX, pady=6)
+        ctk.CTkButton(self, text=app.t("hotkey_default"), command=lambda: self._done(None)).grid(
+            row=2, column=0, padx=PANEL_PADX, pady=(6, PANEL_PADY * 2))
+        self.bind("<KeyPress>", self._on_key)
+        self.after(50, self._grab)
+
+    def _grab(self):
+        try:
+            self.grab_set(); self.focus_force()
+        except Exception:
+            pass
+
+    def _on_key(self, event):
+        if is_modifier(event.keysym): return "break"
+        if event.keysym == "Escape":
+            self.destroy(); return "break"
+        if event.keysym in ("Delete", "BackSpace"):
+            self._done(""); return "break"
+        self._done(format_hotkey(event_mods(event.state), normalize_keysym(event.keysym)))
+        return "break"
+
+    def _done(self, hotkey: str | None):
+        self.destroy()
+        self.app._set_hotkey(self.r, self.c, hotkey)
+
+
+# -------------------- Editor de secuencias --------------------
+class SequenceDialog(ctk.CTkToplevel):
+    """Edita como texto la secuencia (kind="sequence") o las capas de la macro (kind="macro")."""
+    def __init__(self, app: AudioButtonApp, r: int, c: int, kind: str = "sequence"):
+        super().__init__(app.root)
+        self.app, self.r, self.c, self.kind = app, r, c, kind
+        self.title(f'{app.t(kind + "_title")} · {app.buttons_data[r][c]["labels"].get(app.lang, "")}')
+        self.geometry("520x340")
+        self.transient(app.root)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        ctk.CTkLabel(self, text=app.t(kind + "_help"), justify="left", anchor="w").grid(
+            row=0, column=0, columnspan=2, padx=PANEL_PADX, pady=(PANEL_PADY, 4), sticky="ew")
+        self.text = ctk.CTkTextbox(self, font=("Courier", 14))
+        self.text.grid(row=1, column=0, columnspan=2, padx=PANEL_PADX, pady=4, sticky="nsew")
+        self.text.insert("1.0", cue_sequence.format_lines(app.buttons_data[r][c].get(kind), app.paths.to_stored))
+        self.error = ctk.CTkLabel(self, text="", text_color="#F87171", anchor="w")
+        self.error.grid(row=2, column=0, padx=PANEL_PADX, pady=(4, PANEL_PADY), sticky="ew")
+        ctk.CTkButton(self, text="OK", width=90, command=self._save).grid(
+            row=2, column=1, padx=PANEL_PADX, pady=(4, PANEL_PADY), sticky="e")
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.after(50, self.text.focus_set)
+
+    def _save(self):
+        try:
+            steps = cue_sequence.parse_lines(self.text.get("1.0", "end"), self.app.paths.resolve)
+        except ValueError as e:
+            self.error.configure(text=str(e)); return
+        self.destroy()
+        self.app._set_sequence(self.r, self.c, steps, self.kind)
+
+
+# -------------------- Editor de listas de reproducción --------------------
+class PlaylistDialog(ctk.CTkToplevel):
+    field = "playlist"      # clave de la celda que edita; PoolDialog reusa la lista con otras opciones
+
+    def __init__(self, app: AudioButtonApp, r: int, c: int):
+        super().__init__(app.root)
+        self.app, self.r, self.c = app, r, c
+        current = app.buttons_data[r][c].get(self.field) or {}
+        self.files: list[str] = list(current.get("files", []))
+        self.title(f'{app.t(self.field + "_title")} · {app.buttons_data[r][c]["labels"].get(app.lang, "")}')
+        self.geometry("600x420")
+        self.transient(app.root)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.listbox = Listbox(
+            self, activestyle="none", bg=PICKER_BG, fg=PICKER_FG,
+            selectbackground=BTN_FG_ASSIGNED, highlightthickness=0, borderwidth=0,
+            font=("Arial", 13), exportselection=False,
+        )
+        self.listbox.grid(row=0, column=0, rowspan=4, padx=(PANEL_PADX, 4), pady=PANEL_PADY, sticky="nsew")
+        for i, (text, cmd) in enumerate(((app.t("playlist_add"), self._add), (app.t("playlist_remove"), self._remove),
+                                         ("▲", lambda: self._move(-1)), ("▼", lambda: self._move(1)))):
+            ctk.CTkButton(self, text=text, width=110, command=cmd).grid(
+                row=i, column=1, padx=(4, PANEL_PADX), pady=(PANEL_PADY if i == 0 else 4, 4), sticky="n")
+
+        opts = ctk.CTkFrame(self, fg_color="transparent")
+        opts.grid(row=4, column=0, columnspan=2, padx=PANEL_PADX, pady=4, sticky="ew")
+        self._build_options(opts, current)
+        ctk.CTkButton(self, text="OK", width=90, command=self._save).grid(
+            row=5, column=0, columnspan=2, padx=PANEL_PADX, pady=(4, PANEL_PADY), sticky="e")
+        self.bind("<Escape>", lambda e: self.destroy())
+        self._refresh()
+
+    def _build_options(self, opts: ctk.CTkFrame, current: dict):
+        app = self.app
+        self.shuffle_var = ctk.BooleanVar(value=bool(current.get("shuffle")))
+        ctk.CTkCheckBox(opts, text=app.t("playlist_shuffle"), variable=self.shuffle_var).pack(side="left", padx=(0, 12))
+        ctk.CTkLabel(opts, text=app.t("playlist_repeat")).pack(side="left", padx=(0, 6))
+        self._repeats = {app.t(f"repeat_{m}"): m for m in REPEAT_MODES}
+        self.repeat_var = ctk.StringVar(value=app.t(f'repeat_{current.get("repeat", "all")}'))
+        ctk.CTkSegmentedButton(opts, values=list(self._repeats), variable=self.repeat_var).pack(side="left", padx=(0, 12))
+        ctk.CTkLabel(opts, text=app.t("playlist_crossfade")).pack(side="left", padx=(0, 6))
+        self.crossfade = ctk.CTkEntry(opts, width=70)
+        self.crossfade.insert(0, str(current.get("crossfade", 0)))
+        self.crossfade.pack(side="left")
+
+    def _refresh(self, select: int | None = None):
+        self.listbox.delete(0, "end")
+        for f in self.files:
+            self.listbox.insert("end", os.path.basename(f))
+        if select is not None and self.files:
+            self.listbox.selection_set(max(0, min(select, len(self.files) - 1)))
+
+    def _selected(self) -> int | None:
+        sel = self.listbox.curselection()
+        return sel[0] if sel else None
+
+    def _add(self):
+        paths = filedialog.askopenfilenames(
+            parent=self, title=self.app.t("import_files"),
+            filetypes=[("Audio", ("*.wav", "*.mp3")), ("WAV", "*.wav"), ("MP3", "*.mp3")],
+            initialdir=ensure_sounds_folder(),
+        )
+        self.files.extend(paths or [])
+        self._refresh(len(self.files) - 1)
+
+    def _remove(self):
+        i = self._selected()
+        if i is not None:
+            del self.files[i]
+            self._refresh(i)
+
+    def _move(self, delta: int):
+        i = self._selected()
+        if i is None or not 0 <= i + delta < len(self.files): return
+        self.files[i], self.files[i + delta] = self.files[i + delta], self.files[i]
+        self._refresh(i + delta)
+
+    def _result(self) -> dict:
+        try: crossfade = max(0, int(self.crossfade.get() or 0))
+        except ValueError: crossfade = 0
+        return {"files": self.files, "shuffle": bool(self.shuffle_var.get()),
+                "repeat": self._repeats.get(self.repeat_var.get(), "all"), "crossfade": crossfade}
+
+    def _save(self):
+        result = self._result() if self.files else None
+        self.destroy()
+        getattr(self.app, f"_set_{self.field}")(self.r, self.c, result)
+
+
+class PoolDialog(PlaylistDialog):
+    """Variaciones de un botón: archivos, orden de elección y variación aleatoria de tono/ganancia."""
+    field = "pool"
+
+    def _build_options(self, opts: ctk.CTkFrame, current: dict):
+        app, current = self.app, {**POOL_DEFAULTS, **current}
+        self._orders = {app.t(f"pool_{o}"): o for o in POOL_ORDERS}
+        self.order_var = ctk.StringVar(value=app.t(f'pool_{current["order"]}'))
+        ctk.CTkSegmentedButton(opts, values=list(self._orders), variable=self.order_var).pack(side="left", padx=(0, 12))
+        self.entries = {}
+        for key in ("pitch_cents", "variants", "gain_db"):
+            ctk.CTkLabel(opts, text=app.t(f"pool_{key}")).pack(side="left", padx=(0, 6))
+            entry = ctk.CTkEntry(opts, width=56)
+            entry.insert(0, str(current[key]))
+            entry.pack(side="left", padx=(0, 12))
+            self.entries[key] = entry
+
+    def _result(self) -> dict:
+        def num(key, cast, lo, hi):
+            try: return min(hi, max(lo, cast(self.entries[key].get() or 0)))
+            except ValueError: return POOL_DEFAULTS[key]
+        return {"files": self.files, "order": self._orders.get(self.order_var.get(), "round_robin"),
+                "pitch_cents": num("pitch_cents", int, 0, POOL_MAX_CENTS),
+                "variants": num("variants", int, 1, POOL_MAX_VARIANTS),
+                "gain_db": num("gain_db", float, 0.0, -MIX_GAIN_RANGE[0])}
+
+
+# -------------------- Diálogo de importación --------------------
+class ImportDialog(ctk.CTkToplevel):
+    def __init__(self, app: AudioButtonApp, paths: list[str]):
+        super().__init__(app.root)
+        self.app, self.paths = app, paths
+        self.title(f"{app.t('import_title')} ({len(paths)})")
+        self.transient(app.root)
+        self.resizable(False, False)
+        self.grid_columnconfigure(1, weight=1)
+
+        self._orders = {app.t("order_name"): "name", app.t("order_duration"): "duration"}
+        self._targets = {app.t("target_empty"): "empty", app.t("target_bank"): "bank"}
+        self.order_var = ctk.StringVar(value=app.t("order_name"))
+        self.target_var = ctk.StringVar(value=app.t("target_empty"))
+
+        ctk.CTkLabel(self, text=app.t("import_order")).grid(row=0, column=0, padx=PANEL_PADX, pady=8, sticky="w")
+        ctk.CTkSegmentedButton(self, values=list(self._orders), variable=self.order_var).grid(
+            row=0, column=1, padx=PANEL_PADX, pady=8, sticky="ew")
+        ctk.CTkLabel(self, text=app.t("import_target")).grid(row=1, column=0, padx=PANEL_PADX, pady=8, sticky="w")
+        ctk.CTkSegmentedButton(self, values=list(self._targets), variable=self.target_var).grid(
+            row=1, column=1, padx=PANEL_PADX, pady=8, sticky="ew")
+        ctk.CTkButton(self, text=app.t("import_run"), command=self._run).grid(
+            row=2, column=0, columnspan=2, padx=PANEL_PADX, pady=(8, PANEL_PADY), sticky="e")
+        self.bind("<Return>", lambda e: self._run())
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _run(self):
+        order = self._orders[self.order_var.get()]
+        target = self._targets[self.target_var.get()]
+        self.destroy()
+        self.app._bulk_import(self.paths, order, target)
+
+
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()   # ejecutable empaquetado + motor en proceso aparte
     app_root = ctk.CTk()
     app = AudioButtonApp(app_root)
     app_root.mainloop()
+    app.engine.shutdown()
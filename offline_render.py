@@ -0,0 +1,98 @@
+# offline_render.py
+# Motor offline: mezcla un guion de disparos (t, fila, columna) de un perfil a un WAV, sin
+# dispositivo de audio y más rápido que tiempo real. Reproduce la semántica del motor en vivo
+# (un disparo reemplaza al anterior con fundido corto; stop funde más largo), así que el
+# resultado sirve de referencia para comparar contra lo que suena en el show.
+#
+# Guion: JSON lines, un disparo por línea; "#" comenta.
+#   {"t": 0.0, "row": 0, "col": 1}
+#   {"t": 1.2, "row": 2, "col": 0, "bank": 1, "gain": 0.7, "fade_in": 20, "fade_out": 300}
+#   {"t": 4.0, "cmd": "stop"}
+#   [2.5, 0, 3]                       (forma corta: t, row, col[, bank])
+from __future__ import annotations
+import json, wave
+from typing import NamedTuple
+import numpy as np
+from audio_engine import PLAY_FADE_MS, STOP_FADE_MS
+from mixdown import mix, voice, to_int16
+from pcm_cache import PcmCache, MIX_RATE
+from profile_io import iter_buttons, profile_resolver
+
+
+class Trigger(NamedTuple):
+    t: float                  # segundos desde el inicio
+    row: int = 0
+    col: int = 0
+    bank: int = 0
+    gain: float = 1.0         # lineal, multiplica al volumen del perfil
+    fade_in_ms: float = 0.0
+    fade_out_ms: float = 0.0  # al final natural del clip
+    cmd: str = "trigger"      # "trigger" | "stop"
+
+
+def parse_script(lines) -> list[Trigger]:
+    out = []
+    for n, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = json.loads(line)
+            if isinstance(item, list):
+                out.append(Trigger(float(item[0]), int(item[1]), int(item[2]),
+                                   int(item[3]) if len(item) > 3 else 0))
+            elif item.get("cmd") == "stop":
+                out.append(Trigger(float(item["t"]), cmd="stop"))
+            else:
+                out.append(Trigger(float(item["t"]), int(item["row"]), int(item["col"]),
+                                   int(item.get("bank", 0)), float(item.get("gain", 1.0)),
+                                   float(item.get("fade_in", 0)), float(item.get("fade_out", 0))))
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ValueError(f"línea {n}: {e}") from None
+    return sorted(out, key=lambda tr: tr.t)
+
+def load_script(path: str) -> list[Trigger]:
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_script(f)
+
+
+def render(cfg: dict, profile_path: str, triggers: list[Trigger], cache: PcmCache | None = None,
+           exclusive: bool = True, rate: int = MIX_RATE) -> tuple[np.ndarray, list[str]]:
+    """Mezcla los disparos -> (audio float32 (frames, 2), avisos). exclusive imita al motor en vivo."""
+    cache = cache or PcmCache()
+    resolver = profile_resolver(cfg, profile_path)
+    cells = {(b, r, c): resolver.resolve(item.get("file")) for b, r, c, item in iter_buttons(cfg)}
+    master = float(cfg.get("__meta__", {}).get("volume", 80)) / 100.0
+    warnings: list[str] = []
+
+    # 1) Voces: (inicio, pcm, ganancia, fade_in, fin, fade_out) en frames
+    voices: list[list] = []
+    for tr in triggers:
+        start = int(round(tr.t * rate))
+        if exclusive or tr.cmd == "stop":
+            cut_ms = STOP_FADE_MS if tr.cmd == "stop" else PLAY_FADE_MS
+            for v in voices:
+                if v[4] > start:
+                    v[4] = min(v[4], start + int(cut_ms * rate / 1000))
+                    v[5] = min(v[4] - start, int(cut_ms * rate / 1000))
+        if tr.cmd == "stop":
+            continue
+        path = cells.get((tr.bank, tr.row, tr.col))
+        if not path:
+            warnings.append(f"t={tr.t:.3f}: celda {tr.bank}:{tr.row},{tr.col} vacía"); continue
+        try:
+            pcm = cache.load(path)
+        except Exception as e:
+            warnings.append(f"t={tr.t:.3f}: {path}: {e}"); continue
+        voices.append(voice(start, pcm, tr.gain * master, int(tr.fade_in_ms * rate / 1000),
+                            int(tr.fade_out_ms * rate / 1000)))
+
+    # 2) Mezcla vectorizada (mixdown.mix): un slice por voz
+    return mix(voices), warnings
+
+
+def write_wav(path: str, audio: np.ndarray, rate: int = MIX_RATE) -> None:
+    pcm = to_int16(audio).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(pcm.shape[1]); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
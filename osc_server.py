@@ -0,0 +1,165 @@
+# osc_server.py
+# Endpoint UDP compatible con OSC 1.0 para disparar el board desde otro software de show.
+#   /board/trigger  i:row i:col [i:bank]
+#   /board/stop
+#   /board/volume   f:0..1   (fuera de rango se recorta)
+#   /board/bank     i:bank
+# Filas, columnas y bancos empiezan en 0, igual que en el JSON del perfil.
+# Cada comando se responde con /board/ack s:address f:latencia_ms al remitente, o con
+# /board/error s:address s:motivo si fue rechazado (p.ej. celda fuera de la grilla).
+from __future__ import annotations
+import socket, struct, threading, time, logging
+from collections import deque
+from typing import Callable
+
+log = logging.getLogger("effects_board.osc")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9000
+_NTP_EPOCH = 2208988800          # 1900-01-01 -> 1970-01-01
+_IMMEDIATE = 1
+
+
+# ----- Codificación OSC -----
+def _pad(b: bytes) -> bytes:
+    return b + b"\0" * (4 - len(b) % 4)
+
+def _read_string(data: bytes, pos: int) -> tuple[str, int]:
+    end = data.index(b"\0", pos)
+    return data[pos:end].decode("utf-8", "replace"), (end + 4) & ~3
+
+def encode_message(address: str, *args) -> bytes:
+    tags, payload = ",", b""
+    for a in args:
+        if isinstance(a, bool):
+            tags += "T" if a else "F"
+        elif isinstance(a, int):
+            tags += "i"; payload += struct.pack(">i", a)
+        elif isinstance(a, float):
+            tags += "f"; payload += struct.pack(">f", a)
+        else:
+            tags += "s"; payload += _pad(str(a).encode("utf-8"))
+    return _pad(address.encode("utf-8")) + _pad(tags.encode()) + payload
+
+def encode_bundle(messages: list[bytes], timetag: float | None = None) -> bytes:
+    """timetag en segundos Unix (time.time()); None = inmediato."""
+    if timetag is None:
+        tt = struct.pack(">Q", _IMMEDIATE)
+    else:
+        secs = timetag + _NTP_EPOCH
+        tt = struct.pack(">II", int(secs), int((secs % 1) * (1 << 32)))
+    return _pad(b"#bundle") + tt + b"".join(struct.pack(">i", len(m)) + m for m in messages)
+
+def decode_message(data: bytes) -> tuple[str, list]:
+    address, pos = _read_string(data, 0)
+    if pos >= len(data):
+        return address, []
+    tags, pos = _read_string(data, pos)
+    args = []
+    for t in tags[1:]:
+        if t == "i":
+            args.append(struct.unpack_from(">i", data, pos)[0]); pos += 4
+        elif t == "f":
+            args.append(struct.unpack_from(">f", data, pos)[0]); pos += 4
+        elif t == "d":
+            args.append(struct.unpack_from(">d", data, pos)[0]); pos += 8
+        elif t == "h":
+            args.append(struct.unpack_from(">q", data, pos)[0]); pos += 8
+        elif t == "s":
+            s, pos = _read_string(data, pos); args.append(s)
+        elif t == "T":
+            args.append(True)
+        elif t == "F":
+            args.append(False)
+        elif t in "NI":
+            args.append(None)
+        else:
+            raise ValueError(f"Tipo OSC no soportado: {t}")
+    return address, args
+
+def decode_packet(data: bytes, timetag: float | None = None):
+    """Genera (address, args, timetag_unix|None) aplanando bundles anidados."""
+    if data.startswith(b"#bundle\0"):
+        hi, lo = struct.unpack_from(">II", data, 8)
+        raw = (hi << 32) | lo
+        tt = None if raw == _IMMEDIATE else hi - _NTP_EPOCH + lo / (1 << 32)
+        pos = 16
+        while pos + 4 <= len(data):
+            size = struct.unpack_from(">i", data, pos)[0]
+            yield from decode_packet(data[pos + 4:pos + 4 + size], tt)
+            pos += 4 + size
+    else:
+        address, args = decode_message(data)
+        yield address, args, timetag
+
+
+# ----- Servidor -----
+class OscServer:
+    """Hilo dedicado que recibe datagramas y llama a los handlers sin pasar por Tk."""
+    def __init__(self, handlers: dict[str, Callable[[list], None]],
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, reply: bool = True):
+        self.handlers = handlers
+        self.host, self.port = host, port
+        self.reply = reply
+        self.latency_ms = deque(maxlen=512)     # recepción -> comando ejecutado
+        self.transport_ms = deque(maxlen=512)   # timetag del emisor -> recepción (si viene)
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._sock.getsockname() if self._sock else (self.host, self.port)
+
+    def start(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((self.host, self.port))    # port=0 -> puerto libre (útil en pruebas)
+        sock.settimeout(0.25)
+        self._sock = sock
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="osc-server", daemon=True)
+        self._thread.start()
+        log.info("OSC escuchando en %s:%d", *self.address)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread: self._thread.join(timeout=1.0)
+        if self._sock: self._sock.close()
+        self._sock = self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data, sender = self._sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            t_recv = time.perf_counter()
+            wall_recv = time.time()
+            try:
+                for address, args, timetag in decode_packet(data):
+                    self._dispatch(address, args, sender, t_recv)
+                    if timetag is not None:
+                        self.transport_ms.append((wall_recv - timetag) * 1000.0)
+            except (ValueError, struct.error) as e:
+                log.warning("Paquete OSC inválido de %s: %s", sender, e)
+
+    def _dispatch(self, address: str, args: list, sender, t_recv: float):
+        handler = self.handlers.get(address)
+        if handler is None:
+            log.debug("OSC sin handler: %s", address)
+            return
+        try:
+            handler(args)
+        except Exception as e:
+            log.warning("OSC %s %s falló: %s", address, args, e)
+            if self.reply:
+                try: self._sock.sendto(encode_message("/board/error", address, str(e)), sender)
+                except OSError: pass
+            return
+        ms = (time.perf_counter() - t_recv) * 1000.0
+        self.latency_ms.append(ms)
+        if self.reply:
+            try: self._sock.sendto(encode_message("/board/ack", address, float(ms)), sender)
+            except OSError: pass
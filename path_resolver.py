@@ -0,0 +1,108 @@
+# path_resolver.py
+# Rutas de audio portables en los perfiles.
+#   "@SOUNDS/risas/aplauso.wav" -> relativa a una raíz de sonidos declarada (__meta__.sound_roots)
+#   "risas/aplauso.wav"         -> relativa a la carpeta del perfil (o, en perfiles viejos, al cwd)
+#   "/abs/aplauso.wav"          -> absoluta, se respeta tal cual
+# Se resuelven una vez a rutas absolutas (caché) y solo se invalida al cambiar raíces o perfil.
+from __future__ import annotations
+import os
+
+ROOT_PREFIX = "@"
+DEFAULT_ROOT = "SOUNDS"
+DEFAULT_ROOT_DIR = "SOUND EFFECTS"
+
+
+class PathResolver:
+    def __init__(self, profile_path: str = "", roots: dict[str, str] | None = None):
+        self._profile_dir = ""
+        self._declared: dict[str, str] = {}
+        self._roots: dict[str, str] = {}       # nombre -> ruta absoluta
+        self._cache: dict[str, str] = {}
+        self.set_profile(profile_path)
+        self.set_roots(roots or {})
+
+    # ----- Configuración -----
+    @property
+    def roots(self) -> dict[str, str]:
+        return dict(self._roots)
+
+    def declared_roots(self) -> dict[str, str]:
+        """Raíces tal como se guardan en el perfil (sin la implícita SOUNDS)."""
+        return dict(self._declared)
+
+    def set_profile(self, profile_path: str) -> None:
+        new_dir = os.path.dirname(os.path.abspath(profile_path)) if profile_path else os.getcwd()
+        if new_dir != self._profile_dir:
+            self._profile_dir = new_dir
+            self._rebuild_roots()
+
+    def set_roots(self, roots: dict[str, str]) -> None:
+        roots = {str(k): str(v) for k, v in (roots or {}).items() if k and v}
+        if roots != self._declared:
+            self._declared = roots
+            self._rebuild_roots()
+
+    def add_root(self, name: str, folder: str) -> str:
+        name = "".join(ch for ch in name.upper() if ch.isalnum() or ch == "_") or "ROOT"
+        base, n = name, 2
+        while name in self._declared and self._declared[name] != folder:
+            name = f"{base}{n}"; n += 1
+        self.set_roots({**self._declared, name: self._portable(folder)})
+        return name
+
+    def _rebuild_roots(self):
+        roots = {DEFAULT_ROOT: os.path.abspath(DEFAULT_ROOT_DIR)}
+        for name, folder in self._declared.items():
+            roots[name] = os.path.normpath(os.path.join(self._profile_dir, os.path.expanduser(folder)))
+        self._roots = roots
+        self._cache.clear()
+
+    def _portable(self, folder: str) -> str:
+        """Raíz relativa al perfil si vive junto a él; si no, absoluta."""
+        folder = os.path.abspath(folder)
+        rel = self._relative_to(folder, self._profile_dir)
+        return rel if rel is not None else folder
+
+    @staticmethod
+    def _relative_to(path: str, base: str) -> str | None:
+        try:
+            rel = os.path.relpath(path, base)
+        except ValueError:   # otra unidad en Windows
+            return None
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel.replace(os.sep, "/")
+
+    # ----- Conversión -----
+    def resolve(self, stored: str | None) -> str | None:
+        if not stored:
+            return None
+        hit = self._cache.get(stored)
+        if hit is not None:
+            return hit
+        if stored.startswith(ROOT_PREFIX):
+            name, _, rel = stored[1:].partition("/")
+            base = self._roots.get(name)
+            path = os.path.normpath(os.path.join(base, rel)) if base else stored
+        elif os.path.isabs(stored):
+            path = os.path.normpath(stored)
+        else:
+            path = os.path.normpath(os.path.join(self._profile_dir, stored))
+            # Compatibilidad: antes las relativas se resolvían contra el cwd
+            legacy = os.path.abspath(stored)
+            if not os.path.exists(path) and os.path.exists(legacy):
+                path = legacy
+        self._cache[stored] = path
+        return path
+
+    def to_stored(self, path: str | None) -> str | None:
+        if not path:
+            return None
+        path = os.path.abspath(path)
+        # La raíz más específica gana (p.ej. una subcarpeta declarada dentro de SOUNDS)
+        for name, root in sorted(self._roots.items(), key=lambda kv: -len(kv[1])):
+            rel = self._relative_to(path, root)
+            if rel is not None:
+                return f"{ROOT_PREFIX}{name}/{rel}"
+        rel = self._relative_to(path, self._profile_dir)
+        return rel if rel is not None else path
@@ -0,0 +1,206 @@
+# pcm_cache.py
+# Caché de audio decodificado (PCM int16 en .npy) y de análisis (pico, RMS, duración, envolvente).
+# La clave es la huella de contenido (content_index.fingerprint) + formato de mezcla, así que
+# renombrar o mover un archivo no obliga a decodificarlo de nuevo.
+from __future__ import annotations
+import os, json, threading
+import numpy as np
+import pygame
+from content_index import fingerprint
+
+MIX_RATE = 44100
+MIX_CHANNELS = 2
+PCM_DIR = os.path.join(".cache", "pcm")
+ANALYSIS_FILE = "analysis.json"
+ENV_DIR = "env"               # envolventes de nivel: env/<clave>.npy
+ENVELOPE_HOP = 1024           # frames por punto de la envolvente (~23 ms a 44.1 kHz)
+_FULL_SCALE = 32768.0
+
+_decode_lock = threading.Lock()
+
+
+def _tmp_name(dest: str) -> str:
+    """Temporal único por proceso e hilo: la UI, el motor y board_cli escriben en la misma caché."""
+    return f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def init_decoder(headless: bool = False) -> tuple[int, int, int]:
+    """Inicializa el mixer si hace falta; headless usa el driver "dummy" (sin placa de audio)."""
+    if not pygame.mixer.get_init():
+        if headless:
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.mixer.init(MIX_RATE, -16, MIX_CHANNELS)
+    return pygame.mixer.get_init()
+
+def decode(path: str) -> np.ndarray:
+    """Decodifica con pygame al formato del mixer: array (frames, canales) int16."""
+    init_decoder()
+    with _decode_lock:
+        data = pygame.sndarray.array(pygame.mixer.Sound(path))
+    if data.ndim == 1:
+        data = data[:, None]
+    return np.ascontiguousarray(data, dtype=np.int16)
+
+def analyze(pcm: np.ndarray, rate: int) -> dict:
+    x = pcm.astype(np.float32) / _FULL_SCALE
+    peak = float(np.abs(x).max()) if x.size else 0.0
+    rms = float(np.sqrt(np.mean(np.square(x, dtype=np.float64)))) if x.size else 0.0
+    db = lambda v: round(20 * np.log10(v), 2) if v > 0 else None
+    return {"frames": int(len(pcm)), "duration_s": round(len(pcm) / rate, 4),
+            "peak_db": db(peak), "rms_db": db(rms)}
+
+def envelope(pcm: np.ndarray, hop: int = ENVELOPE_HOP) -> np.ndarray:
+    """(puntos, 2) float16 con RMS y pico de cada ventana de `hop` frames, en escala ±1."""
+    points = -(-len(pcm) // hop)
+    out = np.zeros((points, 2), dtype=np.float16)
+    step = 256 * hop                                  # por tramos: sin copiar el clip entero a float
+    for start in range(0, len(pcm), step):
+        chunk = np.asarray(pcm[start:start + step], dtype=np.float32) / _FULL_SCALE
+        n = -(-len(chunk) // hop)
+        if len(chunk) < n * hop:
+            chunk = np.concatenate((chunk, np.zeros((n * hop - len(chunk), chunk.shape[1]), np.float32)))
+        win = chunk.reshape(n, -1)
+        i = start // hop
+        out[i:i + n, 0] = np.sqrt(np.mean(np.square(win), axis=1))
+        out[i:i + n, 1] = np.abs(win).max(axis=1)
+    return out
+
+
+class PcmCache:
+    def __init__(self, cache_dir: str = PCM_DIR):
+        self.cache_dir = cache_dir
+        self._analysis: dict[str, dict] = {}
+        self._fp: dict[str, tuple[int, int, str]] = {}   # path -> (size, mtime_ns, fp)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load_analysis()
+
+    # ----- Claves -----
+    def key(self, path: str) -> str:
+        st = os.stat(path)
+        hit = self._fp.get(path)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            fp = hit[2]
+        else:
+            fp = fingerprint(path)
+            self._fp[path] = (st.st_size, st.st_mtime_ns, fp)
+        rate, _, channels = pygame.mixer.get_init() or (MIX_RATE, -16, MIX_CHANNELS)
+        return f"{fp.replace(':', '_')}_{rate}_{channels}"
+
+    def _npy(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def _env(self, key: str) -> str:
+        return os.path.join(self.cache_dir, ENV_DIR, key + ".npy")
+
+    # ----- PCM -----
+    def has(self, path: str) -> bool:
+        try:
+            return os.path.exists(self._npy(self.key(path)))
+        except OSError:
+            return False
+
+    def load(self, path: str) -> np.ndarray:
+        """PCM del archivo: desde la caché (mmap, sin copiar) o decodificándolo y guardándolo."""
+        key = self.key(path)
+        npy = self._npy(key)
+        try:
+            return np.load(npy, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+        pcm = decode(path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = _tmp_name(npy)
+        with open(tmp, "wb") as f:
+            np.save(f, pcm)
+        os.replace(tmp, npy)
+        if key not in self._analysis:
+            self._store_analysis(key, pcm)
+        if not os.path.exists(self._env(key)):
+            self._store_envelope(key, pcm)
+        # Se devuelve el mapeo del archivo y no la copia privada: así quien decodificó comparte
+        # las mismas páginas que los demás procesos (ver pcm_store)
+        try:
+            return np.load(npy, mmap_mode="r")
+        except (OSError, ValueError):
+            return pcm
+
+    def warm(self, path: str) -> bool:
+        """Asegura PCM, análisis y envolvente en disco. True si hubo que decodificar."""
+        key = self.key(path)
+        has_env = os.path.exists(self._env(key))
+        if os.path.exists(self._npy(key)) and key in self._analysis and has_env:
+            return False
+        pcm = self.load(path)
+        if key not in self._analysis:
+            self._store_analysis(key, pcm)
+        if not has_env and not os.path.exists(self._env(key)):
+            self._store_envelope(key, pcm)
+        return True
+
+    # ----- Análisis -----
+    def analysis(self, path: str) -> dict:
+        key = self.key(path)
+        hit = self._analysis.get(key)
+        if hit is None:
+            self.load(path)
+            hit = self._analysis[key]
+        return hit
+
+    def put_analysis(self, key: str, data: dict) -> None:
+        """Incorpora un análisis hecho en otro proceso (pre-calentado en paralelo)."""
+        with self._lock:
+            self._analysis[key] = data
+            self._dirty = True
+
+    def _store_analysis(self, key: str, pcm: np.ndarray):
+        rate = (pygame.mixer.get_init() or (MIX_RATE,))[0]
+        with self._lock:
+            self._analysis[key] = analyze(pcm, rate)
+            self._dirty = True
+
+    def envelope(self, path: str) -> np.ndarray:
+        """Envolvente (puntos, 2) de RMS y pico cada ENVELOPE_HOP frames; se calcula una vez."""
+        key = self.key(path)
+        try:
+            return np.load(self._env(key), mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+        return self._store_envelope(key, self.load(path))
+
+    def _store_envelope(self, key: str, pcm: np.ndarray) -> np.ndarray:
+        env = envelope(pcm)
+        dest = self._env(key)
+        try:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = _tmp_name(dest)
+            with open(tmp, "wb") as f:
+                np.save(f, env)
+            os.replace(tmp, dest)
+        except OSError:
+            pass
+        return env
+
+    def _load_analysis(self):
+        try:
+            with open(os.path.join(self.cache_dir, ANALYSIS_FILE), "r", encoding="utf-8") as f:
+                self._analysis = json.load(f)
+        except (OSError, ValueError):
+            self._analysis = {}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            dest = os.path.join(self.cache_dir, ANALYSIS_FILE)
+            tmp = _tmp_name(dest)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._analysis, f)
+            os.replace(tmp, dest)
+            self._dirty = False
+
+    def size_bytes(self) -> int:
+        try:
+            return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.name.endswith(".npy"))
+        except OSError:
+            return 0
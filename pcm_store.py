@@ -0,0 +1,161 @@
+# pcm_store.py
+# Almacén compartido de PCM decodificado. Los .npy de PcmCache se abren con mmap de solo lectura,
+# así que varias ventanas del board, el motor en proceso aparte y la CLI ven las mismas páginas
+# del sistema: la memoria crece con los clips distintos, no con las instancias.
+# Cada proceso cuenta sus referencias por clip y, mientras tenga alguna, deja una marca
+# refs/<clave>.<pid> junto a la caché; trim() solo borra clips sin marcas de procesos vivos.
+from __future__ import annotations
+import os, threading
+from typing import NamedTuple
+import numpy as np
+from pcm_cache import PcmCache, ENV_DIR
+
+REFS_DIR = "refs"
+
+
+def pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)    # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and code.value == 259                # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PcmRef(NamedTuple):
+    key: str
+    pcm: np.ndarray           # mmap de solo lectura (frames, canales) int16
+
+
+class PcmStore:
+    def __init__(self, cache: PcmCache | None = None):
+        self.cache = cache or PcmCache()
+        self._refs_dir = os.path.join(self.cache.cache_dir, REFS_DIR)
+        self._views: dict[str, np.ndarray] = {}    # clave -> mapeo (uno por proceso)
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _lease(self, key: str) -> str:
+        return os.path.join(self._refs_dir, f"{key}.{os.getpid()}")
+
+    # ----- Referencias -----
+    def acquire(self, path: str) -> PcmRef:
+        """PCM compartido de `path`; decodifica una sola vez entre todos los procesos."""
+        key = self.cache.key(path)
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._counts[key] += 1
+                return PcmRef(key, view)
+        view = self.cache.load(path)
+        with self._lock:
+            if key in self._views:            # otro hilo llegó primero
+                self._counts[key] += 1
+                return PcmRef(key, self._views[key])
+            self._views[key], self._counts[key] = view, 1
+            # La marca se crea y se borra con el lock tomado: un release concurrente no puede
+            # quitar la de un acquire que ya volvió a contar el clip
+            try:
+                os.makedirs(self._refs_dir, exist_ok=True)
+                open(self._lease(key), "w").close()
+            except OSError:
+                pass
+        try: os.utime(os.path.join(self.cache.cache_dir, key + ".npy"))   # orden de uso para trim()
+        except OSError: pass
+        return PcmRef(key, view)
+
+    def release(self, ref: PcmRef) -> None:
+        with self._lock:
+            n = self._counts.get(ref.key, 0) - 1
+            if n > 0:
+                self._counts[ref.key] = n
+                return
+            self._counts.pop(ref.key, None)
+            self._views.pop(ref.key, None)
+            try: os.remove(self._lease(ref.key))
+            except OSError: pass
+
+    def release_all(self) -> None:
+        with self._lock:
+            keys = list(self._counts)
+            self._counts.clear(); self._views.clear()
+        for key in keys:
+            try: os.remove(self._lease(key))
+            except OSError: pass
+
+    def refs(self, key: str) -> int:
+        """Referencias de este proceso."""
+        return self._counts.get(key, 0)
+
+    def users(self, key: str) -> list[int]:
+        """PIDs vivos que usan el clip; limpia las marcas que dejaron procesos muertos."""
+        return self.all_users().get(key, [])
+
+    def all_users(self) -> dict[str, list[int]]:
+        """clave -> PIDs vivos, con una sola lectura de refs/ (para recorrer muchos clips)."""
+        users: dict[str, list[int]] = {}
+        try:
+            entries = os.listdir(self._refs_dir)
+        except OSError:
+            return users
+        alive: dict[int, bool] = {}
+        for entry in entries:
+            key, _, pid = entry.rpartition(".")
+            try: pid = int(pid)
+            except ValueError: continue
+            if pid not in alive:
+                alive[pid] = pid_alive(pid)
+            if alive[pid]:
+                users.setdefault(key, []).append(pid)
+            else:
+                try: os.remove(os.path.join(self._refs_dir, entry))
+                except OSError: pass
+        return users
+
+    # ----- Sin referencia (uso puntual) -----
+    def load(self, path: str) -> np.ndarray:
+        return self.cache.load(path)
+
+    def save(self) -> None:
+        self.cache.save()
+
+    # ----- Mantenimiento -----
+    def trim(self, max_bytes: int) -> list[str]:
+        """Borra los clips menos usados hasta bajar de max_bytes, salvo los que alguien tiene abiertos."""
+        try:
+            files = [e for e in os.scandir(self.cache.cache_dir) if e.name.endswith(".npy")]
+        except OSError:
+            return []
+        files.sort(key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in files)
+        users = self.all_users()
+        removed = []
+        for e in files:
+            if total <= max_bytes:
+                break
+            key = e.name[:-4]
+            if self.refs(key) or users.get(key):
+                continue
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+            except OSError:
+                continue
+            try: os.remove(os.path.join(self.cache.cache_dir, ENV_DIR, key + ".npy"))   # su envolvente
+            except OSError: pass
+            total -= size
+            removed.append(key)
+        return removed
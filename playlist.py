@@ -0,0 +1,191 @@
+# playlist.py
+# Reproductor de listas (música de fondo) sobre dos canales reservados del mixer, aparte de
+# mixer.music y de las voces de efectos: los disparos normales no la cortan.
+#   crossfade 0 -> sin huecos: la pista siguiente se decodifica por adelantado y se encola en el
+#                  mismo canal (Channel.queue), así SDL la empalma sin pasar por Python.
+#   crossfade N -> doble buffer: la siguiente ya decodificada arranca en el otro canal N ms antes
+#                  del final con fundido cruzado.
+from __future__ import annotations
+import random, logging, threading
+from typing import Callable
+import pygame
+from scheduler import clock
+
+log = logging.getLogger("effects_board.playlist")
+
+REPEAT_MODES = ("off", "all", "one")
+PLAYLIST_CHANNELS = 2     # canales reservados (0 y 1)
+_POLL_S = 0.02
+_STOP_FADE_MS = 400
+_silence: pygame.mixer.Sound | None = None
+
+
+def cancel_queue(channel: pygame.mixer.Channel) -> None:
+    """Descarta lo encolado en el canal. pygame no tiene API para esto y, al terminar un
+    fadeout, arranca lo que haya en cola: se reemplaza por un instante de silencio."""
+    global _silence
+    if channel.get_queue() is None:
+        return
+    if hasattr(channel, "cancel_queue"):     # canal de soft_mixer
+        channel.cancel_queue(); return
+    if _silence is None:
+        _rate, size, channels = pygame.mixer.get_init()
+        _silence = pygame.mixer.Sound(buffer=bytes(16 * channels * abs(size) // 8))
+    channel.queue(_silence)
+
+
+class TrackOrder:
+    """Orden de reproducción según shuffle/repeat. advance() devuelve la próxima pista o None."""
+    def __init__(self, files: list[str], shuffle: bool = False, repeat: str = "all",
+                 rng: random.Random | None = None):
+        self.files = list(files)
+        self.shuffle = shuffle
+        self.repeat = repeat if repeat in REPEAT_MODES else "all"
+        self._rng = rng or random.Random()
+        self._order: list[str] = []
+        self._pos = -1
+        self.current: str | None = None
+
+    def _new_cycle(self) -> list[str]:
+        order = list(self.files)
+        if self.shuffle:
+            self._rng.shuffle(order)
+            # Que el cambio de vuelta no repita la última pista
+            if len(order) > 1 and order[0] == self.current:
+                order[0], order[-1] = order[-1], order[0]
+        return order
+
+    def advance(self) -> str | None:
+        if not self.files:
+            return None
+        if self.repeat == "one" and self.current is not None:
+            return self.current
+        self._pos += 1
+        if self._pos >= len(self._order):
+            if self._order and self.repeat == "off":
+                return None
+            self._order, self._pos = self._new_cycle(), 0
+        self.current = self._order[self._pos]
+        return self.current
+
+
+class PlaylistPlayer:
+    def __init__(self, load: Callable[[str], pygame.mixer.Sound], on_track: Callable[[str], None]):
+        self._load = load              # ruta -> Sound (se llama desde el hilo del reproductor)
+        self._on_track = on_track
+        self.volume = 1.0
+        self.key = None                # identifica quién la lanzó (celda); None = detenida
+        self.current: str | None = None
+        self._channels: list[pygame.mixer.Channel] = []
+        self._active: pygame.mixer.Channel | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def init(self, mixer=pygame.mixer) -> None:
+        mixer.set_reserved(PLAYLIST_CHANNELS)
+        self._channels = [mixer.Channel(i) for i in range(PLAYLIST_CHANNELS)]
+
+    @property
+    def channels(self) -> list:
+        return list(self._channels)
+
+    @property
+    def playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, key, files: list[str], shuffle: bool = False, repeat: str = "all",
+              crossfade_ms: int = 0) -> None:
+        self.stop(fade_ms=max(crossfade_ms, 150))
+        order = TrackOrder(files, shuffle, repeat)
+        self._stop = threading.Event()
+        self.key = key
+        self._thread = threading.Thread(target=self._run, args=(order, max(0, int(crossfade_ms)), self._stop),
+                                        name="playlist", daemon=True)
+        self._thread.start()
+
+    def stop(self, fade_ms: int = _STOP_FADE_MS) -> None:
+        self._stop.set()
+        with self._lock:
+            for ch in self._channels:
+                cancel_queue(ch)
+                if ch.get_busy(): ch.fadeout(fade_ms)
+            self.key = self.current = None
+            self._active = None
+
+    def set_volume(self, volume: float) -> None:
+        self.volume = volume
+        with self._lock:
+            if self._active is not None:
+                self._active.set_volume(volume)
+
+    # ----- Hilo -----
+    def _next_sound(self, order: TrackOrder):
+        while True:
+            path = order.advance()
+            if path is None:
+                return None, None
+            try:
+                return path, self._load(path)
+            except Exception as e:
+                log.warning("pista omitida %s: %s", path, e)
+                if order.repeat == "one" or len(order.files) == 1:
+                    return None, None
+
+    def _begin(self, channel, path, snd, stop: threading.Event, fade_ms: int = 0) -> bool:
+        """Arranca la pista salvo que la lista se haya detenido o reemplazado mientras se decodificaba."""
+        with self._lock:
+            if stop.is_set(): return False
+            channel.set_volume(self.volume)
+            channel.play(snd, fade_ms=fade_ms)
+            self._active, self.current = channel, path
+        self._on_track(path)
+        return True
+
+    def _queue(self, channel, snd, stop: threading.Event) -> None:
+        with self._lock:
+            if not stop.is_set(): channel.queue(snd)
+
+    def _run(self, order: TrackOrder, crossfade_ms: int, stop: threading.Event):
+        path, snd = self._next_sound(order)
+        if snd is None:
+            return
+        idx = 0
+        if not self._begin(self._channels[idx], path, snd, stop):
+            return
+        started = clock()
+        # Prefetch: la siguiente se decodifica mientras suena la actual
+        nxt_path, nxt = self._next_sound(order)
+        if not crossfade_ms and nxt is not None:
+            self._queue(self._channels[idx], nxt, stop)
+        while not stop.wait(_POLL_S):
+            ch = self._channels[idx]
+            if crossfade_ms:
+                if nxt is not None and clock() - started >= snd.get_length() - crossfade_ms / 1000.0:
+                    idx = 1 - idx
+                    with self._lock:
+                        if stop.is_set(): return
+                        ch.fadeout(crossfade_ms)
+                    if not self._begin(self._channels[idx], nxt_path, nxt, stop, crossfade_ms): return
+                    path, snd, started = nxt_path, nxt, clock()
+                    nxt_path, nxt = self._next_sound(order)
+                elif nxt is None and not ch.get_busy():
+                    break
+            else:
+                if nxt is not None and ch.get_busy() and ch.get_queue() is None:
+                    # SDL ya empalmó la encolada: pasa a ser la actual y se prepara otra
+                    with self._lock:
+                        self.current = nxt_path
+                    self._on_track(nxt_path)
+                    path, snd = nxt_path, nxt
+                    nxt_path, nxt = self._next_sound(order)
+                    if nxt is not None:
+                        self._queue(ch, nxt, stop)
+                elif not ch.get_busy():
+                    break
+        with self._lock:
+            if not stop.is_set():
+                self.key = self.current = None
+                self._active = None
+        if not stop.is_set():
+            self._on_track(None)
@@ -0,0 +1,258 @@
+# profile_io.py
+# Lectura, migración y validación de perfiles JSON sin Tk ni audio: la usan la app y la CLI.
+from __future__ import annotations
+import os, json
+from hotkeys import parse_hotkey
+from path_resolver import PathResolver
+
+LANGS = ("en", "es")
+ROLES = ("effect", "bed")     # "bed" = fondo que se atenúa con los efectos (ducking)
+GROUP_MODES = ("choke", "exclusive")   # cómo corta un miembro a los demás: en seco o con fundido
+BUSES = ("sfx", "music", "voice")       # submezclas con fader y mute propios
+DEFAULT_BUS = "sfx"                      # las listas de reproducción van a "music" salvo que se diga otra cosa
+BUS_DEFAULTS = {bus: {"volume": 100, "mute": False} for bus in BUSES}
+MIX_DEFAULTS = {"gain_db": 0.0, "pan": 0.0, "attack_ms": 0, "release_ms": None}   # por botón
+MIX_GAIN_RANGE = (-60.0, 0.0)            # es volumen de canal: solo atenúa
+POOL_ORDERS = ("round_robin", "random")   # cómo elige variante un botón con "pool"
+POOL_DEFAULTS = {"order": "round_robin", "pitch_cents": 0, "gain_db": 0.0, "variants": 1}
+POOL_MAX_CENTS = 1200
+POOL_MAX_VARIANTS = 8                     # variantes de tono por archivo (todas en memoria)
+DUCKING_DEFAULTS = {"enabled": False, "depth_db": -12.0, "attack_ms": 80.0, "release_ms": 400.0}
+LIMITER_DEFAULTS = {"enabled": True, "ceiling_db": -1.0}
+DEFAULT_PROFILE = {
+    "grid": {"rows": 3, "cols": 4},
+    "buttons": [],
+    "__meta__": {"volume": 80, "lang": "es"},
+}
+
+
+def migrate_profile(raw: dict) -> bool:
+    """Lleva un perfil viejo al formato actual (en el lugar). Devuelve True si cambió algo."""
+    changed = False
+    # Migración: label -> labels{en,es}
+    for b in raw.get("buttons", []):
+        if "labels" not in b:
+            label_val = b.get("label")
+            if isinstance(label_val, str) and label_val.strip():
+                b["labels"] = {"en": label_val, "es": label_val}
+            else:
+                b["labels"] = {
+                    "en": f'{b.get("row",0)+1},{b.get("col",0)+1}',
+                    "es": f'{b.get("row",0)+1},{b.get("col",0)+1}'
+                }
+            changed = True
+        if "label" in b:
+            del b["label"]; changed = True
+    if "__meta__" not in raw:
+        raw["__meta__"] = {"volume": 80, "lang": "es"}; changed = True
+    elif "lang" not in raw["__meta__"]:
+        raw["__meta__"]["lang"] = "es"; changed = True
+    return changed
+
+def read_profile(path: str) -> tuple[dict, bool]:
+    """(perfil migrado en memoria, hace_falta_guardar). No escribe nada."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("el perfil no es un objeto JSON")
+    return raw, migrate_profile(raw)
+
+def load_button_config(path: str) -> dict:
+    if not os.path.exists(path):
+        data = json.loads(json.dumps(DEFAULT_PROFILE))
+        save_button_config(data, path)
+        return data
+    raw, changed = read_profile(path)
+    if changed:
+        save_button_config(raw, path)
+    return raw
+
+def save_button_config(cfg: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, ensure_ascii=False, indent=2)
+
+
+# ----- Estructura -----
+def grid_shape(cfg: dict) -> tuple[int, int, int]:
+    """(filas, columnas, bancos) con la misma tolerancia que la app al cargar."""
+    grid = cfg.get("grid", {})
+    rows, cols = int(grid.get("rows", 3)), int(grid.get("cols", 4))
+    banks = max(1, int(grid.get("banks", 1)))
+    for item in cfg.get("buttons", []):
+        try: banks = max(banks, int(item.get("bank", 0)) + 1)
+        except Exception: continue
+    return rows, cols, banks
+
+def profile_resolver(cfg: dict, path: str) -> PathResolver:
+    return PathResolver(path, cfg.get("__meta__", {}).get("sound_roots") or {})
+
+def iter_buttons(cfg: dict):
+    """Genera (bank, row, col, item) de las entradas bien formadas dentro de la grilla."""
+    rows, cols, _ = grid_shape(cfg)
+    for item in cfg.get("buttons", []):
+        try:
+            b = int(item.get("bank", 0)); r = int(item.get("row")); c = int(item.get("col"))
+        except Exception:
+            continue
+        if 0 <= b and 0 <= r < rows and 0 <= c < cols:
+            yield b, r, c, item
+
+
+def mix_problems(mix) -> list[str]:
+    """Problemas del bloque "mix" de un botón (ganancia, paneo, ataque, liberación)."""
+    if mix is None:
+        return []
+    if not isinstance(mix, dict):
+        return ["'mix' inválido"]
+    problems = []
+    num = lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    gain = mix.get("gain_db", 0.0)
+    if not num(gain) or not MIX_GAIN_RANGE[0] <= gain <= MIX_GAIN_RANGE[1]:
+        problems.append(f"ganancia fuera de rango: {gain!r}")
+    if not num(mix.get("pan", 0.0)) or not -1.0 <= mix.get("pan", 0.0) <= 1.0:
+        problems.append(f"paneo fuera de rango: {mix.get('pan')!r}")
+    for k in ("attack_ms", "release_ms"):
+        v = mix.get(k)
+        if v is not None and (not num(v) or v < 0):
+            problems.append(f"'{k}' inválido: {v!r}")
+    return problems
+
+def pool_problems(pool) -> list[str]:
+    """Problemas del bloque "pool" de un botón (archivos, orden y variación de tono/ganancia)."""
+    if pool is None:
+        return []
+    if not isinstance(pool, dict) or not isinstance(pool.get("files"), list) or not pool["files"]:
+        return ["'pool' inválido"]
+    problems = []
+    num = lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    if pool.get("order", "round_robin") not in POOL_ORDERS:
+        problems.append(f"orden de variaciones desconocido: {pool.get('order')!r}")
+    cents = pool.get("pitch_cents", 0)
+    if not num(cents) or not 0 <= cents <= POOL_MAX_CENTS:
+        problems.append(f"variación de tono fuera de rango: {cents!r}")
+    gain = pool.get("gain_db", 0.0)
+    if not num(gain) or not 0 <= gain <= -MIX_GAIN_RANGE[0]:
+        problems.append(f"variación de ganancia fuera de rango: {gain!r}")
+    n = pool.get("variants", 1)
+    if not isinstance(n, int) or isinstance(n, bool) or not 1 <= n <= POOL_MAX_VARIANTS:
+        problems.append(f"número de variantes inválido: {n!r}")
+    return problems
+
+def validate_profile(cfg: dict, path: str, check_files: bool = True) -> list[str]:
+    """Lista de problemas legibles; vacía si el perfil se puede cargar tal cual."""
+    problems: list[str] = []
+    grid = cfg.get("grid")
+    if not isinstance(grid, dict):
+        return ["falta 'grid'"]
+    try:
+        rows, cols, banks = grid_shape(cfg)
+    except (TypeError, ValueError):
+        return ["'grid' tiene valores no numéricos"]
+    if rows < 1 or cols < 1:
+        problems.append(f"grilla inválida {rows}x{cols}")
+    meta = cfg.get("__meta__", {})
+    vol = meta.get("volume", 80)
+    if not isinstance(vol, (int, float)) or not 0 <= vol <= 100:
+        problems.append(f"volumen fuera de rango: {vol!r}")
+    if meta.get("lang") not in LANGS:
+        problems.append(f"idioma desconocido: {meta.get('lang')!r}")
+    duck = meta.get("ducking")
+    if duck is not None:
+        if not isinstance(duck, dict) or not all(isinstance(duck.get(k, 0), (int, float))
+                                                 for k in ("depth_db", "attack_ms", "release_ms")):
+            problems.append("'ducking' inválido")
+    lim = meta.get("limiter")
+    if lim is not None and (not isinstance(lim, dict) or not isinstance(lim.get("ceiling_db", -1.0), (int, float))):
+        problems.append("'limiter' inválido")
+    buses = meta.get("buses")
+    if buses is not None and not isinstance(buses, dict):
+        problems.append("'buses' inválido")
+    for name, bus in (buses.items() if isinstance(buses, dict) else ()):
+        if name not in BUSES:
+            problems.append(f"bus desconocido: {name!r}")
+        elif not isinstance(bus, dict) or not isinstance(bus.get("volume", 100), (int, float)) \
+                or not 0 <= bus.get("volume", 100) <= 100:
+            problems.append(f"bus {name}: volumen inválido")
+    if not isinstance(cfg.get("buttons", []), list):
+        return problems + ["'buttons' no es una lista"]
+
+    resolver = profile_resolver(cfg, path) if check_files else None
+    seen: set[tuple[int, int, int]] = set()
+    hotkeys: dict[tuple[int, int, str], tuple[int, int]] = {}
+    for i, item in enumerate(cfg.get("buttons", [])):
+        try:
+            b = int(item.get("bank", 0)); r = int(item.get("row")); c = int(item.get("col"))
+        except Exception:
+            problems.append(f"botón #{i}: posición inválida"); continue
+        where = f"botón {b}:{r},{c}" if banks > 1 else f"botón {r},{c}"
+        if not (0 <= b and 0 <= r < rows and 0 <= c < cols):
+            problems.append(f"{where}: fuera de la grilla {rows}x{cols}"); continue
+        if (b, r, c) in seen:
+            problems.append(f"{where}: duplicado")
+        seen.add((b, r, c))
+        if not isinstance(item.get("labels"), dict):
+            problems.append(f"{where}: 'labels' inválido")
+        hk = item.get("hotkey")
+        if hk:
+            parsed = parse_hotkey(hk)
+            if parsed is None:
+                problems.append(f"{where}: atajo inválido {hk!r}")
+            elif (b, *parsed) in hotkeys:
+                problems.append(f"{where}: atajo {hk!r} repetido en {hotkeys[(b, *parsed)]}")
+            else:
+                hotkeys[(b, *parsed)] = (r, c)
+        if resolver and item.get("file"):
+            full = resolver.resolve(item["file"])
+            if not os.path.isfile(full):
+                problems.append(f"{where}: no existe {item['file']}")
+        if item.get("role") is not None and item["role"] not in ROLES:
+            problems.append(f"{where}: rol desconocido {item['role']!r}")
+        if item.get("bus") is not None and item["bus"] not in BUSES:
+            problems.append(f"{where}: bus desconocido {item['bus']!r}")
+        problems += [f"{where}: {p}" for p in mix_problems(item.get("mix"))]
+        group = item.get("group")
+        if group is not None and (not isinstance(group, dict) or not str(group.get("id") or "").strip()):
+            problems.append(f"{where}: 'group' inválido")
+        elif group is not None and group.get("mode", "choke") not in GROUP_MODES:
+            problems.append(f"{where}: modo de grupo desconocido {group.get('mode')!r}")
+        elif group is not None and item.get("playlist") is not None:
+            problems.append(f"{where}: las listas de reproducción no admiten 'group'")
+        loop = item.get("loop")
+        if loop is not None and loop is not True and not isinstance(loop, dict):
+            problems.append(f"{where}: 'loop' inválido")
+        elif isinstance(loop, dict) and loop.get("end") is not None:
+            try:
+                if float(loop["end"]) <= float(loop.get("start", 0) or 0):
+                    problems.append(f"{where}: el loop termina antes de empezar")
+            except (TypeError, ValueError):
+                problems.append(f"{where}: puntos de loop no numéricos")
+        pl = item.get("playlist")
+        if pl is not None:
+            if not isinstance(pl, dict) or not isinstance(pl.get("files"), list):
+                problems.append(f"{where}: 'playlist' inválida")
+            elif resolver:
+                for f in pl["files"]:
+                    if not f or not os.path.isfile(resolver.resolve(f)):
+                        problems.append(f"{where}: pista sin archivo {f}")
+        pool, pool_issues = item.get("pool"), pool_problems(item.get("pool"))
+        problems += [f"{where}: {p}" for p in pool_issues]
+        if resolver and pool is not None and not pool_issues:
+            for f in pool["files"]:
+                if not f or not os.path.isfile(resolver.resolve(f)):
+                    problems.append(f"{where}: variación sin archivo {f}")
+        for kind in ("sequence", "macro"):
+            seq = item.get(kind)
+            if seq is not None and not isinstance(seq, list):
+                problems.append(f"{where}: '{kind}' no es una lista")
+            for step in seq if isinstance(seq, list) else ():
+                try:
+                    if float(step.get("t", 0)) < 0: raise ValueError
+                    if step.get("file"):
+                        if resolver and not os.path.isfile(resolver.resolve(step["file"])):
+                            problems.append(f"{where}: paso de {kind} sin archivo {step['file']}")
+                    elif not (0 <= int(step["row"]) < rows and 0 <= int(step["col"]) < cols
+                              and 0 <= int(step.get("bank", b)) < banks):
+                        problems.append(f"{where}: paso de {kind} fuera de la grilla")
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    problems.append(f"{where}: paso de {kind} inválido {step!r}")
+    return problems
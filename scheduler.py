@@ -0,0 +1,112 @@
+# scheduler.py
+# Planificador de eventos con reloj monotónico de alta resolución (time.perf_counter) en un hilo
+# propio, independiente de root.after. Duerme hasta `lookahead` antes del vencimiento y el resto
+# lo espera con sleeps cortos, así el error típico queda en décimas de milisegundo aunque Tk esté
+# ocupado. Cada disparo registra su desvío (jitter) para diagnóstico.
+from __future__ import annotations
+import time, heapq, logging, threading
+from collections import deque
+from typing import Callable
+
+log = logging.getLogger("effects_board.scheduler")
+
+LOOKAHEAD_S = 0.004    # despierta 4 ms antes y afina el resto
+_SPIN_S = 0.0005       # por debajo de esto, sleep(0) (cede el GIL sin dormir un tick entero)
+
+clock = time.perf_counter
+
+
+def percentile(values, q: float) -> float:
+    data = sorted(values)
+    if not data:
+        return 0.0
+    return data[min(len(data) - 1, int(round(q * (len(data) - 1))))]
+
+
+class Scheduler:
+    def __init__(self, lookahead_s: float = LOOKAHEAD_S):
+        self.lookahead_s = lookahead_s
+        self.jitter_ms = deque(maxlen=512)     # disparo real - vencimiento
+        self._heap: list[tuple[float, int, str, Callable, tuple]] = []
+        self._seq = 0
+        self._inflight: str | None = None      # tag del evento en espera fina (ya fuera del heap)
+        self._skip_inflight = False
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    # ----- Ciclo de vida -----
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread: self._thread.join(timeout=1.0)
+        self._thread = None
+
+    # ----- API -----
+    def at(self, due: float, fn: Callable, *args, tag: str = "") -> int:
+        """Ejecuta fn(*args) en el instante `due` (en unidades de scheduler.clock())."""
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (due, self._seq, tag, fn, args))
+            if self._heap[0][1] == self._seq:
+                self._cond.notify()
+            return self._seq
+
+    def after(self, delay_s: float, fn: Callable, *args, tag: str = "") -> int:
+        return self.at(clock() + max(0.0, delay_s), fn, *args, tag=tag)
+
+    def cancel(self, tag: str | None = None) -> int:
+        """Descarta lo pendiente con ese tag (o todo si tag es None). Devuelve cuántos."""
+        with self._cond:
+            before = len(self._heap)
+            self._heap = [e for e in self._heap if tag is not None and e[2] != tag]
+            heapq.heapify(self._heap)
+            if self._inflight is not None and (tag is None or tag == self._inflight):
+                self._skip_inflight = True
+            return before - len(self._heap)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self) -> dict:
+        data = list(self.jitter_ms)
+        return {"n": len(data), "p50_ms": percentile(data, 0.5), "p95_ms": percentile(data, 0.95),
+                "max_ms": max(data, default=0.0)}
+
+    # ----- Hilo -----
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][0] - clock() > self.lookahead_s):
+                    timeout = self._heap[0][0] - clock() - self.lookahead_s if self._heap else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                due, _seq, tag, fn, args = heapq.heappop(self._heap)
+                self._inflight, self._skip_inflight = tag, False
+            # Espera fina fuera del lock: se pueden seguir agregando eventos mientras tanto
+            while True:
+                left = due - clock()
+                if left <= 0:
+                    break
+                time.sleep(left / 2 if left > _SPIN_S else 0)
+            late_ms = (clock() - due) * 1000.0
+            with self._cond:
+                skip, self._inflight = self._skip_inflight, None
+            if skip:
+                continue
+            self.jitter_ms.append(late_ms)
+            try:
+                fn(*args)
+            except Exception as e:
+                log.warning("evento programado falló: %s", e)
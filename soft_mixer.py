@@ -0,0 +1,327 @@
+# soft_mixer.py
+# Mezclador por software (opcional, __meta__.engine = "numpy"): suma las voces activas en bloques
+# con NumPy (ganancia, paneo, fundidos) y entrega el resultado como un stream, encolando cada
+# bloque en un canal reservado de pygame.mixer. Así hay un bus master propio donde enganchar
+# procesos (master_fx) y medir niveles. Con un Ducker (bus_fx), las voces de rol "bed" se suman
+# en un bus aparte que se atenúa mientras suena algún efecto; un Limiter cierra el master.
+# Imita la parte de pygame.mixer que usan AudioEngine, PlaylistPlayer y Looper (Sound, Channel,
+# music, find_channel, fadeout…), así el motor cambia de backend sin cambiar de lógica.
+# Los Sounds no copian el PCM: apuntan al mmap compartido de pcm_store.
+from __future__ import annotations
+import time, threading
+from collections import deque
+from typing import Callable
+import numpy as np
+import pygame
+
+STREAM_BLOCK = 512          # frames por bloque (~11.6 ms a 44.1 kHz); latencia de disparo ≤ 2 bloques
+STREAM_CHANNEL = 0          # canal de pygame.mixer por el que sale el stream
+_POLL_S = 0.002
+_FULL_SCALE = 32768.0
+
+
+class SoftSound:
+    """pygame.mixer.Sound sobre un array int16 (frames, canales); no copia el PCM."""
+    def __init__(self, mixer: SoftMixer, pcm: np.ndarray):
+        self._mixer = mixer
+        self.pcm = pcm if pcm.ndim == 2 else pcm[:, None]
+
+    def get_length(self) -> float:
+        return len(self.pcm) / self._mixer.rate
+
+    def play(self, loops: int = 0, fade_ms: int = 0) -> SoftChannel | None:
+        channel = self._mixer.find_channel()
+        if channel is not None:
+            channel.play(self, loops, fade_ms)
+        return channel
+
+
+class SoftChannel:
+    """pygame.mixer.Channel: posición, vueltas, volumen por lado y una rampa de ganancia lineal."""
+    def __init__(self, mixer: SoftMixer, index: int):
+        self._mixer = mixer
+        self.index = index
+        self._sound: SoftSound | None = None
+        self._queued: SoftSound | None = None
+        self._pos = 0
+        self._loops = 0
+        self._started = 0                     # orden de arranque, para find_channel(force=True)
+        self._vol = np.ones(2, dtype=np.float32)
+        self._env, self._env_step, self._env_target = 1.0, 0.0, 1.0
+        self._stop_at_zero = False
+        self.role = "effect"                  # "effect" | "bed" (lo asigna el motor al disparar)
+
+    # ----- API tipo pygame -----
+    def play(self, sound: SoftSound, loops: int = 0, fade_ms: int = 0) -> None:
+        with self._mixer.lock:
+            self._sound, self._queued, self._pos, self._loops = sound, None, 0, loops
+            self._started = self._mixer._next_start()
+            self._stop_at_zero = False
+            if fade_ms:
+                self._env = 0.0
+                self._ramp(1.0, fade_ms)
+            else:
+                self._env, self._env_step, self._env_target = 1.0, 0.0, 1.0
+
+    def queue(self, sound: SoftSound) -> None:
+        with self._mixer.lock:
+            if self._sound is None: self.play(sound)
+            else: self._queued = sound
+
+    def cancel_queue(self) -> None:
+        with self._mixer.lock:
+            self._queued = None
+
+    def get_queue(self) -> SoftSound | None:
+        return self._queued
+
+    def get_sound(self) -> SoftSound | None:
+        return self._sound
+
+    def get_busy(self) -> bool:
+        return self._sound is not None
+
+    def stop(self) -> None:
+        with self._mixer.lock:
+            self._sound = self._queued = None
+
+    def fadeout(self, ms: int) -> None:
+        # A diferencia de pygame, lo encolado no arranca al terminar el fundido. Como en SDL_mixer,
+        # un canal que ya se está apagando conserva su fundido (salvo ms <= 0: corta ya)
+        with self._mixer.lock:
+            if self._sound is None:
+                return
+            if ms <= 0:
+                self._sound = self._queued = None
+                return
+            if self._stop_at_zero:
+                return
+            self._queued = None
+            self._ramp(0.0, ms)
+            self._stop_at_zero = True
+
+    def set_volume(self, left: float, right: float | None = None) -> None:
+        """Un valor = ambos lados; dos valores = paneo (como pygame)."""
+        right = left if right is None else right
+        self._vol = np.array([min(1.0, max(0.0, left)), min(1.0, max(0.0, right))], dtype=np.float32)
+
+    def get_volume(self) -> float:
+        return float(self._vol.max())
+
+    # ----- Mezcla -----
+    def _ramp(self, target: float, ms: float) -> None:
+        frames = max(1, int(ms * self._mixer.rate / 1000))
+        self._env_target = target
+        self._env_step = (target - self._env) / frames
+
+    def _envelope(self, n: int):
+        """Ganancia del tramo: escalar si está quieta, columna (n, 1) si hay rampa."""
+        if self._env_step == 0.0:
+            return self._env
+        ramp = self._env + self._env_step * np.arange(1, n + 1, dtype=np.float32)
+        if self._env_step > 0: np.minimum(ramp, self._env_target, out=ramp)
+        else: np.maximum(ramp, self._env_target, out=ramp)
+        self._env = float(ramp[-1])
+        if self._env == self._env_target:
+            self._env_step = 0.0
+        return ramp[:, None]
+
+    def _render(self, out: np.ndarray) -> None:
+        n, filled = len(out), 0
+        while filled < n and self._sound is not None:
+            pcm = self._sound.pcm
+            take = min(n - filled, len(pcm) - self._pos)
+            if take > 0:
+                seg = pcm[self._pos:self._pos + take].astype(np.float32)
+                gain = self._envelope(take) * self._vol
+                out[filled:filled + take] += seg * gain
+                self._pos += take
+                filled += take
+                if self._stop_at_zero and self._env <= 0.0:
+                    self._sound = self._queued = None
+                    return
+            if self._pos >= len(pcm):
+                if len(pcm) and self._loops != 0:
+                    self._pos = 0
+                    if self._loops > 0: self._loops -= 1
+                elif self._queued is not None:
+                    self._sound, self._queued, self._pos, self._loops = self._queued, None, 0, 0
+                else:
+                    self._sound = None
+
+
+class SoftMusic:
+    """pygame.mixer.music sobre un canal propio, fuera de los que reparte find_channel."""
+    def __init__(self, mixer: SoftMixer, loader: Callable[[str], SoftSound] | None):
+        self._mixer = mixer
+        self._loader = loader
+        self.channel = SoftChannel(mixer, -1)
+        self._loaded: SoftSound | None = None
+        self._volume = 1.0
+
+    def load(self, path: str) -> None:
+        self._loaded = self._loader(path)
+
+    def play(self, loops: int = 0, start: float = 0.0, fade_ms: int = 0) -> None:
+        if self._loaded is None:
+            raise pygame.error("music not loaded")
+        self.channel.play(self._loaded, loops, fade_ms)
+        self.channel.set_volume(self._volume)
+
+    def fadeout(self, ms: int) -> None: self.channel.fadeout(ms)
+    def stop(self) -> None: self.channel.stop()
+    def get_busy(self) -> bool: return self.channel.get_busy()
+    def get_volume(self) -> float: return self._volume
+
+    def set_volume(self, volume: float) -> None:
+        self._volume = volume
+        self.channel.set_volume(volume)
+
+
+class SoftMixer:
+    def __init__(self, rate: int = 44100, channels: int = 2, block: int = STREAM_BLOCK,
+                 loader: Callable[[str], SoftSound] | None = None):
+        self.rate, self.channels, self.block = rate, channels, block
+        self.lock = threading.RLock()
+        self.music = SoftMusic(self, loader)
+        self.master_fx: list[Callable[[np.ndarray], None]] = []   # procesos del bus master, en el lugar
+        self.ducker = None                                          # bus_fx.Ducker o None
+        self.limiter = None                                         # bus_fx.Limiter o None (último del master)
+        self.peak = self.rms = 0.0                                  # del último bloque, escala ±1
+        self.render_ms: deque = deque(maxlen=512)
+        self.underruns = 0
+        self._channels: list[SoftChannel] = []
+        self._reserved = 0
+        self._starts = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.set_num_channels(8)
+
+    # ----- API tipo pygame.mixer -----
+    def get_init(self) -> tuple[int, int, int]:
+        return self.rate, -16, self.channels
+
+    def set_num_channels(self, n: int) -> None:
+        with self.lock:
+            self._channels = self._channels[:n] + [SoftChannel(self, i) for i in range(len(self._channels), n)]
+
+    def get_num_channels(self) -> int:
+        return len(self._channels)
+
+    def set_reserved(self, n: int) -> None:
+        self._reserved = n
+
+    def Channel(self, index: int) -> SoftChannel:
+        return self._channels[index]
+
+    def Sound(self, pcm: np.ndarray) -> SoftSound:
+        return SoftSound(self, pcm)
+
+    def find_channel(self, force: bool = False) -> SoftChannel | None:
+        with self.lock:
+            free = self._channels[self._reserved:]
+            for ch in free:
+                if not ch.get_busy():
+                    return ch
+            return min(free, key=lambda ch: ch._started) if force and free else None
+
+    def fadeout(self, ms: int) -> None:
+        with self.lock:
+            for ch in self._channels: ch.fadeout(ms)
+
+    def stop(self) -> None:
+        with self.lock:
+            for ch in self._channels: ch.stop()
+            self.music.stop()
+
+    def _next_start(self) -> int:
+        self._starts += 1
+        return self._starts
+
+    # ----- Mezcla -----
+    def render(self, frames: int | None = None) -> np.ndarray:
+        """Un bloque del bus master: float32 (frames, canales) en escala ±1, ya procesado."""
+        out = np.zeros((frames or self.block, self.channels), dtype=np.float32)
+        ducker, beds, effects = self.ducker, None, False
+        with self.lock:
+            for ch in [self.music.channel, *self._channels]:
+                if ch._sound is None:
+                    continue
+                if ducker is not None and ch.role == "bed":
+                    if beds is None: beds = np.zeros_like(out)
+                    ch._render(beds)
+                else:
+                    effects = True
+                    ch._render(out)
+        if ducker is not None:
+            env = ducker.envelope(len(out), effects)
+            if beds is not None:
+                out += beds * env[:, None]
+        out *= 1.0 / _FULL_SCALE
+        for fx in self.master_fx:
+            fx(out)
+        if self.limiter is not None:
+            self.limiter(out)
+        self.peak = float(np.abs(out).max())
+        self.rms = float(np.sqrt(np.mean(np.square(out))))
+        return out
+
+    # ----- Stream -----
+    def start(self) -> None:
+        """Reserva un canal de pygame.mixer (ya inicializado) y lo alimenta bloque a bloque."""
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), STREAM_CHANNEL + 1))
+        pygame.mixer.set_reserved(STREAM_CHANNEL + 1)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._feed, name="soft-mixer", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _next_block(self) -> pygame.mixer.Sound:
+        t0 = time.perf_counter()
+        block = self.render()
+        pcm = np.clip(block * _FULL_SCALE, -_FULL_SCALE, _FULL_SCALE - 1).astype(np.int16)
+        self.render_ms.append((time.perf_counter() - t0) * 1000)
+        return pygame.sndarray.make_sound(pcm)
+
+    def _feed(self) -> None:
+        out = pygame.mixer.Channel(STREAM_CHANNEL)
+        out.play(self._next_block())
+        # Un bloque suena y otro espera en la cola: en cuanto SDL pasa al encolado, se prepara
+        # el siguiente. Así la latencia de un disparo es de uno a dos bloques.
+        while not self._stop.wait(_POLL_S):
+            if out.get_queue() is None:
+                snd = self._next_block()
+                if out.get_busy():
+                    out.queue(snd)
+                else:
+                    self.underruns += 1
+                    out.play(snd)
+        out.fadeout(50)
+
+
+def benchmark(voice_counts=(8, 16, 32, 64, 128), seconds: float = 2.0, rate: int = 44100,
+              block: int = STREAM_BLOCK) -> list[dict]:
+    """Mezcla voces sintéticas (estéreo, paneadas y en rampa de ganancia) sin dispositivo de audio.
+
+    realtime_x = segundos de audio mezclados por segundo de CPU con un solo núcleo.
+    """
+    rng = np.random.default_rng(0)
+    pcm = (rng.standard_normal((rate, 2)) * 3000).astype(np.int16)
+    n_blocks = max(1, int(seconds * rate / block))
+    results = []
+    for n in voice_counts:
+        mixer = SoftMixer(rate, 2, block)
+        mixer.set_num_channels(n)
+        for i in range(n):
+            ch = mixer.Sound(pcm).play(loops=-1, fade_ms=seconds * 1000)   # rampa durante toda la medición
+            ch.set_volume(0.3 + 0.7 * (i % 2), 0.3 + 0.7 * ((i + 1) % 2))
+        t0 = time.perf_counter()
+        for _ in range(n_blocks):
+            mixer.render()
+        elapsed = time.perf_counter() - t0
+        audio_s = n_blocks * block / rate
+        results.append({"voices": n, "ms_per_block": elapsed * 1000 / n_blocks,
+                        "budget_ms": block * 1000 / rate, "realtime_x": audio_s / elapsed})
+    return results
@@ -0,0 +1,183 @@
+# sound_library.py
+# Índice de la librería de sonidos para búsqueda incremental (prefijos + trigramas).
+# Indexa nombre de archivo, carpetas y labels EN/ES de los botones.
+from __future__ import annotations
+import os, re, bisect, heapq, time, unicodedata
+from collections import Counter
+from typing import NamedTuple
+
+AUDIO_EXTS = (".wav", ".mp3")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_TOKEN_CACHE_MAX = 256
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin tildes/diacríticos ("Canción" -> "cancion")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+def trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class LibraryEntry(NamedTuple):
+    path: str
+    name: str      # nombre sin extensión
+    folder: str    # carpeta relativa a la raíz escaneada
+
+
+class SoundLibrary:
+    def __init__(self):
+        self.entries: list[LibraryEntry] = []
+        self._by_path: dict[str, int] = {}
+        self._base_tokens: list[set[str]] = []     # tokens de nombre+carpeta
+        self._label_tokens: dict[int, set[str]] = {}
+        self._postings: dict[str, set[int]] = {}   # token -> ids
+        self._sorted_tokens: list[str] = []
+        self._by_name: list[LibraryEntry] | None = None   # consulta vacía: todo, por nombre
+        self._trigrams: dict[str, set[str]] = {}   # trigrama -> tokens
+        self._dirty = False
+        self._token_cache: dict[str, dict[int, float]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ----- Construcción -----
+    def scan(self, root: str) -> int:
+        """Recorre root recursivamente y agrega los .wav/.mp3. Devuelve cuántos agregó."""
+        root = os.path.abspath(root)
+        added = 0
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                it = os.scandir(current)
+            except OSError:
+                continue
+            with it:
+                for de in it:
+                    try:
+                        if de.is_dir(follow_symlinks=False):
+                            stack.append(de.path)
+                        elif de.name.lower().endswith(AUDIO_EXTS):
+                            folder = os.path.relpath(current, root)
+                            if self.add(de.path, "" if folder == "." else folder):
+                                added += 1
+                    except OSError:
+                        continue
+        return added
+
+    def add(self, path: str, folder: str = "") -> bool:
+        path = os.path.abspath(path)
+        if path in self._by_path:
+            return False
+        idx = len(self.entries)
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.entries.append(LibraryEntry(path, name, folder))
+        self._by_name = None
+        self._by_path[path] = idx
+        toks = set(tokenize(name)) | set(tokenize(folder))
+        self._base_tokens.append(toks)
+        self._index_tokens(idx, toks)
+        return True
+
+    def set_labels(self, labels_by_path: dict[str, list[str]]) -> None:
+        """Reemplaza los labels de botones (EN y ES) asociados a cada archivo."""
+        for idx, toks in self._label_tokens.items():
+            for t in toks - self._base_tokens[idx]:
+                ids = self._postings.get(t)
+                if ids is not None:
+                    ids.discard(idx)
+        self._label_tokens = {}
+        for path, labels in labels_by_path.items():
+            if not path:
+                continue
+            path = os.path.abspath(path)
+            if path not in self._by_path:
+                self.add(path, os.path.basename(os.path.dirname(path)))
+            idx = self._by_path[path]
+            toks = set()
+            for label in labels:
+                toks.update(tokenize(label or ""))
+            self._label_tokens[idx] = toks
+            self._index_tokens(idx, toks)
+        self._token_cache.clear()
+
+    def _index_tokens(self, idx: int, toks: set[str]) -> None:
+        for t in toks:
+            ids = self._postings.get(t)
+            if ids is None:
+                self._postings[t] = ids = set()
+                for g in trigrams(t):
+                    self._trigrams.setdefault(g, set()).add(t)
+                self._dirty = True
+            ids.add(idx)
+        self._token_cache.clear()
+
+    def _ensure_sorted(self):
+        if self._dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._dirty = False
+        if self._by_name is None:
+            self._by_name = sorted(self.entries, key=lambda e: e.name.lower())
+
+    # ----- Búsqueda -----
+    def _match_token(self, qt: str) -> dict[int, float]:
+        """ids -> score para un token de la consulta (memoizado)."""
+        hit = self._token_cache.get(qt)
+        if hit is not None:
+            return hit
+        scores: dict[int, float] = {}
+        # Prefijos: rango contiguo en la lista ordenada
+        toks = self._sorted_tokens
+        i = bisect.bisect_left(toks, qt)
+        while i < len(toks) and toks[i].startswith(qt):
+            tok = toks[i]
+            s = 3.0 if tok == qt else 2.0
+            for idx in self._postings[tok]:
+                if scores.get(idx, 0.0) < s:
+                    scores[idx] = s
+            i += 1
+        # Trigramas: tolerante a errores de tipeo y a subcadenas
+        q_grams = trigrams(qt)
+        if q_grams:
+            counts = Counter()
+            for g in q_grams:
+                counts.update(self._trigrams.get(g, ()))
+            need = max(1, (len(q_grams) + 1) // 2)
+            for tok, n in counts.items():
+                if n < need:
+                    continue
+                s = n / max(len(q_grams), len(tok) - 2)
+                for idx in self._postings[tok]:
+                    if scores.get(idx, 0.0) < s:
+                        scores[idx] = s
+        if len(self._token_cache) >= _TOKEN_CACHE_MAX:
+            self._token_cache.pop(next(iter(self._token_cache)))
+        self._token_cache[qt] = scores
+        return scores
+
+    def search(self, query: str, limit: int = 100, budget_s: float = 0.012) -> list[LibraryEntry]:
+        """Todos los términos deben coincidir; al agotar el presupuesto de tiempo se sigue
+        intersecando pero sin sumar puntajes (el orden queda aproximado, nunca el filtro)."""
+        self._ensure_sorted()
+        q_tokens = tokenize(query)
+        if not q_tokens:
+            return self._by_name[:limit]
+        deadline = time.perf_counter() + budget_s
+        # El token más selectivo primero reduce el resto a intersecciones pequeñas
+        per_token = sorted((self._match_token(t) for t in dict.fromkeys(q_tokens)), key=len)
+        total = dict(per_token[0])
+        for scores in per_token[1:]:
+            if not total:
+                break
+            if time.perf_counter() > deadline:
+                total = {i: s for i, s in total.items() if i in scores}
+            else:
+                total = {i: s + scores[i] for i, s in total.items() if i in scores}
+        best = heapq.nlargest(limit, total.items(),
+                              key=lambda kv: (kv[1], -len(self.entries[kv[0]].name)))
+        return [self.entries[i] for i, _ in best]
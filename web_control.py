@@ -0,0 +1,314 @@
+# web_control.py
+# Panel de control remoto (celular / segunda laptop en la misma red).
+# Servidor asyncio en su propio hilo, solo stdlib: HTTP para la página y WebSocket para
+# comandos (trigger/stop/volume/bank) y para empujar el estado a todos los clientes.
+# Por defecto escucha solo en loopback. Abierto a la red exige token (se genera si falta), y el
+# WebSocket rechaza siempre los Origin ajenos: una página cualquiera del navegador del operador
+# no puede disparar el board.
+from __future__ import annotations
+import asyncio, base64, hashlib, ipaddress, json, logging, secrets, struct, threading
+from typing import Callable
+from urllib.parse import urlsplit, parse_qs
+
+log = logging.getLogger("effects_board.web")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+STATE_POLL_S = 0.25          # el estado se compara y solo se envía si cambió
+SEND_TIMEOUT_S = 2.0         # un cliente lento se desconecta en vez de frenar al resto
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_MAX_FRAME = 64 * 1024
+
+
+# ----- WebSocket (RFC 6455, lo mínimo) -----
+def is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+def _accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+
+def encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack(">BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    n = len(payload)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, bool, bytes]:
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack(">H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack(">Q", await reader.readexactly(8))[0]
+    if n > _MAX_FRAME:
+        raise ValueError("frame demasiado grande")
+    mask = await reader.readexactly(4) if b1 & 0x80 else b""
+    payload = await reader.readexactly(n)
+    return b0 & 0x0F, bool(b0 & 0x80), _unmask(payload, mask) if mask else payload
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.lock = asyncio.Lock()
+
+    async def send(self, frame: bytes):
+        async with self.lock:
+            self.writer.write(frame)
+            await asyncio.wait_for(self.writer.drain(), SEND_TIMEOUT_S)
+
+
+class WebControlServer:
+    """handlers: comando -> callable(args: dict); state: callable() -> dict serializable."""
+    def __init__(self, handlers: dict[str, Callable[[dict], None]], state: Callable[[], dict],
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, token: str | None = None):
+        self.handlers, self.state = handlers, state
+        self.host, self.port, self.token = host, port, token or None
+        if self.token is None and not is_loopback(host):
+            self.token = secrets.token_urlsafe(12)      # nunca abierto a la red sin token
+        self.clients: set[_Client] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.base_events.Server | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._last_state: bytes = b""
+        self._dirty: asyncio.Event | None = None
+
+    # ----- Ciclo de vida (llamado desde la UI) -----
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="web-control", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        if self._error:
+            raise self._error
+
+    def stop(self) -> None:
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._loop = self._thread = None
+
+    def notify(self) -> None:
+        """Pide un envío de estado inmediato (thread-safe)."""
+        if self._loop and self._dirty:
+            self._loop.call_soon_threadsafe(self._dirty.set)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        if self._server and self._server.sockets:
+            return self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._dirty = asyncio.Event()
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+        log.info("Panel web en http://%s:%d/", *self.address)
+        loop.create_task(self._state_pump())
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for c in list(self.clients):
+                c.writer.close()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    # ----- Estado -----
+    def _snapshot(self) -> bytes:
+        return json.dumps({"type": "state", **self.state()}, ensure_ascii=False).encode()
+
+    async def _state_pump(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), STATE_POLL_S)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            if not self.clients:
+                continue
+            try:
+                data = self._snapshot()
+            except RuntimeError:      # la UI estaba modificando la grilla; siguiente vuelta
+                continue
+            if data != self._last_state:
+                self._last_state = data
+                await self._broadcast(encode_frame(data))
+
+    async def _broadcast(self, frame: bytes):
+        clients = list(self.clients)
+        results = await asyncio.gather(*(c.send(frame) for c in clients), return_exceptions=True)
+        for c, res in zip(clients, results):
+            if isinstance(res, BaseException):
+                self.clients.discard(c)
+                c.writer.close()
+
+    # ----- HTTP -----
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10.0)
+            lines = request.decode("latin-1").split("\r\n")
+            method, target, _ = (lines[0].split(" ", 2) + ["", ""])[:3]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+            url = urlsplit(target)
+            if self.token and parse_qs(url.query).get("token", [""])[0] != self.token:
+                await self._respond(writer, 403, "text/plain", b"forbidden")
+            elif url.path == "/ws" and not self._same_origin(headers):
+                await self._respond(writer, 403, "text/plain", b"forbidden")
+            elif url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, headers)
+                return
+            elif method == "GET" and url.path == "/":
+                await self._respond(writer, 200, "text/html; charset=utf-8", PAGE_HTML.encode())
+            elif method == "GET" and url.path == "/state":
+                await self._respond(writer, 200, "application/json", self._snapshot())
+            else:
+                await self._respond(writer, 404, "text/plain", b"not found")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                asyncio.CancelledError, ConnectionError, ValueError):
+            pass
+        writer.close()
+
+    @staticmethod
+    def _same_origin(headers: dict) -> bool:
+        """Sin Origin (clientes que no son navegadores) o con el mismo host:puerto del panel."""
+        origin = headers.get("origin")
+        if origin is None:
+            return True
+        return urlsplit(origin).netloc.lower() == headers.get("host", "").lower()
+
+    async def _respond(self, writer, status: int, ctype: str, body: bytes):
+        reason = {200: "OK", 403: "Forbidden", 404: "Not Found"}.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {ctype}\r\n"
+                     f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    # ----- WebSocket -----
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n").encode())
+        await writer.drain()
+        client = _Client(writer)
+        self.clients.add(client)
+        try:
+            await client.send(encode_frame(self._snapshot()))
+            buffer = b""
+            while True:
+                opcode, fin, payload = await read_frame(reader)
+                if opcode == 0x8:
+                    await client.send(encode_frame(b"", 0x8))
+                    break
+                if opcode == 0x9:
+                    await client.send(encode_frame(payload, 0xA)); continue
+                if opcode in (0x1, 0x0):
+                    buffer += payload
+                    if fin:
+                        await self._command(client, buffer)
+                        buffer = b""
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.CancelledError,
+                ConnectionError, ValueError):
+            pass   # CancelledError: el servidor se está cerrando
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    async def _command(self, client: _Client, raw: bytes):
+        try:
+            msg = json.loads(raw)
+            handler = self.handlers[msg["cmd"]]
+            # Sin pasar por Tk, pero fuera del event loop: un disparo puede decodificar o esperar
+            # el fundido del clip anterior y eso no debe frenar a los demás clientes ni al latido
+            await asyncio.get_running_loop().run_in_executor(None, handler, msg)
+            reply = {"type": "ack", "cmd": msg["cmd"], "id": msg.get("id")}
+        except Exception as e:
+            reply = {"type": "error", "error": str(e)}
+        await client.send(encode_frame(json.dumps(reply).encode()))
+        self._dirty.set()
+
+
+PAGE_HTML = """<!doctype html>
+<html lang="es"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1,user-scalable=no">
+<title>Effects Board</title>
+<style>
+ body{margin:0;background:#0F172A;color:#E2E8F0;font:15px Arial,sans-serif}
+ header{display:flex;gap:8px;align-items:center;flex-wrap:wrap;padding:10px;background:#1E293B}
+ header h1{font-size:18px;margin:0 auto 0 0}
+ button{border:0;border-radius:10px;color:#fff;font-weight:bold;cursor:pointer}
+ .bank{background:#334155;padding:8px 12px}.bank.on{background:#0EA5E9}
+ #stop{background:#B91C1C;padding:8px 14px}
+ #grid{display:grid;gap:8px;padding:10px}
+ .cell{min-height:70px;padding:6px;background:#334155;font-size:14px;overflow:hidden}
+ .cell.ok{background:#0EA5E9}.cell.missing{background:#7F1D1D}.cell.playing{outline:3px solid #FACC15}
+ #status{padding:6px 10px;color:#94A3B8}
+</style></head><body>
+<header><h1>Effects Board</h1><span id="banks"></span>
+ <label>Vol <input id="vol" type="range" min="0" max="100"></label>
+ <button id="stop">■ Stop</button></header>
+<div id="grid"></div><div id="status">…</div>
+<script>
+const q = location.search, $ = id => document.getElementById(id);
+let ws, state = null, n = 0;
+function send(m){ if(ws && ws.readyState===1){ m.id=++n; ws.send(JSON.stringify(m)); } }
+function render(s){
+  state = s; const g = $("grid");
+  g.style.gridTemplateColumns = `repeat(${s.cols},1fr)`;
+  g.innerHTML = "";
+  s.cells.forEach((row,r)=>row.forEach((c,col)=>{
+    const b = document.createElement("button");
+    b.className = "cell" + (c.missing ? " missing" : c.file ? " ok" : "") + (c.playing ? " playing" : "");
+    b.textContent = c.label;
+    b.onpointerdown = e => { e.preventDefault(); send({cmd:"trigger",row:r,col:col,bank:s.bank}); };
+    g.appendChild(b);
+  }));
+  const bk = $("banks"); bk.innerHTML = "";
+  for(let i=0;i<s.banks;i++){ const b=document.createElement("button");
+    b.className="bank"+(i===s.bank?" on":""); b.textContent=i+1;
+    b.onclick=()=>send({cmd:"bank",bank:i}); bk.appendChild(b); }
+  if(document.activeElement!==$("vol")) $("vol").value = s.volume;
+  $("status").textContent = s.playing ? "▶ "+s.playing : "Listo";
+}
+function connect(){
+  ws = new WebSocket((location.protocol==="https:"?"wss://":"ws://")+location.host+"/ws"+q);
+  ws.onmessage = e => { const m = JSON.parse(e.data);
+    if(m.type==="state") render(m); else if(m.type==="error") $("status").textContent = "⚠ "+m.error; };
+  ws.onclose = () => { $("status").textContent = "Reconectando…"; setTimeout(connect, 1000); };
+}
+$("stop").onclick = () => send({cmd:"stop"});
+$("vol").oninput = e => send({cmd:"volume",value:e.target.value/100});
+connect();
+</script></body></html>
+"""